@@ -0,0 +1,259 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+try:
+    import highspy
+except ImportError:  # scenarios are solved one by one with scipy's linprog(method="highs")
+    highspy = None
+
+
+# Batch LP solving: many scenarios of one LP (same A_ub and A_eq, different c, b_ub, b_eq or variable bounds),
+# as in linprog.py. The constraint matrices are built once as sparse matrices; with highspy every worker keeps one
+# HiGHS model and only changes costs and bounds between scenarios, so each solve hot starts from the previous basis.
+
+# scipy.optimize.linprog status codes
+STATUS_MESSAGES = {
+    0: "Optimization terminated successfully.",
+    1: "Iteration or time limit reached.",
+    2: "The problem is infeasible.",
+    3: "The problem is unbounded.",
+    4: "Numerical difficulties or the problem is unbounded or infeasible.",
+}
+
+# Accepted options: those of linprog(method="highs"), passed as they are to linprog and translated to the HiGHS
+# option names for highspy (maxiter limits both simplex and IPM iterations, presolve=False is "off")
+HIGHS_OPTIONS = {
+    "disp": ["output_flag"],
+    "presolve": ["presolve"],
+    "time_limit": ["time_limit"],
+    "maxiter": ["simplex_iteration_limit", "ipm_iteration_limit"],
+    "primal_feasibility_tolerance": ["primal_feasibility_tolerance"],
+    "dual_feasibility_tolerance": ["dual_feasibility_tolerance"],
+    "ipm_optimality_tolerance": ["ipm_optimality_tolerance"],
+}
+
+
+def _check_options(options):
+    unknown = sorted(set(options or {}) - set(HIGHS_OPTIONS))
+    if unknown:
+        raise ValueError(f"unsupported options {unknown}, expected some of {sorted(HIGHS_OPTIONS)}")
+    return dict(options or {})
+
+
+def _highs_options(options):
+    # HiGHS (name, value) pairs of linprog options
+    for name, value in options.items():
+        if name == "presolve":
+            value = "on" if value else "off"
+        elif name == "disp":
+            value = bool(value)
+        elif name == "maxiter":
+            value = int(value)
+        else:
+            value = float(value)
+        for highs_name in HIGHS_OPTIONS[name]:
+            yield highs_name, value
+
+
+def _bounds_arrays(bounds, n_var):
+    # scipy-style bounds (None, one (lb, ub) pair or one pair per variable) as lower and upper arrays
+    if bounds is None:
+        return np.zeros(n_var), np.full(n_var, np.inf)
+    pairs = np.array(bounds, dtype=object).reshape(-1, 2)
+    lower = np.array([-np.inf if value is None else value for value in pairs[:, 0]], dtype=float)
+    upper = np.array([np.inf if value is None else value for value in pairs[:, 1]], dtype=float)
+    return np.broadcast_to(lower, n_var).copy(), np.broadcast_to(upper, n_var).copy()
+
+
+def _stack(value, n_scenarios, width, name):
+    # (width,) values shared by all scenarios or (n_scenarios, width) values per scenario
+    value = np.asarray(value, dtype=float)
+    if value.ndim == 1:
+        value = value[None]
+    if value.ndim != 2 or value.shape[1] != width or value.shape[0] not in (1, n_scenarios):
+        raise ValueError(f"{name} must have shape ({width},) or ({n_scenarios}, {width}), got {value.shape}")
+    return np.broadcast_to(value, (n_scenarios, width))
+
+
+class _ChunkSolver:
+    '''
+    Solves chunks of scenarios of one LP structure, in a pool worker or in the calling process.
+    '''
+
+    def __init__(self, A_ub, A_eq, method, options):
+        self.A_ub, self.A_eq = A_ub, A_eq
+        self.n_var = A_ub.shape[1]
+        self.n_ub, self.n_eq = A_ub.shape[0], A_eq.shape[0]
+        self.method = method
+        self.options = _check_options(options)
+        self.highs = self._highs_model() if highspy is not None and method == "highs" else None
+
+    def _highs_model(self):
+        A = sparse.vstack([self.A_ub, self.A_eq]).tocsc()
+        lp = highspy.HighsLp()
+        lp.num_col_ = self.n_var
+        lp.num_row_ = A.shape[0]
+        lp.col_cost_ = np.zeros(self.n_var)
+        lp.col_lower_ = np.zeros(self.n_var)
+        lp.col_upper_ = np.full(self.n_var, np.inf)
+        lp.row_lower_ = np.full(A.shape[0], -np.inf)
+        lp.row_upper_ = np.full(A.shape[0], np.inf)
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = A.indptr
+        lp.a_matrix_.index_ = A.indices
+        lp.a_matrix_.value_ = A.data
+        highs = highspy.Highs()
+        highs.setOptionValue("output_flag", False)
+        for name, value in _highs_options(self.options):
+            if highs.setOptionValue(name, value) == highspy.HighsStatus.kError:
+                raise ValueError(f"HiGHS rejected option {name}={value!r}")
+        highs.passModel(lp)
+        model_status = highspy.HighsModelStatus
+        self._status = {model_status.kOptimal: 0, model_status.kIterationLimit: 1, model_status.kTimeLimit: 1,
+                        model_status.kInfeasible: 2, model_status.kUnbounded: 3}
+        self._cols = np.arange(self.n_var, dtype=np.int32)
+        self._rows = np.arange(A.shape[0], dtype=np.int32)
+        return highs
+
+    def solve(self, c, b_ub, b_eq, lower, upper):
+        n = len(c)
+        result = {
+            "x": np.full((n, self.n_var), np.nan),
+            "fun": np.full(n, np.nan),
+            "status": np.full(n, 4, dtype=np.int8),
+            "nit": np.zeros(n, dtype=np.int64),
+            "ineqlin": np.full((n, self.n_ub), np.nan),
+            "eqlin": np.full((n, self.n_eq), np.nan),
+        }
+        solve_scenario = self._solve_highs if self.highs is not None else self._solve_linprog
+        for k in range(n):
+            solve_scenario(result, k, c[k], b_ub[k], b_eq[k], lower[k], upper[k])
+        return result
+
+    def _solve_highs(self, result, k, c, b_ub, b_eq, lower, upper):
+        highs = self.highs
+        highs.changeColsCost(self.n_var, self._cols, c)
+        highs.changeColsBounds(self.n_var, self._cols, lower, upper)
+        if len(self._rows):
+            row_lower = np.concatenate([np.full(self.n_ub, -np.inf), b_eq])
+            row_upper = np.concatenate([b_ub, b_eq])
+            highs.changeRowsBounds(len(self._rows), self._rows, row_lower, row_upper)
+        highs.run()
+        status = self._status.get(highs.getModelStatus(), 4)
+        info = highs.getInfo()
+        result["status"][k] = status
+        result["nit"][k] = info.simplex_iteration_count + info.ipm_iteration_count
+        if status == 0:
+            solution = highs.getSolution()
+            row_dual = np.asarray(solution.row_dual)
+            result["x"][k] = solution.col_value
+            result["fun"][k] = info.objective_function_value
+            result["ineqlin"][k] = row_dual[:self.n_ub]
+            result["eqlin"][k] = row_dual[self.n_ub:]
+
+    def _solve_linprog(self, result, k, c, b_ub, b_eq, lower, upper):
+        res = linprog(c, A_ub=self.A_ub if self.n_ub else None, b_ub=b_ub if self.n_ub else None,
+                      A_eq=self.A_eq if self.n_eq else None, b_eq=b_eq if self.n_eq else None,
+                      bounds=np.column_stack([lower, upper]), method=self.method, options=self.options or None)
+        result["status"][k] = res.status
+        result["nit"][k] = res.nit
+        if res.status == 0:
+            result["x"][k] = res.x
+            result["fun"][k] = res.fun
+            if self.n_ub:
+                result["ineqlin"][k] = res.ineqlin.marginals
+            if self.n_eq:
+                result["eqlin"][k] = res.eqlin.marginals
+
+
+_worker = {}
+
+
+def _init_worker(A_ub, A_eq, method, options):
+    _worker["solver"] = _ChunkSolver(A_ub, A_eq, method, options)
+
+
+def _solve_chunk(chunk):
+    return _worker["solver"].solve(*chunk)
+
+
+class BatchLinprog:
+    '''
+    Solve many scenarios of min c @ x s.t. A_ub @ x <= b_ub, A_eq @ x == b_eq, lb <= x <= ub that share A_ub and A_eq,
+    e.g. BatchLinprog(A_ub, A_eq, bounds=bounds).solve(C, b_ub=B_ub, b_eq=b_eq) for an (n_scenarios, n_var) C.
+
+    A_ub and A_eq (dense or scipy sparse) are converted to sparse matrices once. bounds are the default variable
+    bounds in linprog format. Scenarios are split into n_workers * chunks_per_worker chunks on a process pool
+    that is started on the first batch and reused until close(); n_workers=1 solves in this process.
+    options are linprog(method="highs") options, with or without highspy; the accepted keys are those of HIGHS_OPTIONS
+    (e.g. {"time_limit": 10.0, "presolve": False}).
+    '''
+
+    def __init__(self, A_ub=None, A_eq=None, bounds=None, n_var=None, method="highs", options=None, n_workers=None,
+                 chunks_per_worker=4):
+        matrices = [A for A in (A_ub, A_eq) if A is not None]
+        if n_var is None:
+            if not matrices:
+                raise ValueError("n_var is required without A_ub and A_eq")
+            n_var = matrices[0].shape[1]
+        self.A_ub = sparse.csr_matrix(A_ub, dtype=float) if A_ub is not None else sparse.csr_matrix((0, n_var))
+        self.A_eq = sparse.csr_matrix(A_eq, dtype=float) if A_eq is not None else sparse.csr_matrix((0, n_var))
+        if self.A_ub.shape[1] != n_var or self.A_eq.shape[1] != n_var:
+            raise ValueError(f"A_ub and A_eq must have {n_var} columns")
+        self.n_var = n_var
+        self.lower, self.upper = _bounds_arrays(bounds, n_var)
+        self.method = method
+        self.options = _check_options(options)
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.chunks_per_worker = chunks_per_worker
+        self._solver = None
+        self._pool = None
+
+    def solve(self, c, b_ub=None, b_eq=None, lb=None, ub=None):
+        '''
+        c, b_ub, b_eq, lb and ub are either shared by all scenarios (1-D) or given per scenario (one row each);
+        lb and ub default to the bounds of the constructor.
+
+        Return data: dict of stacked arrays over the scenarios: x (n, n_var), fun, status (linprog codes, see
+        STATUS_MESSAGES), success, nit and the constraint marginals ineqlin (n, n_ub) and eqlin (n, n_eq).
+        x, fun and the marginals are nan where a scenario was not solved to optimality.
+        '''
+        n_ub, n_eq = self.A_ub.shape[0], self.A_eq.shape[0]
+        if n_ub and b_ub is None or n_eq and b_eq is None:
+            raise ValueError("b_ub and b_eq are required for the rows of A_ub and A_eq")
+        inputs = [(c, self.n_var, "c"), (np.zeros(n_ub) if b_ub is None else b_ub, n_ub, "b_ub"),
+                  (np.zeros(n_eq) if b_eq is None else b_eq, n_eq, "b_eq"),
+                  (self.lower if lb is None else lb, self.n_var, "lb"), (self.upper if ub is None else ub, self.n_var, "ub")]
+        n_scenarios = max(np.shape(value)[0] if np.ndim(value) == 2 else 1 for value, _, _ in inputs)
+        arrays = [_stack(value, n_scenarios, width, name) for value, width, name in inputs]
+
+        if self.n_workers == 1 or n_scenarios < 2:
+            if self._solver is None:
+                self._solver = _ChunkSolver(self.A_ub, self.A_eq, self.method, self.options)
+            result = self._solver.solve(*arrays)
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.n_workers, initializer=_init_worker,
+                                                 initargs=(self.A_ub, self.A_eq, self.method, self.options))
+            n_chunks = max(1, min(n_scenarios, self.n_workers * self.chunks_per_worker))
+            edges = np.linspace(0, n_scenarios, n_chunks + 1).astype(int)
+            chunks = [[array[start:stop] for array in arrays] for start, stop in zip(edges[:-1], edges[1:])]
+            parts = list(self._pool.map(_solve_chunk, chunks))
+            result = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+        result["success"] = result["status"] == 0
+        return result
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
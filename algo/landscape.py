@@ -0,0 +1,149 @@
+import json
+
+import numpy as np
+
+
+# Objective landscapes on large 2-D grids: functions are evaluated tile by tile on broadcast axes (a (1, w) row of x1
+# and an (h, 1) column of x2 instead of full meshgrids) and the tiles are written into one (n_functions, n2, n1) array,
+# a memory-mapped .npy file when a path is given. Plots are drawn from downsampled views, so a 4000 x 4000 grid never
+# has to be in memory at once.
+
+REDUCTIONS = {"min": np.minimum, "max": np.maximum, "mean": np.add}
+
+
+class Landscape:
+    '''
+    Values of objective and constraint functions on the grid x1 (columns) by x2 (rows), see sample_landscape.
+
+    landscape[name] is the full (n2, n1) array (memory-mapped when sampled to a path), minimum[name] and
+    argmin[name] the lowest sampled value and its (x1, x2). Constraints are feasible where g <= 0.
+    '''
+
+    def __init__(self, x1, x2, names, values, constraints=(), minimum=None, argmin=None, path=None):
+        self.x1 = np.asarray(x1)
+        self.x2 = np.asarray(x2)
+        self.names = list(names)
+        self.values = values
+        self.constraints = list(constraints)
+        self.minimum = minimum or {}
+        self.argmin = argmin or {}
+        self.path = path
+
+    def __getitem__(self, name):
+        return self.values[self.names.index(name)]
+
+    @property
+    def objectives(self):
+        return [name for name in self.names if name not in self.constraints]
+
+    @classmethod
+    def load(cls, path):
+        # Landscape sampled to path, values memory-mapped read-only
+        with open(f"{path}.json") as f:
+            meta = json.load(f)
+        values = np.load(path, mmap_mode="r")
+        return cls(meta["x1"], meta["x2"], meta["names"], values, meta["constraints"], meta["minimum"],
+                   {name: tuple(point) for name, point in meta["argmin"].items()}, path)
+
+    def _save_meta(self):
+        meta = {"names": self.names, "constraints": self.constraints, "x1": self.x1.tolist(), "x2": self.x2.tolist(),
+                "minimum": self.minimum, "argmin": {name: list(point) for name, point in self.argmin.items()}}
+        with open(f"{self.path}.json", "w") as f:
+            json.dump(meta, f)
+
+    def downsampled(self, name, max_points=500, how="stride", block_rows=1024):
+        '''
+        At most max_points by max_points view of one function: every step-th value ("stride", reads only those rows)
+        or the "min", "max" or "mean" of each step x step block, reduced block_rows rows at a time.
+
+        Return data: x1 and x2 of the view (first point of every block) and the (len(x2), len(x1)) values.
+        '''
+        values = self[name]
+        n2, n1 = values.shape
+        step1, step2 = -(-n1 // max_points), -(-n2 // max_points)
+        x1, x2 = self.x1[::step1], self.x2[::step2]
+        if how == "stride":
+            return x1, x2, np.array(values[::step2, ::step1])
+        if how not in REDUCTIONS:
+            raise ValueError(f"how must be 'stride', 'min', 'max' or 'mean', got {how!r}")
+
+        ufunc = REDUCTIONS[how]
+        row_starts, col_starts = np.arange(0, n2, step2), np.arange(0, n1, step1)
+        view = np.empty((len(row_starts), len(col_starts)), dtype=np.float64 if how == "mean" else values.dtype)
+        rows = max(1, block_rows // step2) * step2
+        for start in range(0, n2, rows):
+            block = np.asarray(values[start:start + rows])
+            reduced = ufunc.reduceat(block, np.arange(0, len(block), step2), axis=0, dtype=view.dtype)
+            view[start // step2:start // step2 + len(reduced)] = ufunc.reduceat(reduced, col_starts, axis=1)
+        if how == "mean":
+            view /= np.outer(np.diff(np.append(row_starts, n2)), np.diff(np.append(col_starts, n1)))
+        return x1, x2, view
+
+    def feasible(self, max_points=500, how="stride"):
+        # Mask of points that satisfy all constraints; how="max" marks a block feasible only if all its points are
+        x1, x2 = self.x1[::-(-len(self.x1) // max_points)], self.x2[::-(-len(self.x2) // max_points)]
+        mask = np.ones((len(x2), len(x1)), dtype=bool)
+        for name in self.constraints:
+            mask &= self.downsampled(name, max_points, how)[2] <= 0
+        return x1, x2, mask
+
+    def plot(self, objectives=None, levels=10, max_points=500, how="stride", ax=None):
+        '''
+        Contours of the objectives (dashed from the second on) over the shaded feasible region of the constraints.
+        levels are contour levels for all objectives or a dict name -> levels.
+        '''
+        import matplotlib.pyplot as plt
+
+        ax = ax or plt.gca()
+        if self.constraints:
+            x1, x2, mask = self.feasible(max_points, "stride" if how == "stride" else "max")
+            ax.contourf(x1, x2, mask.astype(np.int8), levels=[0.5, 1.5], colors="orange", alpha=0.3)
+        for k, name in enumerate(objectives or self.objectives):
+            x1, x2, values = self.downsampled(name, max_points, how)
+            linestyle = "solid" if k == 0 else "dashed"
+            ax.contour(x1, x2, values, levels[name] if isinstance(levels, dict) else levels, colors="black", alpha=0.5,
+                       linestyles=linestyle)
+            ax.plot([], [], color="black", alpha=0.5, linestyle=linestyle, label=name)  # legend entry
+        ax.set_xlabel("$x_1$")
+        ax.set_ylabel("$x_2$")
+        return ax
+
+
+def sample_landscape(objectives, x1, x2, constraints=None, tile=1024, dtype=np.float32, path=None):
+    '''
+    Evaluate objectives (and constraints), dicts name -> f(x1, x2) of vectorized functions, on the grid x1 by x2.
+
+    Every function is called once per tile of at most tile x tile points with a (1, w) x1 row and an (h, 1) x2 column
+    in dtype and must return values that broadcast to (h, w). With path the values are streamed into a memory-mapped
+    .npy file (axes and names in path.json, see Landscape.load); otherwise they are kept in memory.
+    '''
+    functions = dict(objectives)
+    functions.update(constraints or {})
+    x1, x2 = np.asarray(x1), np.asarray(x2)
+    shape = (len(functions), len(x2), len(x1))
+    if path is None:
+        values = np.empty(shape, dtype=dtype)
+    else:
+        values = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+    names = list(functions)
+    minimum, argmin = dict.fromkeys(names, np.inf), dict.fromkeys(names, (np.nan, np.nan))
+    row_axis, col_axis = x2.astype(dtype)[:, None], x1.astype(dtype)[None, :]
+    for row in range(0, len(x2), tile):
+        for col in range(0, len(x1), tile):
+            a, b = col_axis[:, col:col + tile], row_axis[row:row + tile]
+            for k, name in enumerate(names):
+                block = values[k, row:row + tile, col:col + tile]
+                block[...] = np.broadcast_to(functions[name](a, b), block.shape)
+                i = np.argmin(block)
+                if block.flat[i] < minimum[name]:
+                    r, c = np.unravel_index(i, block.shape)
+                    minimum[name] = float(block.flat[i])
+                    argmin[name] = (float(x1[col + c]), float(x2[row + r]))
+        if path is not None:
+            values.flush()
+
+    landscape = Landscape(x1, x2, names, values, list(constraints or {}), minimum, argmin, path)
+    if path is not None:
+        landscape._save_meta()
+    return landscape
@@ -26,4 +26,23 @@ bounds = [x0_bounds, x1_bounds, x2_bounds, x3_bounds]
 
 result = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, bounds=bounds)
 
-print(result.message)
\ No newline at end of file
+print(result.message)
+
+if __name__ == "__main__":
+    import time
+
+    from batch_linprog import STATUS_MESSAGES, BatchLinprog
+
+    # The same LP for 1000 scenarios of costs and inequality limits, solved as one batch
+    rng = np.random.default_rng(0)
+    n_scenarios = 1000
+    C = c * rng.uniform(0.5, 1.5, size=(n_scenarios, len(c)))
+    B_ub = b_ub + rng.normal(0.0, 20.0, size=(n_scenarios, len(b_ub)))
+
+    start_time = time.time()
+    with BatchLinprog(A_ub, A_eq, bounds=bounds) as batch:
+        results = batch.solve(C, b_ub=B_ub, b_eq=b_eq)
+    print("--- %s seconds for %d scenarios ---" % (time.time() - start_time, n_scenarios))
+    for status, count in zip(*np.unique(results["status"], return_counts=True)):
+        print(count, STATUS_MESSAGES[status])
+    print('best objective', np.nanmin(results["fun"]))
@@ -3,6 +3,8 @@ from pymoo.problems import get_problem
 from pymoo.optimize import minimize
 from pymoo.visualization.scatter import Scatter
 
+from telemetry import Telemetry
+
 import time
 start_time = time.time()
 
@@ -14,10 +16,13 @@ algorithm = NSGA2(pop_size=100)
 
 print('algorithm', algorithm)
 
+telemetry = Telemetry()
+
 res = minimize(problem,
                algorithm,
                ('n_gen', 200),
                seed=1,
+               callback=telemetry,
                verbose=False)
 
 print('res', res)
@@ -31,4 +36,6 @@ print('res.message', res.message)
 # plot.show()
 
 
-print("--- %s seconds ---" % (time.time() - start_time))
\ No newline at end of file
+print("--- %s seconds ---" % (time.time() - start_time))
+print('time per phase', telemetry.summary())
+# telemetry.to_csv('nsga2_telemetry.csv')
\ No newline at end of file
@@ -0,0 +1,243 @@
+import copy
+import cProfile
+import csv
+import json
+import pstats
+import sys
+import time
+
+import numpy as np
+from pymoo.core.callback import Callback
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+PHASES = ["evaluation", "survival", "variation", "duplicates"]
+
+
+def peak_memory_mb():
+    # Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)
+    if resource is None:
+        return np.nan
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+class Telemetry(Callback):
+    '''
+    Per-generation telemetry for pymoo runs, e.g. minimize(problem, algorithm, callback=Telemetry()).
+
+    Every generation records wall time split into evaluation / survival / variation / duplicates / other,
+    the number of evaluations and evaluations per second, cache hits and misses of the problem (when it
+    has an EvaluationCache), simulations skipped by its lower-bound pruning (n_pruned), best and median
+    of every objective and the peak memory of the process.
+    Records go to a ring buffer of the last `capacity` generations, see to_csv / to_json.
+
+    Phases are timed from the first generation on when the algorithm is attached before it runs
+    (telemetry.minimize below, or attach() after algorithm.setup); otherwise from the second one.
+    With profile=True the evaluation of every generation runs under cProfile and the profile of
+    the generation with the longest evaluation is kept (profile_stats, dump_profile).
+    '''
+
+    def __init__(self, capacity=1000, profile=False):
+        super().__init__()
+        self.capacity = capacity
+        self.profile = profile
+        self.buffer = None
+        self.n_records = 0
+        self.hottest_generation = None
+        self.hottest_evaluation_time = -np.inf
+        self._profile = None
+        self._pending_profile = None
+        self._hottest_profile = None
+        self._attached = False
+        self._phase_time = dict.fromkeys(PHASES, 0.0)
+        self._stack = []
+        self._last_time = None
+        self._last_n_eval = 0
+        self._last_cache = (0, 0)
+        self._last_pruned = 0
+
+    # * --------------------------- Instrumentation --------------------------- #
+
+    def attach(self, algorithm):
+        '''
+        Wrap the evaluator, survival, mating and duplicate elimination of a set up algorithm with phase timers.
+        '''
+        if self._attached:
+            return
+        self._attached = True
+        if self._last_time is None:
+            self._last_time = time.perf_counter()
+        self._wrap(algorithm.evaluator, "eval", "evaluation")
+        if getattr(algorithm, "survival", None) is not None:
+            self._wrap(algorithm.survival, "do", "survival")
+        if getattr(algorithm, "mating", None) is not None:
+            self._wrap(algorithm.mating, "do", "variation")
+        wrapped = set()
+        for owner in (algorithm, getattr(algorithm, "mating", None)):
+            eliminate_duplicates = getattr(owner, "eliminate_duplicates", None)
+            if hasattr(eliminate_duplicates, "do") and id(eliminate_duplicates) not in wrapped:
+                wrapped.add(id(eliminate_duplicates))
+                self._wrap(eliminate_duplicates, "do", "duplicates")
+
+    def _wrap(self, obj, name, phase):
+        func = getattr(obj, name)
+
+        def timed(*args, **kwargs):
+            self._enter(phase)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit()
+
+        setattr(obj, name, timed)
+
+    def _enter(self, phase):
+        # exclusive timing: a nested phase (duplicates inside variation) pauses the outer one
+        now = time.perf_counter()
+        if self._stack:
+            outer, start = self._stack[-1]
+            self._phase_time[outer] += now - start
+        self._stack.append([phase, now])
+        if phase == "evaluation" and self.profile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def _exit(self):
+        phase, start = self._stack.pop()
+        if phase == "evaluation" and self._profile is not None:
+            self._profile.disable()
+            self._pending_profile = self._profile
+            self._profile = None
+        now = time.perf_counter()
+        self._phase_time[phase] += now - start
+        if self._stack:
+            self._stack[-1][1] = now
+
+    # * ----------------------------- Recording ------------------------------ #
+
+    def initialize(self, algorithm):
+        n_obj = algorithm.problem.n_obj
+        dtype = [("n_gen", "i8"), ("wall_time", "f8")] + [(phase, "f8") for phase in PHASES] + [
+            ("other", "f8"), ("n_eval", "i8"), ("evals_per_sec", "f8"), ("cache_hits", "i8"), ("cache_misses", "i8"),
+            ("pruned", "i8"), ("f_best", "f8", (n_obj,)), ("f_median", "f8", (n_obj,)), ("peak_memory_mb", "f8")]
+        self.buffer = np.zeros(self.capacity, dtype=dtype)
+        if self._last_time is None:
+            # attached late: the first generation only gets its total time
+            self._last_time = time.perf_counter() - (time.time() - algorithm.start_time)
+        self.attach(algorithm)
+
+    def notify(self, algorithm):
+        now = time.perf_counter()
+        wall_time = now - self._last_time
+        n_eval = algorithm.evaluator.n_eval - self._last_n_eval
+        cache = getattr(algorithm.problem, "cache", None)
+        hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+        pruned = getattr(algorithm.problem, "n_pruned", 0)
+
+        F = algorithm.pop.get("F")
+        record = self.buffer[self.n_records % self.capacity]
+        record["n_gen"] = algorithm.n_gen
+        record["wall_time"] = wall_time
+        for phase in PHASES:
+            record[phase] = self._phase_time[phase]
+        record["other"] = wall_time - sum(self._phase_time.values())
+        record["n_eval"] = n_eval
+        evaluation_time = self._phase_time["evaluation"] or wall_time
+        record["evals_per_sec"] = n_eval / evaluation_time if evaluation_time > 0 else np.nan
+        record["cache_hits"] = hits - self._last_cache[0]
+        record["cache_misses"] = misses - self._last_cache[1]
+        record["pruned"] = pruned - self._last_pruned
+        record["f_best"] = F.min(axis=0)
+        record["f_median"] = np.median(F, axis=0)
+        record["peak_memory_mb"] = peak_memory_mb()
+        self.n_records += 1
+
+        pending = self._pending_profile
+        if pending is not None and self._phase_time["evaluation"] > self.hottest_evaluation_time:
+            self.hottest_evaluation_time = self._phase_time["evaluation"]
+            self.hottest_generation = algorithm.n_gen
+            self._hottest_profile = pending
+        self._pending_profile = None
+
+        self._phase_time = dict.fromkeys(PHASES, 0.0)
+        self._last_n_eval = algorithm.evaluator.n_eval
+        self._last_cache = (hits, misses)
+        self._last_pruned = pruned
+        self._last_time = time.perf_counter()
+
+    def records(self):
+        # Records in generation order, oldest first
+        if self.buffer is None:
+            return np.zeros(0)
+        if self.n_records <= self.capacity:
+            return self.buffer[:self.n_records].copy()
+        start = self.n_records % self.capacity
+        return np.concatenate([self.buffer[start:], self.buffer[:start]])
+
+    def rows(self):
+        rows = []
+        for record in self.records():
+            row = {}
+            for name in record.dtype.names:
+                value = record[name]
+                if np.ndim(value):
+                    row.update({f"{name}_{k}": float(v) for k, v in enumerate(value)})
+                else:
+                    row[name] = value.item()
+            rows.append(row)
+        return rows
+
+    def to_csv(self, path):
+        rows = self.rows()
+        with open(path, "w", newline="") as f:
+            if rows:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.rows(), f, indent=2)
+
+    def summary(self):
+        records = self.records()
+        if not len(records):
+            return {}
+        total = {phase: float(records[phase].sum()) for phase in PHASES + ["other"]}
+        total["wall_time"] = float(records["wall_time"].sum())
+        total["n_eval"] = int(records["n_eval"].sum())
+        total["pruned"] = int(records["pruned"].sum())
+        return total
+
+    # * ------------------------------ Profiling ------------------------------ #
+
+    def profile_stats(self):
+        return pstats.Stats(self._hottest_profile) if self._hottest_profile is not None else None
+
+    def dump_profile(self, path):
+        stats = self.profile_stats()
+        if stats is None:
+            raise ValueError("no profile captured, run with Telemetry(profile=True)")
+        stats.dump_stats(path)
+
+
+def minimize(problem, algorithm, termination=None, telemetry=None, copy_algorithm=True, **kwargs):
+    '''
+    pymoo.optimize.minimize with telemetry attached before the first generation.
+    '''
+    if telemetry is None:
+        telemetry = Telemetry()
+    if copy_algorithm:
+        algorithm = copy.deepcopy(algorithm)
+    if termination is not None:
+        kwargs["termination"] = termination
+    algorithm.setup(problem, callback=telemetry, **kwargs)
+    telemetry.attach(algorithm)
+    res = algorithm.run()
+    res.algorithm = algorithm
+    return res
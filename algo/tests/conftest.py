@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The algo modules are imported flat, as in example.py and linprog.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
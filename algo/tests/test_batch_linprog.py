@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from scipy.optimize import linprog
+
+from batch_linprog import BatchLinprog
+
+
+def scenarios(seed, n_scenarios=20, n_var=6, n_ub=4):
+    # feasible, bounded LPs: x >= 0, A_ub @ x <= b_ub with positive A_ub and b_ub, one equality row
+    rng = np.random.default_rng(seed)
+    A_ub = rng.uniform(0.5, 2.0, (n_ub, n_var))
+    A_eq = np.ones((1, n_var))
+    C = rng.uniform(-2.0, 1.0, (n_scenarios, n_var))
+    B_ub = rng.uniform(5.0, 10.0, (n_scenarios, n_ub))
+    b_eq = np.array([3.0])
+    return A_ub, A_eq, C, B_ub, b_eq
+
+
+@pytest.mark.parametrize("options", [None, {"presolve": False, "time_limit": 10, "maxiter": 1000, "disp": False,
+                                            "primal_feasibility_tolerance": 1e-9, "dual_feasibility_tolerance": 1e-9}])
+def test_highspy_batch_matches_linprog(options):
+    pytest.importorskip("highspy")
+    A_ub, A_eq, C, B_ub, b_eq = scenarios(0)
+    with BatchLinprog(A_ub, A_eq, bounds=(0, 4), options=options, n_workers=1) as batch:
+        result = batch.solve(C, b_ub=B_ub, b_eq=b_eq)
+    for k in range(len(C)):
+        expected = linprog(C[k], A_ub=A_ub, b_ub=B_ub[k], A_eq=A_eq, b_eq=b_eq, bounds=(0, 4), method="highs", options=options)
+        assert result["status"][k] == expected.status
+        assert result["fun"][k] == pytest.approx(expected.fun, abs=1e-8)
+        assert np.all(A_ub @ result["x"][k] <= B_ub[k] + 1e-8)
+        assert A_eq @ result["x"][k] == pytest.approx(b_eq)
+
+
+def test_highspy_iteration_limit_matches_linprog():
+    # one scenario only: later scenarios hot start from the previous basis and need fewer iterations
+    pytest.importorskip("highspy")
+    A_ub, A_eq, C, B_ub, b_eq = scenarios(1)
+    options = {"maxiter": 1, "presolve": False}
+    with BatchLinprog(A_ub, A_eq, bounds=(0, 4), options=options, n_workers=1) as batch:
+        result = batch.solve(C[0], b_ub=B_ub[0], b_eq=b_eq)
+    expected = linprog(C[0], A_ub=A_ub, b_ub=B_ub[0], A_eq=A_eq, b_eq=b_eq, bounds=(0, 4), method="highs", options=options)
+    assert expected.status == 1
+    assert result["status"][0] == expected.status
+
+
+def test_unknown_options_are_rejected():
+    A_ub, A_eq, _, _, _ = scenarios(0)
+    with pytest.raises(ValueError, match="simplex_strategy"):
+        BatchLinprog(A_ub, A_eq, options={"simplex_strategy": 1})
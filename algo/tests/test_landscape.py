@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from landscape import Landscape, sample_landscape
+
+OBJECTIVES = {"f1": lambda x1, x2: (x1 - 1) ** 2 + 3 * (x2 + 0.5) ** 2, "f2": lambda x1, x2: np.sin(x1) * np.cos(x2)}
+CONSTRAINTS = {"g1": lambda x1, x2: x1 + x2 - 1}
+
+
+@pytest.mark.parametrize("tile", [7, 16, 50])
+def test_tiled_landscape_equals_single_pass(tile):
+    x1, x2 = np.linspace(-3, 3, 53), np.linspace(-2, 2, 41)
+    single = sample_landscape(OBJECTIVES, x1, x2, CONSTRAINTS, tile=100)
+    tiled = sample_landscape(OBJECTIVES, x1, x2, CONSTRAINTS, tile=tile)
+    np.testing.assert_array_equal(tiled.values, single.values)
+    assert tiled.minimum == single.minimum
+    assert tiled.argmin == single.argmin
+
+    # and both equal the functions on a full meshgrid
+    a, b = np.meshgrid(x1.astype(np.float32), x2.astype(np.float32))
+    for name, f in {**OBJECTIVES, **CONSTRAINTS}.items():
+        np.testing.assert_array_equal(single[name], f(a, b).astype(np.float32))
+
+
+def test_memory_mapped_landscape_round_trip(tmp_path):
+    x1, x2 = np.linspace(-3, 3, 30), np.linspace(-2, 2, 20)
+    path = str(tmp_path / "landscape.npy")
+    sampled = sample_landscape(OBJECTIVES, x1, x2, CONSTRAINTS, tile=8, path=path)
+    loaded = Landscape.load(path)
+    np.testing.assert_array_equal(np.asarray(loaded.values), sample_landscape(OBJECTIVES, x1, x2, CONSTRAINTS).values)
+    assert loaded.minimum == sampled.minimum
+    assert loaded.constraints == ["g1"]
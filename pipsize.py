@@ -1,34 +1,201 @@
 # Run `python pipsize.py` in Terminal to show size of pip packages
+# `python pipsize.py --format json` (or csv) for machine-readable output, `--help` for all options
 # Credits: https://stackoverflow.com/a/67914559/11067496
 
-sort_in_descending = True   # Show packages in descending order
-
+import argparse
+import csv
+import json
 import os
-import pkg_resources
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
+
+CACHE_PATH = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "pipsize", "sizes.json")
+CACHE_VERSION = 1
+
+
+def scan_size(path):
+    # Total size and number of files below path (a file or a directory), symlinks are not followed
+    if not os.path.isdir(path):
+        try:
+            return os.stat(path, follow_symlinks=False).st_size, 1
+        except OSError:
+            return 0, 0
+    total_size, n_files, stack = 0, 0, [path]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        total_size += entry.stat(follow_symlinks=False).st_size
+                        n_files += 1
+                except OSError:
+                    pass
+    return total_size, n_files
+
+
+def record_size(dist):
+    # Size of the files listed in RECORD: the recorded size, or the file on disk where RECORD has none (e.g. *.pyc)
+    total_size, n_files, seen = 0, 0, set()
+    for file in dist.files:
+        path = os.path.normpath(str(dist.locate_file(file)))
+        if path in seen:
+            continue
+        seen.add(path)
+        if file.size is not None:
+            total_size += file.size
+            n_files += 1
+            continue
+        try:
+            total_size += os.stat(path, follow_symlinks=False).st_size
+            n_files += 1
+        except OSError:
+            pass
+    return total_size, n_files
+
 
-def calc_container(path):
-    total_size = 0
-    for dirpath, _, filenames in os.walk(path):
-        for f in filenames:
-            fp = os.path.join(dirpath, f)
-            total_size += os.path.getsize(fp)
-    return total_size
+def fallback_roots(dist, name):
+    # Top-level packages of distributions without a file list (e.g. some egg-info or develop installs)
+    location = str(dist.locate_file(""))
+    top_level = (dist.read_text("top_level.txt") or "").split() or [name, name.replace("-", "_")]
+    roots = []
+    for package in dict.fromkeys(top_level):
+        for path in (os.path.join(location, package), os.path.join(location, f"{package}.py")):
+            if os.path.exists(path):
+                roots.append(path)
+    return roots
 
-dists = [d for d in pkg_resources.working_set]
-dists_with_size = {}
 
-for dist in dists:
+def metadata_dir(dist):
+    # .dist-info / .egg-info directory of a distribution: the directory of the METADATA (PKG-INFO) file in its file list
+    for file in dist.files or ():
+        if file.name in ("METADATA", "PKG-INFO") and file.parent.name.endswith((".dist-info", ".egg-info")):
+            return os.path.normpath(str(dist.locate_file(file).parent))
+    return None
+
+
+def cache_key(dist):
+    # The metadata directory and the mtimes of it and its RECORD change whenever the distribution is (re)installed
+    path = metadata_dir(dist)
+    if path is None:
+        return None, None
     try:
-        path = os.path.join(dist.location, dist.project_name)
-        size = calc_container(path)
-        dists_with_size[size] = dist
+        mtimes = [os.stat(path).st_mtime_ns]
+        record = os.path.join(path, "RECORD")
+        if os.path.exists(record):
+            mtimes.append(os.stat(record).st_mtime_ns)
     except OSError:
-        '{} no longer exists'.format(dist.project_name)
+        return None, None
+    return path, mtimes
+
+
+def dist_size(dist, cache):
+    key, mtimes = cache_key(dist)
+    cached = cache.get(key) if key is not None else None
+    if cached is not None and cached["mtimes"] == mtimes:
+        return dict(cached["entry"], cached=True)
+
+    name = dist.metadata["Name"]
+
+    if dist.files is not None:
+        size, n_files = record_size(dist)
+        source = "record"
+    else:
+        size = n_files = 0
+        for root in fallback_roots(dist, name):
+            root_size, root_files = scan_size(root)
+            size += root_size
+            n_files += root_files
+        source = "scan"
+    entry = {"name": name, "version": dist.version, "size": size, "n_files": n_files, "source": source,
+             "location": str(dist.locate_file(""))}
+    if key is not None:
+        cache[key] = {"mtimes": mtimes, "entry": entry}
+    return dict(entry, cached=False)
+
+
+def distributions(path=None):
+    # One distribution per normalized name, the first on the path wins (like import does)
+    dists = {}
+    for dist in metadata.distributions(path=path or sys.path):
+        name = dist.metadata["Name"]
+        if name:
+            dists.setdefault(re.sub(r"[-_.]+", "-", name).lower(), dist)
+    return list(dists.values())
+
+
+def load_cache(path):
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get("entries", {}) if cache.get("version") == CACHE_VERSION else {}
+
+
+def save_cache(path, cache):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"version": CACHE_VERSION, "entries": cache}, f)
+    os.replace(tmp, path)
+
+
+def package_sizes(path=None, cache_path=CACHE_PATH, n_workers=None):
+    '''
+    Size of every installed distribution on path (default sys.path), from its RECORD file or, without one,
+    by scanning its top-level packages. Distributions are measured on a thread pool; results are cached in
+    cache_path (None disables the cache) keyed by the mtimes of their metadata directories.
+    '''
+    loaded = load_cache(cache_path) if cache_path else {}
+    cache = dict(loaded)
+    with ThreadPoolExecutor(max_workers=n_workers or min(32, (os.cpu_count() or 1) + 4)) as pool:
+        sizes = list(pool.map(lambda dist: dist_size(dist, cache), distributions(path)))
+    if cache_path and cache != loaded:
+        # Entries of uninstalled distributions are dropped
+        save_cache(cache_path, {key: value for key, value in cache.items() if os.path.isdir(key)})
+    return sizes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Size of installed pip packages")
+    parser.add_argument("--format", choices=["text", "json", "csv"], default="text")
+    parser.add_argument("--ascending", action="store_true", help="smallest packages first")
+    parser.add_argument("--min-size", type=float, default=1.0, help="hide packages below this size in KB (text output)")
+    parser.add_argument("--path", nargs="*", help="directories to search instead of sys.path")
+    parser.add_argument("--cache", default=CACHE_PATH, help="cache file")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    sizes = package_sizes(args.path, None if args.no_cache else args.cache, args.workers)
+    sizes.sort(key=lambda entry: (entry["size"], entry["name"].lower()), reverse=not args.ascending)
+    total_size = sum(entry["size"] for entry in sizes)
+
+    if args.format == "json":
+        json.dump({"python": sys.version.split()[0], "prefix": sys.prefix, "total_size": total_size,
+                   "n_packages": len(sizes), "packages": sizes}, sys.stdout, indent=1)
+        print()
+    elif args.format == "csv":
+        writer = csv.DictWriter(sys.stdout, ["name", "version", "size", "n_files", "source", "cached", "location"])
+        writer.writeheader()
+        writer.writerows(sizes)
+    else:
+        for entry in sizes:
+            if entry["size"] / 1000 > args.min_size:
+                print(f"{entry['name']} {entry['version']}: {entry['size'] / 1000000:.2f} MB")
+                print("-" * 40)
+        print(f"{len(sizes)} packages: {total_size / 1000000:.2f} MB ({time.perf_counter() - start_time:.2f} s)")
 
-# Sort packages size
-dists_with_size = dict(sorted(dists_with_size.items(), reverse=sort_in_descending))
 
-for size, dist in dists_with_size.items():
-    if size/1000 > 1.0:
-        print (f"{dist}: {size/1000000:.2f} MB")
-        print("-"*40)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
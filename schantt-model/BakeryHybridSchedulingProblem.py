@@ -1,21 +1,41 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from pymoo.core.problem import Problem
+
+from evaluation_cache import EvaluationCache
+from gantt import render_gantt, save_gantt
+from schedule_trace import new_trace
+
+OBJECTIVES = ("makespan", "changeover", "waiting")
 
 class BakeryHybridSchedulingProblem(Problem):
-    def __init__(self, user_sequence, recipe_id_to_index, machines_per_stage, processing_times, changeover_times, batch_sizes, tact_times, debug=False):
+    def __init__(self, user_sequence, recipe_id_to_index, machines_per_stage, processing_times, changeover_times, batch_sizes, tact_times, debug=False, vectorized=False, parallel=None, n_workers=None, cache_size=None, initial_state=None, objectives=("makespan",), due_dates=None, prune=None):
         self.seq_length = len(user_sequence)
         self.user_sequence = np.array(user_sequence)
         self.recipe_id_to_index = recipe_id_to_index
+        self.index_to_recipe_id = {idx: rid for rid, idx in recipe_id_to_index.items()}
         self.n_stages = len(machines_per_stage)
         self.machines_per_stage = machines_per_stage
         self.max_makespan = 0
         self.max_machines = max(machines_per_stage)
         self.debug = debug
+        self.vectorized = vectorized
+        self.parallel = parallel
+        self.n_workers = n_workers
+        # Multi-objective mode: any of OBJECTIVES, plus max lateness over due_dates[order] as a constraint (<= 0)
+        unknown = set(objectives) - set(OBJECTIVES)
+        if unknown or not len(objectives):
+            raise ValueError(f"objectives must be a non-empty selection of {OBJECTIVES}, got {objectives}")
+        self.objectives = tuple(objectives)
+        self.due_dates = None if due_dates is None else np.asarray(due_dates, dtype=float)
+        if self.due_dates is not None and self.due_dates.shape != (self.seq_length,):
+            raise ValueError(f"due_dates needs one due date per order ({self.seq_length}), got shape {self.due_dates.shape}")
+        self.multi_objective = self.objectives != ("makespan",) or self.due_dates is not None
         n_var = self.seq_length + (self.seq_length * self.n_stages)
         super().__init__(
             n_var=n_var,
-            n_obj=1,
-            n_constr=0,
+            n_obj=len(self.objectives),
+            n_ieq_constr=0 if self.due_dates is None else 1,
             xl=[0] * n_var,
             xu=[self.seq_length - 1] * self.seq_length + [m - 1 for m in machines_per_stage for _ in range(self.seq_length)],
             type_var=int
@@ -24,159 +44,767 @@ class BakeryHybridSchedulingProblem(Problem):
         self.changeover_times = changeover_times
         self.batch_sizes = batch_sizes
         self.tact_times = tact_times
+        self._workspace = None
+        self._evaluator = None
+        self.cache = EvaluationCache(cache_size) if cache_size else None
+        # Line state left by a frozen schedule prefix (see line_state), None for an empty line at t=0
+        self.initial_state = initial_state
+        self._machine_classes = self._identical_machine_classes()
+        # Bounding layer (single objective): genomes whose makespan lower bound exceeds prune_threshold are
+        # not simulated; "skip" returns the bound as their fitness, "defer" also keeps them in self.deferred
+        if prune not in (None, "skip", "defer"):
+            raise ValueError(f"prune must be None, 'skip' or 'defer', got {prune!r}")
+        self.prune = prune
+        self.prune_threshold = np.inf
+        # update_prune_threshold stops bounding after prune_probe generations in which nothing was pruned
+        self.prune_probe = 5
+        self._threshold_updates = 0
+        self.n_bounded = 0
+        self.n_pruned = 0
+        self.deferred = []
+
+    def __getstate__(self):
+        # Workspaces and worker pools stay with the process that created them
+        state = self.__dict__.copy()
+        state["_workspace"] = None
+        state["_evaluator"] = None
+        return state
 
     def _evaluate(self, X, out, *args, **kwargs):
-        makespans = np.array([self.calculate_makespan(x, store_best=False) for x in X])
-        out["F"] = makespans
+        if self.prune and not self.multi_objective and not self.debug and np.isfinite(self.prune_threshold):
+            values = self._evaluate_bounded(X)
+        elif self.cache is not None and not self.debug:
+            values = self._evaluate_cached(X)
+        else:
+            values = self._evaluate_population(X)
+        if not self.multi_objective:
+            out["F"] = values
+        else:
+            out["F"] = values[:, :self.n_obj]
+            if self.n_ieq_constr:
+                out["G"] = values[:, self.n_obj:]
 
-    def calculate_makespan(self, x, store_best=True):
-        perm = x[:self.seq_length]
-        machine_choices = x[self.seq_length:].reshape(self.seq_length, self.n_stages)
-        seq = self.user_sequence[perm]
-        start_times = np.zeros((self.seq_length, self.n_stages))
-        end_times = np.zeros((self.seq_length, self.n_stages))
-        changeover_times_array = np.zeros((self.seq_length, self.n_stages))
-        machine_free_times = np.zeros((self.n_stages, self.max_machines))
+    def _evaluate_bounded(self, X):
+        # Simulate only the genomes whose lower bound does not exceed the threshold; bounds are never cached
+        X = np.asarray(X)
+        bounds = self.makespan_lower_bounds(X)
+        pruned = bounds > self.prune_threshold
+        self.n_bounded += len(X)
+        self.n_pruned += int(pruned.sum())
+        values = bounds.copy()
+        if not pruned.all():
+            keep = ~pruned
+            values[keep] = self._evaluate_cached(X[keep]) if self.cache is not None else self._evaluate_population(X[keep])
+        if self.prune == "defer" and pruned.any():
+            self.deferred.extend(X[pruned].astype(int))
+        return values
+
+    def update_prune_threshold(self, algorithm):
+        '''
+        pymoo callback (minimize(..., callback=problem.update_prune_threshold)): the threshold becomes the worst
+        fitness of the current population. GA survival keeps pop_size of parents plus offspring, so an offspring
+        with a bound above every parent could not have survived and the run takes the same path as without pruning.
+
+        The bounds are only 0.5-0.75 of the simulated makespan on typical lines (postponed orders occupy their
+        later-stage machines twice, which the bounds cannot see), so this mode rarely prunes anything. When the
+        first prune_probe generations prune nothing the threshold goes back to inf and bounds are no longer
+        computed. Set prune_threshold directly (e.g. the makespan a replan has to beat) to prune reliably.
+        '''
+        if self.prune_probe is not None and self._threshold_updates >= self.prune_probe and self.n_pruned == 0:
+            self.prune_threshold = np.inf
+            return
+        F = algorithm.pop.get("F")
+        if F is not None and len(F) >= getattr(algorithm, "pop_size", len(F)):
+            self.prune_threshold = float(np.max(F[:, 0]))
+            self._threshold_updates += 1
+
+    def evaluate_deferred(self):
+        # Full makespans of the deferred genomes, e.g. when the threshold was too tight; clears the list
+        if not self.deferred:
+            return np.zeros((0, self.n_var), dtype=int), np.zeros(0)
+        X = np.array(self.deferred)
+        self.deferred = []
+        return X, self._evaluate_population(X)
+
+    def makespan_lower_bounds(self, X):
+        '''
+        Valid lower bounds of calculate_makespan for every row of X in O(n_pop * seq_length * n_stages), no simulation.
+
+        Machine bound: tasks on one machine never overlap and each lasts changeover + processing + batch delay, so every
+        used machine gives max(initial free time, smallest head) + machine load + smallest tail. The head of a task is
+        the earliest its order can reach the stage from the earlier stages, the tail what the order needs after it.
+        Chain bound: the Stage 0 postponement rule lets an order start only once the previous order is far enough
+        through the later stages, a max-plus recursion over the sequence that is solved with prefix sums.
+        The makespan of frozen tasks is a third bound.
+        '''
+        X = np.asarray(X).astype(int, copy=False)
+        n_pop, n, S, M = len(X), self.seq_length, self.n_stages, self.max_machines
+        if n == 0 or n_pop == 0:
+            return np.full(n_pop, self._makespan_floor())
+        stages = np.arange(S)
+        seqs = self.user_sequence[X[:, :n]]
+        machines = X[:, n:].reshape(n_pop, n, S)
+        processing = self.processing_times[stages, machines, seqs[:, :, None]]
+        batch_delay = (np.asarray(self.batch_sizes) - 1)[None, :] * np.asarray(self.tact_times)[seqs]
+        state = self.initial_state if self._has_previous(self.initial_state) else None
+
+        # changeover of every task, from the previous position (or the last frozen task) as in the simulation
+        changeover = np.zeros((n_pop, n, S))
+        if n > 1:
+            raw = self.changeover_times[stages, machines[:, 1:], seqs[:, :-1, None], seqs[:, 1:, None]]
+            changeover[:, 1:] = np.where((seqs[:, :-1] != seqs[:, 1:])[:, :, None], raw, 0)
+        if state is not None:
+            raw = self.changeover_times[stages, machines[:, 0], state["recipe"], seqs[:, :1]]
+            changeover[:, 0] = np.where((seqs[:, 0] != state["recipe"])[:, None], raw, 0)
+
+        # head: stage s starts after stage s - 1 of the same order started, plus its changeover and processing,
+        # plus the changeover at s; tail: every later stage needs 2 * changeover + processing
+        step = changeover[:, :, :-1] + processing[:, :, :-1] + changeover[:, :, 1:]
+        head = np.concatenate([changeover[:, :, :1], changeover[:, :, :1] + np.cumsum(step, axis=2)], axis=2)
+        later = 2 * changeover[:, :, 1:] + processing[:, :, 1:]
+        tail = np.concatenate([np.cumsum(later[:, :, ::-1], axis=2)[:, :, ::-1], np.zeros((n_pop, n, 1))], axis=2)
+        duration = changeover + processing + batch_delay[:, :, None]
+        free = self._initial_machine_free_times()
+
+        # machine bound: per (individual, stage, machine) load, smallest head and smallest tail
+        slot = ((np.arange(n_pop)[:, None, None] * S + stages) * M + machines).ravel()
+        size = n_pop * S * M
+        load = np.bincount(slot, weights=duration.ravel(), minlength=size)
+        min_head = np.full(size, np.inf)
+        np.minimum.at(min_head, slot, head.ravel())
+        min_tail = np.full(size, np.inf)
+        np.minimum.at(min_tail, slot, tail.ravel())
+        free_all = np.broadcast_to(free, (n_pop, S, M)).ravel()
+        machine_bound = np.where(np.isfinite(min_head), np.maximum(free_all, min_head) + load + min_tail, -np.inf)
+        bounds = machine_bound.reshape(n_pop, -1).max(axis=1)
+
+        # chain bound: L[i] <= Stage 0 start of position i, end[i, s] >= L[i] + reach[i, s]
+        reach = head - head[:, :, :1] + duration
+        own = free[0, machines[:, :, 0]] + changeover[:, :, 0]
+        if S > 1:
+            before = np.cumsum(processing, axis=2) - processing
+            raw = np.empty((n_pop, n, S))
+            if n > 1:
+                raw[:, 1:] = self.changeover_times[stages, machines[:, :-1], seqs[:, :-1, None], seqs[:, 1:, None]]
+            gap = np.full((n_pop, n), -np.inf)
+            if n > 1:
+                gap[:, 1:] = (reach[:, :-1, 1:] + raw[:, 1:, 1:] - before[:, 1:, 1:]).min(axis=2)
+            if state is not None:
+                raw_0 = self.changeover_times[stages[1:], state["machines"][1:], state["recipe"], seqs[:, :1]]
+                first = (np.asarray(state["end_times"])[1:] + raw_0 - before[:, 0, 1:]).min(axis=1)
+                own[:, 0] = np.maximum(own[:, 0], first)
+            # L[i] = max(own[i], L[i - 1] + gap[i]) = G[i] + max_{j <= i} (own[j] - G[j]), G prefix sums of gap
+            G = np.cumsum(np.where(np.isfinite(gap), gap, 0), axis=1)
+            chain = G + np.maximum.accumulate(own - G, axis=1)
+        else:
+            chain = own
+        bounds = np.maximum(bounds, (chain + reach[:, :, -1]).max(axis=1))
+        # keep the bounds below the simulated values despite rounding in the different summation order
+        bounds -= 1e-9 * np.abs(bounds)
+        return np.maximum(bounds, self._makespan_floor())
+
+    def _evaluate_population(self, X):
+        if self.parallel and not self.debug:
+            if self._evaluator is None:
+                from parallel_evaluation import ParallelEvaluator
+                self._evaluator = ParallelEvaluator(self, mode=self.parallel, n_workers=self.n_workers)
+            return self._evaluator.evaluate(X)
+        return self.evaluate_values(X)
+
+    def _evaluate_cached(self, X):
+        # Look up every individual, evaluate each missing canonical genome only once
+        X = np.asarray(X)
+        keys = self.canonical_keys(X)
+        values = np.empty((len(X), self.n_obj + self.n_ieq_constr) if self.multi_objective else len(X))
+        missing = {}
+        for k, key in enumerate(keys):
+            value = self.cache.get(key)
+            if value is None:
+                missing.setdefault(key, []).append(k)
+            else:
+                values[k] = value
+        if missing:
+            rows = [positions[0] for positions in missing.values()]
+            new_values = self._evaluate_population(X[rows])
+            for (key, positions), value in zip(missing.items(), new_values):
+                self.cache.put(key, value)
+                values[positions] = value
+        return values
+
+    def _identical_machine_classes(self):
+        # Per stage, groups (ascending machine indices) of machines with identical processing and changeover times.
+        # With an initial state machines also need the same free time and the same role for the last frozen task.
+        free = self._initial_machine_free_times()
+        last = self.initial_state["machines"] if self._has_previous(self.initial_state) else None
+        classes = []
+        for s in range(self.n_stages):
+            groups = {}
+            for m in range(self.machines_per_stage[s]):
+                signature = (np.asarray(self.processing_times[s, m]).tobytes(), np.asarray(self.changeover_times[s, m]).tobytes(),
+                             float(free[s, m]), last is not None and int(last[s]) == m)
+                groups.setdefault(signature, []).append(m)
+            classes.append([np.array(group) for group in groups.values() if len(group) > 1])
+        return classes
+
+    def canonical_machine_choices(self, X):
+        '''
+        Machine choices of every row of X with identical machines relabelled in order of first use,
+        so genomes that only swap identical machines get the same assignment.
+        '''
+        X = np.asarray(X).astype(int, copy=False)
+        machine_choices = X[:, self.seq_length:].reshape(len(X), self.seq_length, self.n_stages).copy()
+        for s, groups in enumerate(self._machine_classes):
+            for group in groups:
+                column = machine_choices[:, :, s].copy()
+                used = column[:, :, None] == group[None, None, :]
+                # position of first use of each machine of the group, unused machines last
+                first_use = np.where(used.any(axis=1), used.argmax(axis=1), self.seq_length)
+                rank = np.argsort(np.argsort(first_use, axis=1, kind="stable"), axis=1)
+                relabel = np.broadcast_to(group[rank][:, None, :], used.shape)
+                machine_choices[:, :, s] = np.where(used.any(axis=2), (relabel * used).sum(axis=2), column)
+        return machine_choices
+
+    def canonical_keys(self, X):
+        # Recipe sequence plus canonical machine assignment; batch sizes belong to positions, not orders.
+        # With due dates orders of the same recipe differ, so the order sequence is used instead.
+        X = np.asarray(X).astype(int, copy=False)
+        seqs = X[:, :self.seq_length] if self.due_dates is not None else self.user_sequence[X[:, :self.seq_length]]
+        machine_choices = self.canonical_machine_choices(X).reshape(len(X), -1)
+        keys = np.ascontiguousarray(np.hstack([seqs, machine_choices]), dtype=np.int32)
+        return [row.tobytes() for row in keys]
+
+    def evaluate_makespans(self, X):
+        # Serial evaluation of a population, batched when vectorized is set
+        if self.vectorized and not self.debug:
+            return self.calculate_makespan_batch(X)
+        return np.array([self.calculate_makespan(x, store_best=False) for x in X])
+
+    def evaluate_values(self, X):
+        '''
+        Serial evaluation of a population: makespans, or in multi-objective mode an (n_pop, n_obj + n_ieq_constr)
+        array of the objectives followed by the lateness constraint, all from the same simulation pass.
+        '''
+        if not self.multi_objective:
+            return self.evaluate_makespans(X)
+        if self.vectorized and not self.debug:
+            return self.calculate_objectives_batch(X)
+        return np.array([self.calculate_objectives(x) for x in X]).reshape(len(X), self.n_obj + self.n_ieq_constr)
 
-        if self.debug:
-            print(f"Perm: {perm}, Sequence: {[recipe_ids[idx] for idx in seq]}")
-            print(f"Machine choices:\n{machine_choices}")
+    def close(self):
+        # Stop the worker pool of parallel evaluation and release its shared memory
+        if self._evaluator is not None:
+            self._evaluator.close()
+            self._evaluator = None
+
+    def _get_workspace(self, n_pop):
+        # Buffers are reused between generations and only reallocated when the population size changes
+        if self._workspace is None or self._workspace["n_pop"] != n_pop:
+            self._workspace = {
+                "n_pop": n_pop,
+                "rows": np.arange(n_pop),
+                "machine_free_times": np.zeros((n_pop, self.n_stages, self.max_machines)),
+                "prev_end": np.zeros((n_pop, self.n_stages)),
+                "end": np.zeros((n_pop, self.n_stages)),
+                "changeover": np.zeros((n_pop, self.n_stages)),
+                "processing": np.zeros((n_pop, self.n_stages)),
+                "makespan": np.zeros(n_pop),
+                "waiting": np.zeros((n_pop, self.n_stages)),
+                "total_changeover": np.zeros(n_pop),
+                "total_waiting": np.zeros(n_pop),
+                "lateness": np.zeros(n_pop),
+            }
+        return self._workspace
+
+    def calculate_makespan_batch(self, X):
+        '''
+        Makespans of a whole population at once.
+
+        Sequence positions are simulated one after another (each depends on the previous one),
+        individuals and stages are handled as array operations. Gives the same values as
+        calling calculate_makespan on every row of X, postponement included.
+        '''
+        X = np.asarray(X).astype(int, copy=False)
+        n_pop = X.shape[0]
+        ws = self._get_workspace(n_pop)
+        rows = ws["rows"]
+        machine_free_times = ws["machine_free_times"]
+        prev_end, end = ws["prev_end"], ws["end"]
+        changeover, processing = ws["changeover"], ws["processing"]
+        makespan = ws["makespan"]
+        state = self.initial_state
+        machine_free_times[:] = self._initial_machine_free_times()
+        makespan.fill(self._makespan_floor())
+        # further objectives are accumulated in the same pass (multi-objective mode only)
+        waiting = ws["waiting"] if self.multi_objective else None
+        total_changeover, total_waiting, lateness = ws["total_changeover"], ws["total_waiting"], ws["lateness"]
+        if waiting is not None:
+            waiting.fill(0)
+            total_changeover.fill(0)
+            total_waiting.fill(0)
+            lateness.fill(-np.inf)
+        perms = X[:, :self.seq_length]
+        if self._has_previous(state):
+            prev_end[:] = state["end_times"]
+
+        stages = np.arange(self.n_stages)
+        batch_sizes = np.asarray(self.batch_sizes)
+        tact_times = np.asarray(self.tact_times)
+        seqs = self.user_sequence[X[:, :self.seq_length]]
+        machine_choices = X[:, self.seq_length:].reshape(n_pop, self.seq_length, self.n_stages)
 
         for i in range(self.seq_length):
-            recipe = seq[i]
-            prev_recipe = seq[i - 1] if i > 0 else None
-
-            # Compute changeover times
-            for s in range(self.n_stages):
-                m = machine_choices[i, s]
-                if i == 0 or prev_recipe is None:
-                    changeover_times_array[i, s] = 0
-                else:
-                    changeover = self.changeover_times[s, m, prev_recipe, recipe] if prev_recipe != recipe else 0
-                    changeover_times_array[i, s] = changeover.item() if isinstance(changeover, np.ndarray) else changeover
-
-            # Compute earliest possible start time for Stage 0
-            s = 0
+            recipe = seqs[:, i]
+            m_all = machine_choices[:, i, :]
+            batch_delay = (batch_sizes[i] - 1) * tact_times[recipe]
+            processing[:] = self.processing_times[stages, m_all, recipe[:, None]]
+
+            # Compute changeover times for every stage
+            if i == 0 and not self._has_previous(state):
+                prev_recipe = None
+                changeover.fill(0)
+            else:
+                prev_recipe = seqs[:, i - 1] if i > 0 else np.full(n_pop, state["recipe"])
+                raw = self.changeover_times[stages, m_all, prev_recipe[:, None], recipe[:, None]]
+                changeover[:] = np.where((prev_recipe != recipe)[:, None], raw, 0)
+
+            # Stage 0
+            m = m_all[:, 0]
+            start_0 = np.maximum(0, machine_free_times[rows, 0, m])
+            if prev_recipe is not None:
+                start_0 += changeover[:, 0]
+            end[:, 0] = start_0 + changeover[:, 0] + processing[:, 0] + batch_delay
+            machine_free_times[rows, 0, m] = end[:, 0]
+
+            # Subsequent stages
+            self._batch_later_stages(prev_recipe is not None, rows, m_all, batch_delay, machine_free_times, end, changeover, processing, waiting)
+
+            # Postponement of Stage 0, same rule as calculate_makespan
+            if prev_recipe is not None and self.n_stages > 1:
+                m_prev = machine_choices[:, i - 1, 1:] if i > 0 else np.broadcast_to(state["machines"][1:], (n_pop, self.n_stages - 1))
+                machine_ready = prev_end[:, 1:] + self.changeover_times[stages[1:], m_prev, prev_recipe[:, None], recipe[:, None]]
+                cumulative_proc_time = np.cumsum(processing[:, :-1], axis=1)
+                required_start = machine_ready - cumulative_proc_time
+                new_start = np.maximum(start_0, required_start.min(axis=1))
+                postpone = new_start > start_0
+                if postpone.any():
+                    p_rows = rows[postpone]
+                    p_end = end[postpone]
+                    p_free = machine_free_times[postpone]
+                    p_m_all = m_all[postpone]
+                    p_rows_local = np.arange(len(p_rows))
+                    p_waiting = None if waiting is None else waiting[postpone]
+                    p_end[:, 0] = new_start[postpone] + changeover[postpone, 0] + processing[postpone, 0] + batch_delay[postpone]
+                    p_free[p_rows_local, 0, p_m_all[:, 0]] = p_end[:, 0]
+                    self._batch_later_stages(True, p_rows_local, p_m_all, batch_delay[postpone], p_free, p_end,
+                                             changeover[postpone], processing[postpone], p_waiting)
+                    end[p_rows] = p_end
+                    machine_free_times[p_rows] = p_free
+                    if waiting is not None:
+                        waiting[p_rows] = p_waiting
+
+            np.maximum(makespan, end.max(axis=1), out=makespan)
+            if waiting is not None:
+                total_changeover += changeover.sum(axis=1)
+                total_waiting += waiting[:, 1:].sum(axis=1)
+                if self.due_dates is not None:
+                    np.maximum(lateness, end[:, -1] - self.due_dates[perms[:, i]], out=lateness)
+            prev_end[:] = end
+
+        return makespan.copy()
+
+    def calculate_objectives_batch(self, X):
+        # Objectives and lateness of a whole population from one calculate_makespan_batch pass
+        makespan = self.calculate_makespan_batch(X)
+        ws = self._workspace
+        return self._objective_columns(makespan, ws["total_changeover"], ws["total_waiting"], ws["lateness"])
+
+    def _objective_columns(self, makespan, total_changeover, total_waiting, lateness):
+        columns = {"makespan": makespan, "changeover": total_changeover, "waiting": total_waiting}
+        values = [columns[name] for name in self.objectives]
+        if self.due_dates is not None:
+            values.append(lateness)
+        return np.column_stack(values) if np.ndim(makespan) else np.array(values, dtype=float)
+
+    def _batch_later_stages(self, has_previous, rows, m_all, batch_delay, machine_free_times, end, changeover, processing, waiting=None):
+        for s in range(1, self.n_stages):
+            m = m_all[:, s]
+            free = machine_free_times[rows, s, m]
+            co = changeover[:, s]
+            prev_stage_end_first = end[:, s - 1] - batch_delay
+            start = np.maximum(prev_stage_end_first + co, free)
+            if has_previous:
+                start = np.where(co > 0, np.maximum(start, free + co), start)
+            end[:, s] = start + co + processing[:, s] + batch_delay
+            machine_free_times[rows, s, m] = end[:, s]
+            if waiting is not None:
+                # time the batch is held between stages beyond its changeover
+                waiting[:, s] = np.maximum(start - prev_stage_end_first - co, 0)
+
+    def _simulate_position(self, i, seq, machine_choices, start_times, end_times, changeover_times_array, machine_free_times):
+        # One step of the left-to-right scan of calculate_makespan: schedules sequence position i in place.
+        # Returns whether the Stage 0 start was postponed.
+        postponed = False
+        recipe = seq[i]
+        if i > 0:
+            prev_recipe, prev_machines, prev_end_times = seq[i - 1], machine_choices[i - 1], end_times[i - 1]
+        elif self._has_previous(self.initial_state):
+            # first position of a window: the last frozen task is the previous one
+            prev_recipe, prev_machines, prev_end_times = (self.initial_state[key] for key in ("recipe", "machines", "end_times"))
+        else:
+            prev_recipe = None
+
+        # Compute changeover times
+        for s in range(self.n_stages):
+            m = machine_choices[i, s]
+            if prev_recipe is None:
+                changeover_times_array[i, s] = 0
+            else:
+                changeover = self.changeover_times[s, m, prev_recipe, recipe] if prev_recipe != recipe else 0
+                changeover_times_array[i, s] = changeover.item() if isinstance(changeover, np.ndarray) else changeover
+
+        # Compute earliest possible start time for Stage 0
+        s = 0
+        m = machine_choices[i, s]
+        start_times[i, s] = max(0, machine_free_times[s, m])
+        if prev_recipe is not None:
+            start_times[i, s] += changeover_times_array[i, s]
+        processing_duration = self.processing_times[s, m, recipe]
+        batch_delay = (self.batch_sizes[i] - 1) * self.tact_times[recipe]  # Use batch_sizes[i]
+        end_times[i, s] = start_times[i, s] + changeover_times_array[i, s] + processing_duration + batch_delay
+        machine_free_times[s, m] = end_times[i, s]
+
+        # Compute start and end times for subsequent stages
+        for s in range(1, self.n_stages):
             m = machine_choices[i, s]
-            start_times[i, s] = max(0, machine_free_times[s, m])
-            if i > 0:
-                start_times[i, s] += changeover_times_array[i, s]
+            prev_stage_end_first = end_times[i, s - 1] - (self.batch_sizes[i] - 1) * self.tact_times[recipe]
+            changeover = changeover_times_array[i, s]
+            start_times[i, s] = max(prev_stage_end_first + changeover, machine_free_times[s, m])
+            if prev_recipe is not None and changeover > 0:
+                start_times[i, s] = max(start_times[i, s], machine_free_times[s, m] + changeover)
             processing_duration = self.processing_times[s, m, recipe]
-            batch_delay = (self.batch_sizes[i] - 1) * self.tact_times[recipe]  # Use batch_sizes[i]
+            batch_delay = (self.batch_sizes[i] - 1) * self.tact_times[recipe]
             end_times[i, s] = start_times[i, s] + changeover_times_array[i, s] + processing_duration + batch_delay
             machine_free_times[s, m] = end_times[i, s]
 
-            # Compute start and end times for subsequent stages
+        # Postponement: Adjust Stage 0 start time if necessary, but minimize delays
+        if prev_recipe is not None:
+            postponement_candidates = []
             for s in range(1, self.n_stages):
-                m = machine_choices[i, s]
-                prev_stage_end_first = end_times[i, s - 1] - (self.batch_sizes[i] - 1) * self.tact_times[recipe]
-                changeover = changeover_times_array[i, s]
-                start_times[i, s] = max(prev_stage_end_first + changeover, machine_free_times[s, m])
-                if i > 0 and changeover > 0:
-                    start_times[i, s] = max(start_times[i, s], machine_free_times[s, m] + changeover)
-                processing_duration = self.processing_times[s, m, recipe]
-                batch_delay = (self.batch_sizes[i] - 1) * self.tact_times[recipe]
-                end_times[i, s] = start_times[i, s] + changeover_times_array[i, s] + processing_duration + batch_delay
-                machine_free_times[s, m] = end_times[i, s]
-
-            # Postponement: Adjust Stage 0 start time if necessary, but minimize delays
-            if i > 0:
-                postponement_candidates = []
-                for s in range(1, self.n_stages):
-                    m_prev = machine_choices[i - 1, s]
-                    machine_ready = end_times[i - 1, s] + self.changeover_times[s, m_prev, prev_recipe, recipe]
-                    cumulative_proc_time = sum(self.processing_times[k, machine_choices[i, k], recipe] for k in range(s))
-                    required_start = machine_ready - cumulative_proc_time
-                    postponement_candidates.append(required_start)
-
-                if postponement_candidates:
-                    original_start = start_times[i, 0]
-                    new_start = max(original_start, min(postponement_candidates))
-                    if new_start > original_start:
-                        # Shift Stage 0 and recalculate subsequent stages
-                        start_times[i, 0] = new_start
-                        s = 0
+                m_prev = prev_machines[s]
+                machine_ready = prev_end_times[s] + self.changeover_times[s, m_prev, prev_recipe, recipe]
+                cumulative_proc_time = sum(self.processing_times[k, machine_choices[i, k], recipe] for k in range(s))
+                required_start = machine_ready - cumulative_proc_time
+                postponement_candidates.append(required_start)
+
+            if postponement_candidates:
+                original_start = start_times[i, 0]
+                new_start = max(original_start, min(postponement_candidates))
+                if new_start > original_start:
+                    # Shift Stage 0 and recalculate subsequent stages
+                    postponed = True
+                    start_times[i, 0] = new_start
+                    s = 0
+                    m = machine_choices[i, s]
+                    processing_duration = self.processing_times[s, m, recipe]
+                    batch_delay = (self.batch_sizes[i] - 1) * self.tact_times[recipe]
+                    end_times[i, s] = start_times[i, s] + changeover_times_array[i, s] + processing_duration + batch_delay
+                    machine_free_times[s, m] = end_times[i, s]
+
+                    # Recalculate subsequent stages
+                    for s in range(1, self.n_stages):
                         m = machine_choices[i, s]
+                        prev_stage_end_first = end_times[i, s - 1] - (self.batch_sizes[i] - 1) * self.tact_times[recipe]
+                        changeover = changeover_times_array[i, s]
+                        start_times[i, s] = max(prev_stage_end_first + changeover, machine_free_times[s, m])
+                        if changeover > 0:
+                            start_times[i, s] = max(start_times[i, s], machine_free_times[s, m] + changeover)
                         processing_duration = self.processing_times[s, m, recipe]
                         batch_delay = (self.batch_sizes[i] - 1) * self.tact_times[recipe]
                         end_times[i, s] = start_times[i, s] + changeover_times_array[i, s] + processing_duration + batch_delay
                         machine_free_times[s, m] = end_times[i, s]
 
-                        # Recalculate subsequent stages
-                        for s in range(1, self.n_stages):
-                            m = machine_choices[i, s]
-                            prev_stage_end_first = end_times[i, s - 1] - (self.batch_sizes[i] - 1) * self.tact_times[recipe]
-                            changeover = changeover_times_array[i, s]
-                            start_times[i, s] = max(prev_stage_end_first + changeover, machine_free_times[s, m])
-                            if i > 0 and changeover > 0:
-                                start_times[i, s] = max(start_times[i, s], machine_free_times[s, m] + changeover)
-                            processing_duration = self.processing_times[s, m, recipe]
-                            batch_delay = (self.batch_sizes[i] - 1) * self.tact_times[recipe]
-                            end_times[i, s] = start_times[i, s] + changeover_times_array[i, s] + processing_duration + batch_delay
-                            machine_free_times[s, m] = end_times[i, s]
-
-            if self.debug:
-                for s in range(self.n_stages):
-                    m = machine_choices[i, s]
-                    print(f"Recipe {i} (ID {recipe_ids[recipe]}): Stage {s}, Machine {m}: "
-                          f"Start = {start_times[i, s]}, Changeover = {changeover_times_array[i, s]}, "
-                          f"Processing = {self.processing_times[s, m, recipe]}, Batch Delay = {batch_delay}, "
-                          f"End = {end_times[i, s]}, Machine free at = {machine_free_times[s, m]}")
+        return postponed
 
-        makespan = np.max(end_times)
-        if self.debug:
-            print(f"Calculated makespan in calculate_makespan: {makespan}")
+    def makespan_checkpoints(self, x):
+        '''
+        Simulate x once and keep the state before every sequence position, for delta_makespan.
+
+        machine_free_times[k] is the machine state before position k; the time arrays hold the
+        rows of x, of which rows 0..k-1 are still valid for any genome that agrees with x before k.
+        '''
+        x = np.asarray(x).astype(int, copy=False)
+        seq = self.user_sequence[x[:self.seq_length]]
+        machine_choices = x[self.seq_length:].reshape(self.seq_length, self.n_stages)
+        start_times = np.zeros((self.seq_length, self.n_stages))
+        end_times = np.zeros((self.seq_length, self.n_stages))
+        changeover_times_array = np.zeros((self.seq_length, self.n_stages))
+        machine_free_times = np.zeros((self.seq_length + 1, self.n_stages, self.max_machines))
+        machine_free_times[0] = self._initial_machine_free_times()
+
+        for i in range(self.seq_length):
+            machine_free_times[i + 1] = machine_free_times[i]
+            self._simulate_position(i, seq, machine_choices, start_times, end_times, changeover_times_array, machine_free_times[i + 1])
+
+        return {
+            "seq": seq,
+            "machine_choices": machine_choices.copy(),
+            "start_times": start_times,
+            "end_times": end_times,
+            "changeover_times": changeover_times_array,
+            "machine_free_times": machine_free_times,
+            "makespan": np.maximum(np.max(end_times), self._makespan_floor()),
+        }
+
+    def first_changed_position(self, checkpoints, x):
+        # First sequence position whose recipe or machine choices differ from the checkpointed genome
+        x = np.asarray(x).astype(int, copy=False)
+        seq = self.user_sequence[x[:self.seq_length]]
+        machine_choices = x[self.seq_length:].reshape(self.seq_length, self.n_stages)
+        changed = (seq != checkpoints["seq"]) | (machine_choices != checkpoints["machine_choices"]).any(axis=1)
+        return int(changed.argmax()) if changed.any() else self.seq_length
+
+    def delta_makespan(self, checkpoints, x, return_checkpoints=False):
+        '''
+        Makespan of x resumed from the checkpoints of a base genome at the first changed position.
+
+        Gives the same value as calculate_makespan(x). With return_checkpoints, also returns the
+        checkpoints of x, so a local search can move to x without simulating it again.
+        '''
+        x = np.asarray(x).astype(int, copy=False)
+        k = self.first_changed_position(checkpoints, x)
+        if k == self.seq_length and not return_checkpoints:
+            return checkpoints["makespan"]
+
+        seq = self.user_sequence[x[:self.seq_length]]
+        machine_choices = x[self.seq_length:].reshape(self.seq_length, self.n_stages)
+        start_times = checkpoints["start_times"].copy()
+        end_times = checkpoints["end_times"].copy()
+        changeover_times_array = checkpoints["changeover_times"].copy()
+
+        if return_checkpoints:
+            machine_free_times = checkpoints["machine_free_times"].copy()
+            for i in range(k, self.seq_length):
+                machine_free_times[i + 1] = machine_free_times[i]
+                self._simulate_position(i, seq, machine_choices, start_times, end_times, changeover_times_array, machine_free_times[i + 1])
+        else:
+            free = checkpoints["machine_free_times"][k].copy()
+            for i in range(k, self.seq_length):
+                self._simulate_position(i, seq, machine_choices, start_times, end_times, changeover_times_array, free)
+
+        makespan = np.maximum(np.max(end_times), self._makespan_floor())
+        if not return_checkpoints:
+            return makespan
+        return makespan, {
+            "seq": seq,
+            "machine_choices": machine_choices.copy(),
+            "start_times": start_times,
+            "end_times": end_times,
+            "changeover_times": changeover_times_array,
+            "machine_free_times": machine_free_times,
+            "makespan": makespan,
+        }
+
+    def local_search(self, x, neighbourhood="swap", max_passes=10):
+        '''
+        First-improvement local search over the order permutation of x with swap or insert moves,
+        each neighbour evaluated with delta_makespan.
+
+        Return data: improved genome and its makespan.
+        '''
+        if neighbourhood not in ("swap", "insert"):
+            raise ValueError(f"neighbourhood must be 'swap' or 'insert', got {neighbourhood!r}")
+        x = np.asarray(x).astype(int).copy()
+        checkpoints = self.makespan_checkpoints(x)
+        n = self.seq_length
+
+        for _ in range(max_passes):
+            improved = False
+            for a in range(n):
+                for b in range(a + 1, n) if neighbourhood == "swap" else range(n):
+                    if a == b:
+                        continue
+                    y = x.copy()
+                    if neighbourhood == "swap":
+                        y[a], y[b] = y[b], y[a]
+                    else:
+                        order = list(y[:n])
+                        order.insert(b, order.pop(a))
+                        y[:n] = order
+                    makespan = self.delta_makespan(checkpoints, y)
+                    if makespan < checkpoints["makespan"]:
+                        makespan, checkpoints = self.delta_makespan(checkpoints, y, return_checkpoints=True)
+                        x = y
+                        improved = True
+            if not improved:
+                break
+
+        return x, checkpoints["makespan"]
+
+    @staticmethod
+    def _has_previous(state):
+        return state is not None and state.get("recipe") is not None
+
+    def _initial_machine_free_times(self):
+        if self.initial_state is None:
+            return np.zeros((self.n_stages, self.max_machines))
+        return np.array(self.initial_state["machine_free_times"], dtype=float)
+
+    def _makespan_floor(self):
+        # Frozen tasks still count towards the makespan of the whole horizon
+        return -np.inf if self.initial_state is None else self.initial_state["makespan"]
+
+    def line_state(self, x, n_frozen=None, t_now=None):
+        '''
+        State of the line after the first positions of x are frozen, as initial_state of a window problem.
+
+        n_frozen positions are frozen, or with t_now every leading position whose Stage 0 start is before t_now;
+        with t_now no remaining task starts before it. The state holds the machine free times, the recipe,
+        machines and end times of the last frozen task (its changeover to the next recipe is still pending),
+        the makespan of the frozen tasks and the remaining orders (indices into user_sequence, in the order of x).
+        '''
+        if n_frozen is None and t_now is None:
+            raise ValueError("give n_frozen or t_now")
+        x = np.asarray(x).astype(int, copy=False)
+        checkpoints = self.makespan_checkpoints(x)
+        if n_frozen is None:
+            started = checkpoints["start_times"][:, 0] < t_now
+            n_frozen = self.seq_length if started.all() else int(started.argmin())
+
+        k = n_frozen
+        previous = self.initial_state if k == 0 else {
+            "recipe": int(checkpoints["seq"][k - 1]),
+            "machines": checkpoints["machine_choices"][k - 1].copy(),
+            "end_times": checkpoints["end_times"][k - 1].copy(),
+        }
+        machine_free_times = checkpoints["machine_free_times"][k].copy()
+        if t_now is not None:
+            np.maximum(machine_free_times, t_now, out=machine_free_times)
+        frozen_makespan = np.max(checkpoints["end_times"][:k]) if k else -np.inf
+        return {
+            "machine_free_times": machine_free_times,
+            "recipe": None if previous is None else previous.get("recipe"),
+            "machines": None if previous is None else previous.get("machines"),
+            "end_times": None if previous is None else previous.get("end_times"),
+            "makespan": max(frozen_makespan, self._makespan_floor()),
+            "n_frozen": k + (0 if self.initial_state is None else self.initial_state.get("n_frozen", 0)),
+            "remaining": x[k:self.seq_length].copy(),
+            "remaining_machines": checkpoints["machine_choices"][k:].copy(),
+            "remaining_batch_sizes": np.asarray(self.batch_sizes)[k:].copy(),
+        }
+
+    def window_problem(self, state, user_sequence=None, batch_sizes=None, **kwargs):
+        '''
+        Problem over the remaining orders of a line_state, starting from that state.
+
+        By default the remaining orders keep their batch sizes; give user_sequence and batch_sizes
+        for a changed order book (see rolling_horizon.replan). Other keyword arguments go to the constructor.
+        '''
+        if user_sequence is None:
+            user_sequence = self.user_sequence[state["remaining"]]
+            batch_sizes = state["remaining_batch_sizes"]
+            if self.due_dates is not None:
+                kwargs.setdefault("due_dates", self.due_dates[state["remaining"]])
+        kwargs.setdefault("vectorized", self.vectorized)
+        kwargs.setdefault("objectives", self.objectives)
+        kwargs.setdefault("cache_size", self.cache.max_size if self.cache is not None else None)
+        return BakeryHybridSchedulingProblem(
+            user_sequence, self.recipe_id_to_index, self.machines_per_stage, self.processing_times,
+            self.changeover_times, batch_sizes, self.tact_times, initial_state=state, **kwargs)
+
+    def warm_start_genome(self, state):
+        # Genome of the default window problem that continues the previous plan: same order, same machines
+        n = len(state["remaining"])
+        return np.concatenate([np.arange(n), state["remaining_machines"].ravel()]).astype(int)
+
+    def recipe_id(self, recipe):
+        return self.index_to_recipe_id.get(recipe, recipe)
+
+    def _simulate(self, x):
+        # Left-to-right scan of genome x; returns the arrays of the schedule
+        perm = x[:self.seq_length]
+        machine_choices = x[self.seq_length:].reshape(self.seq_length, self.n_stages)
+        seq = self.user_sequence[perm]
+        start_times = np.zeros((self.seq_length, self.n_stages))
+        end_times = np.zeros((self.seq_length, self.n_stages))
+        changeover_times_array = np.zeros((self.seq_length, self.n_stages))
+        machine_free_times = self._initial_machine_free_times()
+        postponed = np.zeros(self.seq_length, dtype=bool)
+
+        for i in range(self.seq_length):
+            postponed[i] = self._simulate_position(i, seq, machine_choices, start_times, end_times, changeover_times_array, machine_free_times)
+
+        return perm, seq, machine_choices, start_times, end_times, changeover_times_array, postponed
+
+    def calculate_makespan(self, x, store_best=True, trace=False):
+        '''
+        Makespan of genome x.
+
+        With trace (or debug) set, every task is recorded into a schedule_trace record array,
+        kept as self.last_trace; store_best keeps it as self.best_trace for plot_gantt_chart.
+        '''
+        perm, seq, machine_choices, start_times, end_times, changeover_times_array, postponed = self._simulate(x)
+        trace = trace or self.debug or store_best
+
+        makespan = np.maximum(np.max(end_times), self._makespan_floor())
+
+        if trace:
+            self.last_trace = self.build_trace(perm, machine_choices, start_times, end_times, changeover_times_array, postponed)
 
         if store_best:
             self.best_start_times = start_times
             self.best_end_times = end_times
             self.best_machine_choices = machine_choices
-            self.best_sequence_ids = [recipe_ids[idx] for idx in seq]
+            self.best_sequence_ids = [self.recipe_id(idx) for idx in seq]
             self.best_changeover_times = changeover_times_array
+            self.best_trace = self.last_trace
             self.max_makespan = makespan
 
         return makespan
 
-    def plot_gantt_chart(self):
-        fig, ax = plt.subplots(figsize=(12, 6))
-        stage_labels = [f"Stage {s} (Machine {m})" for s in range(self.n_stages) for m in range(self.machines_per_stage[s])]
-        y_positions = np.arange(len(stage_labels))
-        colors = {recipe_id: plt.cm.Set3(i) for i, recipe_id in enumerate(np.unique(self.best_sequence_ids))}
+    def calculate_objectives(self, x):
+        '''
+        Objective values of genome x in the order of self.objectives, followed by the lateness constraint
+        (latest completion minus due date over all orders) when due_dates are set.
 
-        for i in range(self.seq_length):
-            recipe_id = self.best_sequence_ids[i]
-            for s in range(self.n_stages):
-                m = self.best_machine_choices[i, s]
-                stage_idx = sum(self.machines_per_stage[:s]) + m
-                print(f"Processing Recipe {i} (ID {recipe_id}), Stage {s}, Machine {m}, Stage_idx {stage_idx}")
-                if self.best_start_times[i, s] < self.best_end_times[i, s]:
-                    print(f"  Plotting: Start={self.best_start_times[i, s]}, End={self.best_end_times[i, s]}, Changeover={self.best_changeover_times[i, s]}")
-                    if self.best_changeover_times[i, s] > 0:
-                        ax.barh(y_positions[stage_idx], self.best_changeover_times[i, s],
-                                left=self.best_start_times[i, s], height=0.5, color='red', edgecolor='black', alpha=0.7,
-                                label='Changeover' if i == 0 and s == 0 else "")
-                        process_start = self.best_start_times[i, s] + self.best_changeover_times[i, s]
-                        print(f"  Changeover bar: Left={self.best_start_times[i, s]}, Width={self.best_changeover_times[i, s]}")
-                    else:
-                        process_start = self.best_start_times[i, s]
-                    process_duration = ((self.best_end_times[i, s] - self.best_start_times[i, s]) -
-                                        self.best_changeover_times[i, s])
-                    print(f"  Processing bar: Left={process_start}, Width={process_duration}")
-                    ax.barh(y_positions[stage_idx], process_duration,
-                            left=process_start, height=0.5, color=colors[recipe_id], edgecolor='black')
-                    ax.text(process_start + process_duration / 2, y_positions[stage_idx], f"{recipe_id}",
-                            ha='center', va='center', color='white', fontweight='bold')
-                if self.best_start_times[i, s] >= self.best_end_times[i, s]:
-                    print(f"Skipped task at Stage {s}, Machine {m}: Start={self.best_start_times[i, s]}, End={self.best_end_times[i, s]}")
-
-        ax.set_yticks(y_positions)
-        ax.set_yticklabels(stage_labels)
-        ax.set_xlabel("Time")
-        ax.set_title("Batch Production Scheduling - Multi-stage Flowshop Optimization")
-        ax.set_xlim(0, self.max_makespan + 10)
-        ax.set_ylim(-0.5, len(stage_labels) - 0.5)
-        handles = [plt.Rectangle((0,0),1,1, color=colors[rid], label=str(rid)) for rid in colors.keys()]
-        handles.append(plt.Rectangle((0,0),1,1, color='red', alpha=0.7, label='Changeover'))
-        ax.legend(handles=handles, loc='best', title="Recipe IDs")
-        plt.tight_layout()
-        plt.show()
\ No newline at end of file
+        total changeover: sum of all changeover times; total waiting: time batches are held between stages
+        beyond their changeover.
+        '''
+        perm, seq, _, start_times, end_times, changeover_times_array, _ = self._simulate(x)
+        makespan = np.maximum(np.max(end_times), self._makespan_floor())
+        # per-position sums accumulated in sequence order, as in calculate_makespan_batch
+        total_changeover = np.cumsum(changeover_times_array.sum(axis=1))[-1]
+        batch_delay = (np.asarray(self.batch_sizes) - 1) * np.asarray(self.tact_times)[seq]
+        waiting = start_times[:, 1:] - (end_times[:, :-1] - batch_delay[:, None]) - changeover_times_array[:, 1:]
+        total_waiting = np.cumsum(np.maximum(waiting, 0).sum(axis=1))[-1] if self.n_stages > 1 else 0.0
+        lateness = np.max(end_times[:, -1] - self.due_dates[perm]) if self.due_dates is not None else None
+        return self._objective_columns(makespan, total_changeover, total_waiting, lateness)
+
+    def build_trace(self, perm, machine_choices, start_times, end_times, changeover_times_array, postponed):
+        # Task records (position-major, then stage) from the arrays of one simulation
+        seq = self.user_sequence[perm]
+        trace = new_trace(self.seq_length * self.n_stages)
+        stages = np.arange(self.n_stages)
+        trace["position"] = np.repeat(np.arange(self.seq_length), self.n_stages)
+        trace["order"] = np.repeat(perm, self.n_stages)
+        trace["recipe"] = np.repeat(seq, self.n_stages)
+        trace["recipe_id"] = np.repeat([self.recipe_id(idx) for idx in seq], self.n_stages)
+        trace["stage"] = np.tile(stages, self.seq_length)
+        trace["machine"] = machine_choices.ravel()
+        trace["start"] = start_times.ravel()
+        trace["changeover"] = changeover_times_array.ravel()
+        trace["processing"] = self.processing_times[stages, machine_choices, seq[:, None]].ravel()
+        trace["batch_delay"] = np.repeat((np.asarray(self.batch_sizes) - 1) * np.asarray(self.tact_times)[seq], self.n_stages)
+        trace["end"] = end_times.ravel()
+        trace["postponed"] = np.repeat(postponed, self.n_stages)
+        return trace
+
+    def plot_gantt_chart(self, trace=None, path=None):
+        # Draws a trace of calculate_makespan, by default the one of the last store_best call.
+        # With path, renders headless and saves PNG/SVG or an HTML/JSON timeline instead of showing it.
+        trace = self.best_trace if trace is None else trace
+        if path is not None:
+            save_gantt(trace, self.machines_per_stage, path)
+            return
+        _, ax = plt.subplots(figsize=(12, 6))
+        render_gantt(trace, self.machines_per_stage, ax=ax)
+        plt.show()
@@ -0,0 +1,274 @@
+# Run `python benchmark.py --output results.json` in this folder to time the scheduling evaluators.
+# Compare two result files (e.g. of two commits) with `python benchmark.py --compare old.json new.json`.
+# `python benchmark.py --warm-start 80` compares generations-to-target of cold and archive-seeded GA runs.
+# `python benchmark.py --islands 200 --n-islands 4` compares an island-model run with one GA of the same total population.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import core
+from instance_generator import SCHEDULE_KEYS, change_orders, generate_instance, make_problem, random_population
+
+
+def timeit(func, repeats=5, min_time=0.0):
+    # Best and median seconds of one call; cheap calls are looped until min_time has passed
+    times = []
+    for _ in range(repeats):
+        n_calls, start_time = 0, time.perf_counter()
+        while True:
+            func()
+            n_calls += 1
+            elapsed = time.perf_counter() - start_time
+            if elapsed >= min_time:
+                break
+        times.append(elapsed / n_calls)
+    return {"best": min(times), "median": statistics.median(times), "repeats": repeats}
+
+
+def scaling_exponent(sizes, seconds):
+    # Slope of log(time) over log(size): ~1 linear, ~2 quadratic
+    if len(sizes) < 2:
+        return None
+    return float(np.polyfit(np.log(sizes), np.log(seconds), 1)[0])
+
+
+# * ------------------------------- Benchmarks -------------------------------- #
+
+def bench_calculate_makespan(instance, repeats):
+    problem = make_problem(instance)
+    x = random_population(problem, 1)[0]
+    return timeit(lambda: problem.calculate_makespan(x, store_best=False), repeats)
+
+
+def bench_evaluate(instance, pop_size, repeats, **problem_kwargs):
+    problem = make_problem(instance, **problem_kwargs)
+    X = random_population(problem, pop_size)
+    result = timeit(lambda: problem._evaluate(X, {}), repeats)
+    result["evals_per_sec"] = pop_size / result["best"]
+    problem.close()
+    return result
+
+
+def bench_make_schedule(instance, repeats, fast=False, compiled=False):
+    args = [instance[key] for key in SCHEDULE_KEYS]
+    if compiled:
+        # data set compiled once, as in a GA run over many sequences
+        compiled_instance = core.CompiledInstance(*args[:4])
+        return timeit(lambda: core.makespan_fast(*args, instance=compiled_instance), repeats, min_time=0.01)
+    if fast:
+        return timeit(lambda: core.makespan_fast(*args), repeats, min_time=0.01)
+    return timeit(lambda: core.make_schedule(*args), repeats)
+
+
+def bench_minimize_zdt1(n_gen, repeats):
+    from pymoo.algorithms.moo.nsga2 import NSGA2
+    from pymoo.optimize import minimize
+    from pymoo.problems import get_problem
+
+    problem = get_problem("zdt1")
+    return timeit(lambda: minimize(problem, NSGA2(pop_size=100), ("n_gen", n_gen), seed=1, verbose=False), repeats)
+
+
+def bench_minimize_scheduling(instance, n_gen, pop_size, repeats, **problem_kwargs):
+    from pymoo.algorithms.soo.nonconvex.ga import GA
+    from pymoo.optimize import minimize
+    from hybrid_operators import hybrid_operators
+
+    problem = make_problem(instance, **problem_kwargs)
+    result = timeit(lambda: minimize(problem, GA(pop_size=pop_size, **hybrid_operators(problem)),
+                                     ("n_gen", n_gen), seed=1, verbose=False), repeats)
+    problem.close()
+    return result
+
+
+def best_per_generation(problem, n_gen, pop_size, seed, sampling=None):
+    from pymoo.algorithms.soo.nonconvex.ga import GA
+    from pymoo.optimize import minimize
+    from hybrid_operators import hybrid_operators
+
+    operators = hybrid_operators(problem)
+    if sampling is not None:
+        operators["sampling"] = sampling
+    curve = []
+    res = minimize(problem, GA(pop_size=pop_size, **operators), ("n_gen", n_gen), seed=seed, verbose=False,
+                   callback=lambda algorithm: curve.append(float(algorithm.opt.get("F").min())))
+    return res, np.array(curve)
+
+
+def generations_to_target(curve, target):
+    reached = np.flatnonzero(curve <= target)
+    return int(reached[0]) + 1 if len(reached) else None
+
+
+def bench_warm_start(n_orders, n_changes=3, pop_size=100, n_gen=100, seeds=(1, 2, 3), **instance_kwargs):
+    '''
+    Generations until a GA on a changed order book reaches the final makespan of a cold run,
+    starting cold and starting from the elite archive of a run on the previous order book.
+    '''
+    from warm_start import EliteArchive
+
+    yesterday = generate_instance(n_orders, **instance_kwargs)
+    problem = make_problem(yesterday, vectorized=True)
+    archive = EliteArchive()
+    archive.add_result(problem, best_per_generation(problem, n_gen, pop_size, seed=0)[0])
+
+    results = []
+    for seed in seeds:
+        today = make_problem(change_orders(yesterday, n_changes, n_changes, seed=seed), vectorized=True)
+        _, cold = best_per_generation(today, n_gen, pop_size, seed)
+        _, warm = best_per_generation(today, n_gen, pop_size, seed, sampling=archive.initial_population(today, pop_size, seed=seed))
+        target = cold[-1]
+        results.append({
+            "seed": seed, "target": target, "cold_generations": generations_to_target(cold, target),
+            "warm_generations": generations_to_target(warm, target), "warm_initial_best": warm[0], "cold_initial_best": cold[0],
+            "warm_final_best": warm[-1],
+        })
+        print(f"warm_start n={n_orders:<5} seed={seed} target={target:10.2f} cold={results[-1]['cold_generations']} gen "
+              f"warm={results[-1]['warm_generations']} gen")
+    return results
+
+
+def bench_islands(n_orders, n_islands=4, pop_size=50, n_gen=100, migration_interval=10, seed=1, **instance_kwargs):
+    '''
+    Best makespan and wall time of island_minimize against one GA with n_islands * pop_size individuals.
+    '''
+    from island_model import island_minimize
+
+    instance = generate_instance(n_orders, **instance_kwargs)
+    problem = make_problem(instance, vectorized=True)
+    start_time = time.perf_counter()
+    res, _ = best_per_generation(problem, n_gen, n_islands * pop_size, seed)
+    single = {"makespan": float(res.F[0]), "wall_time": time.perf_counter() - start_time}
+    islands = island_minimize(problem, n_islands=n_islands, pop_size=pop_size, n_gen=n_gen, migration_interval=migration_interval, seed=seed)
+    results = {
+        "n_orders": n_orders, "n_islands": n_islands, "single": single,
+        "islands": {"makespan": float(islands["F"][0]), "wall_time": islands["wall_time"],
+                    "migration_time": max(island["migration_time"] for island in islands["islands"])},
+    }
+    for name in ("single", "islands"):
+        print(f"{name:<8} n={n_orders:<5} makespan={results[name]['makespan']:10.2f} wall={results[name]['wall_time']:8.2f} s")
+    return results
+
+
+def run(sizes, pop_size=100, n_gen=20, repeats=3, n_stages=5, machines_per_stage=None, n_recipes=6, seed=0, minimize_runs=True):
+    results = []
+    curves = {}
+
+    def record(name, n_orders, result):
+        results.append({"benchmark": name, "n_orders": n_orders, **result})
+        curves.setdefault(name, []).append((n_orders, result["best"]))
+        print(f"{name:<32} n={n_orders:<6} best={result['best'] * 1e3:10.3f} ms")
+
+    for n_orders in sizes:
+        instance = generate_instance(n_orders, n_stages=n_stages, machines_per_stage=machines_per_stage, n_recipes=n_recipes, seed=seed)
+        record("calculate_makespan", n_orders, bench_calculate_makespan(instance, repeats))
+        record("evaluate_scalar", n_orders, bench_evaluate(instance, pop_size, repeats))
+        record("evaluate_vectorized", n_orders, bench_evaluate(instance, pop_size, repeats, vectorized=True))
+        record("core_make_schedule", n_orders, bench_make_schedule(instance, repeats))
+        record("core_makespan_fast", n_orders, bench_make_schedule(instance, repeats, fast=True))
+        record("core_makespan_compiled", n_orders, bench_make_schedule(instance, repeats, compiled=True))
+
+    if minimize_runs:
+        record("minimize_zdt1_nsga2", 0, bench_minimize_zdt1(n_gen, repeats))
+        instance = generate_instance(sizes[-1], n_stages=n_stages, machines_per_stage=machines_per_stage, n_recipes=n_recipes, seed=seed)
+        record("minimize_scheduling_ga", sizes[-1], bench_minimize_scheduling(instance, n_gen, pop_size, repeats, vectorized=True))
+
+    scaling = {}
+    for name, points in curves.items():
+        if len(points) > 1:
+            sizes_, seconds = zip(*points)
+            scaling[name] = {"n_orders": list(sizes_), "seconds": list(seconds), "exponent": scaling_exponent(sizes_, seconds)}
+
+    return {"meta": _meta(pop_size, n_gen, repeats, n_stages, machines_per_stage, n_recipes, seed), "results": results, "scaling": scaling}
+
+
+def _meta(*settings):
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                         stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    names = ["pop_size", "n_gen", "repeats", "n_stages", "machines_per_stage", "n_recipes", "seed"]
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": dict(zip(names, settings)),
+    }
+
+
+def report_scaling(scaling, max_exponent=1.5):
+    print("\nScaling (time ~ n_orders ** exponent):")
+    for name, curve in scaling.items():
+        flag = "  <-- superlinear" if curve["exponent"] > max_exponent else ""
+        print(f"{name:<32} exponent={curve['exponent']:5.2f}{flag}")
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = {(r["benchmark"], r["n_orders"]): r["best"] for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = {(r["benchmark"], r["n_orders"]): r["best"] for r in json.load(f)["results"]}
+    for key in sorted(old.keys() & new.keys()):
+        print(f"{key[0]:<32} n={key[1]:<6} {old[key] * 1e3:10.3f} ms -> {new[key] * 1e3:10.3f} ms  x{old[key] / new[key]:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the scheduling evaluators on synthetic instances.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20, 40, 80])
+    parser.add_argument("--pop-size", type=int, default=100)
+    parser.add_argument("--n-gen", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--n-stages", type=int, default=5)
+    parser.add_argument("--machines-per-stage", type=int, nargs="+", default=None)
+    parser.add_argument("--n-recipes", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-minimize", action="store_true", help="skip the full minimize runs")
+    parser.add_argument("--output", default=None, help="write the results as JSON to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    parser.add_argument("--warm-start", type=int, metavar="N_ORDERS", help="only run the warm start benchmark on N_ORDERS orders")
+    parser.add_argument("--n-changes", type=int, default=3, help="orders cancelled and added between runs for --warm-start")
+    parser.add_argument("--islands", type=int, metavar="N_ORDERS", help="only run the island model benchmark on N_ORDERS orders")
+    parser.add_argument("--n-islands", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        sys.exit()
+
+    if args.warm_start:
+        results = bench_warm_start(args.warm_start, args.n_changes, pop_size=args.pop_size, n_gen=max(args.n_gen, 50),
+                                   n_stages=args.n_stages, machines_per_stage=args.machines_per_stage, n_recipes=args.n_recipes, seed=args.seed)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump({"meta": _meta(args.pop_size, args.n_gen, 1, args.n_stages, args.machines_per_stage, args.n_recipes, args.seed),
+                           "warm_start": results}, f, indent=2)
+        sys.exit()
+
+    if args.islands:
+        results = bench_islands(args.islands, args.n_islands, pop_size=args.pop_size, n_gen=args.n_gen, n_stages=args.n_stages,
+                                machines_per_stage=args.machines_per_stage, n_recipes=args.n_recipes, seed=args.seed)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump({"meta": _meta(args.pop_size, args.n_gen, 1, args.n_stages, args.machines_per_stage, args.n_recipes, args.seed),
+                           "islands": results}, f, indent=2)
+        sys.exit()
+
+    report = run(args.sizes, pop_size=args.pop_size, n_gen=args.n_gen, repeats=args.repeats, n_stages=args.n_stages,
+                 machines_per_stage=args.machines_per_stage, n_recipes=args.n_recipes, seed=args.seed,
+                 minimize_runs=not args.no_minimize)
+    report_scaling(report["scaling"])
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
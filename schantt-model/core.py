@@ -1,16 +1,142 @@
 #import
+import copy
+
 import numpy as np
 import pandas as pd
 
 
+# * ----------------------------- Compiled instance ----------------------------- #
+
+class CompiledInstance:
+    '''
+    Lookup tables of one data set, built once so the scheduling helpers need no pandas label lookups,
+    string parsing or list.index in the stage x item loops.
+
+    Data set tables: stage and recipe codes, tact[recipe], processing[stage, recipe]
+    and change_over[stage, recipe, next recipe].
+    Sequence tables (after with_sequence): recipe positions, IDs and codes per sequence position,
+    previous/next index arrays, and processing, change over and batch times per (stage, sequence position).
+    '''
+
+    def __init__(self, stage_data, recipe_data, processing_time_data, change_over_data):
+        self.stage_ids = list(stage_data.index)
+        self.stage_index = {stage: k for k, stage in enumerate(self.stage_ids)}
+        self.recipe_ids = list(recipe_data.index)
+        self.recipe_index = {recipe_id: k for k, recipe_id in enumerate(self.recipe_ids)}
+        n_stages, n_recipes = len(self.stage_ids), len(self.recipe_ids)
+
+        self.tact = 1 / (recipe_data["line_capacity"].to_numpy(dtype=float) / 60)
+        self.processing = (processing_time_data["processing_time"].unstack()
+                           .reindex(index=self.stage_ids, columns=self.recipe_ids).to_numpy(dtype=float))
+        self.change_over = (change_over_data
+                            .reindex(index=pd.MultiIndex.from_product([self.stage_ids, self.recipe_ids]), columns=self.recipe_ids)
+                            .to_numpy(dtype=float).reshape(n_stages, n_recipes, n_recipes))
+        _check_complete(self.processing, "processing_time_data", self.stage_ids, self.recipe_ids)
+        _check_complete(self.change_over, "change_over_data", self.stage_ids, self.recipe_ids, self.recipe_ids)
+
+        self.production_sequence = None
+        self.batch_time = None
+
+    @classmethod
+    def from_arrays(cls, stage_ids, recipe_ids, tact, processing, change_over):
+        '''
+        Instance from tables that are already dense (e.g. an instance_bundle), without any pandas parsing.
+        '''
+        compiled = cls.__new__(cls)
+        compiled.stage_ids = [int(stage) for stage in stage_ids]
+        compiled.stage_index = {stage: k for k, stage in enumerate(compiled.stage_ids)}
+        compiled.recipe_ids = [int(recipe_id) for recipe_id in recipe_ids]
+        compiled.recipe_index = {recipe_id: k for k, recipe_id in enumerate(compiled.recipe_ids)}
+        compiled.tact = tact
+        compiled.processing = processing
+        compiled.change_over = change_over
+        compiled.production_sequence = None
+        compiled.batch_time = None
+        return compiled
+
+    def with_sequence(self, production_sequence, production_quantity=None):
+        '''
+        Copy sharing the data set tables, with the tables of production_sequence added.
+        '''
+        compiled = copy.copy(self)
+        compiled.production_sequence = list(production_sequence)
+        compiled.item_index = {item: k for k, item in enumerate(compiled.production_sequence)}
+        compiled.sequence_positions = np.array([int(item.split("_")[0]) for item in compiled.production_sequence], dtype=int)
+        compiled.sequence_recipe_ids = np.array([int(item.split("_")[1]) for item in compiled.production_sequence], dtype=int)
+        codes = np.array([self.recipe_index[recipe_id] for recipe_id in compiled.sequence_recipe_ids], dtype=int)
+        compiled.sequence_codes = codes
+
+        n_items = len(codes)
+        compiled.previous_index = np.arange(n_items) - 1
+        compiled.next_index = np.arange(1, n_items + 1)
+        if n_items:
+            compiled.next_index[-1] = -1
+
+        # change over after each item to the next one, none after the last item
+        compiled.sequence_processing = self.processing[:, codes]
+        compiled.sequence_change_over = np.zeros((len(self.stage_ids), n_items))
+        compiled.sequence_change_over[:, :-1] = self.change_over[:, codes[:-1], codes[1:]]
+
+        if production_quantity is not None:
+            quantity = np.array([production_quantity[position][2] for position in compiled.sequence_positions.tolist()], dtype=float)
+            compiled.batch_time = self.tact[codes] * quantity
+        else:
+            compiled.batch_time = None
+        return compiled
+
+    def window(self, start, stop=None):
+        '''
+        Copy with the sequence tables of sequence positions start..stop-1, e.g. the frozen prefix for line_state.
+        '''
+        compiled = copy.copy(self)
+        items = slice(start, stop)
+        compiled.production_sequence = self.production_sequence[items]
+        compiled.item_index = {item: k for k, item in enumerate(compiled.production_sequence)}
+        compiled.sequence_positions = self.sequence_positions[items]
+        compiled.sequence_recipe_ids = self.sequence_recipe_ids[items]
+        compiled.sequence_codes = self.sequence_codes[items]
+        n_items = len(compiled.sequence_codes)
+        compiled.previous_index = np.arange(n_items) - 1
+        compiled.next_index = np.arange(1, n_items + 1)
+        if n_items:
+            compiled.next_index[-1] = -1
+        compiled.sequence_processing = self.sequence_processing[:, items]
+        compiled.sequence_change_over = self.sequence_change_over[:, items].copy()
+        if n_items:
+            compiled.sequence_change_over[:, -1] = 0
+        compiled.batch_time = None if self.batch_time is None else self.batch_time[items]
+        return compiled
+
+
+def _check_complete(table, name, *labels):
+    # reindexing onto the full stage x recipe grid turns missing pairs into nan, which would silently
+    # propagate into the schedule where the DataFrame lookups raise a KeyError
+    missing = np.argwhere(np.isnan(table))
+    if len(missing):
+        cells = [tuple(axis[k] for axis, k in zip(labels, cell)) for cell in missing[:5].tolist()]
+        raise KeyError(f"{name} has no value for {len(missing)} (stage, recipe) cells, e.g. {cells}")
+
+
+def compile_instance(stage_data, recipe_data, processing_time_data, change_over_data, production_sequence=None, production_quantity=None):
+    compiled = CompiledInstance(stage_data, recipe_data, processing_time_data, change_over_data)
+    if production_sequence is not None:
+        compiled = compiled.with_sequence(production_sequence, production_quantity)
+    return compiled
+
+
+
 # * ---------------------------- Get production data --------------------------- #
 
 def tact_time(recipe_id, recipe_data):
     # tact time is the rate at which PLBs move around the system, generally around 8-9 seconds or 0.15 minute.
     # derive from line_capacity (peel boards per hour).
+    if isinstance(recipe_data, CompiledInstance):
+        return recipe_data.tact[recipe_data.recipe_index[recipe_id]]
     return 1 / (recipe_data.loc[recipe_id]["line_capacity"] / 60)
 
 def processing_time(stage, recipe_id, processing_time_data):
+    if isinstance(processing_time_data, CompiledInstance):
+        return processing_time_data.processing[processing_time_data.stage_index[stage], processing_time_data.recipe_index[recipe_id]]
     return processing_time_data["processing_time"].loc[stage, recipe_id]
 
 def change_over_time(stage, item, production_sequence, change_over_data):
@@ -19,6 +145,9 @@ def change_over_time(stage, item, production_sequence, change_over_data):
     # else:
     #     return change_over_data.loc[(s, r), next_recipe(r, production_sequence)]
 
+    if isinstance(change_over_data, CompiledInstance):
+        return change_over_data.sequence_change_over[change_over_data.stage_index[stage], change_over_data.item_index[item]]
+
     if item == production_sequence[-1]:
         return 0
     else:
@@ -40,6 +169,10 @@ def change_over_time(stage, item, production_sequence, change_over_data):
 #         return np.nan
 
 def get_previous_item(item, production_sequence):
+    if isinstance(production_sequence, CompiledInstance):
+        previous_index = production_sequence.previous_index[production_sequence.item_index[item]]
+        return production_sequence.production_sequence[previous_index] if previous_index >= 0 else np.nan
+
     if item != production_sequence[0]:
         return production_sequence[production_sequence.index(item) - 1]
     else:
@@ -53,9 +186,15 @@ def get_previous_item(item, production_sequence):
 #         return np.nan
 
 def stage_position(s, stage_data):
+    if isinstance(stage_data, CompiledInstance):
+        return stage_data.stage_index[s]
     return stage_data.index.get_loc(s)
 
 def previous_stage(s, stage_data):
+    if isinstance(stage_data, CompiledInstance):
+        position = stage_data.stage_index[s]
+        return stage_data.stage_ids[position - 1] if position > 0 else np.nan
+
     if s != stage_data.index[0]:
         return stage_data.index[stage_position(s, stage_data) - 1]
     else:
@@ -66,12 +205,13 @@ def previous_stage(s, stage_data):
 # * ------------------------------- Get position ------------------------------- #
 
 def set_up_schedule(stage_data, production_sequence):
-    N = len(stage_data.index) * len(production_sequence)
+    stage_ids = stage_data.stage_ids if isinstance(stage_data, CompiledInstance) else stage_data.index
+    N = len(stage_ids) * len(production_sequence)
     schedule = pd.DataFrame(np.zeros((N, 6)), columns=["first_entry", "first_exit", "last_entry", "last_exit", "free_machine", "waiting_time"])
 
     schedule.set_index(
         pd.MultiIndex.from_product(
-            [stage_data.index, production_sequence],
+            [stage_ids, production_sequence],
             names=["stage_id", "recipe_id"]),
             inplace=True)
     
@@ -80,108 +220,112 @@ def set_up_schedule(stage_data, production_sequence):
 
 # * calculating first_entry and first_exit to derive waiting time
 
-def calculate_first(stage_data, recipe_data, processing_time_data, change_over_data, production_sequence, schedule):
+def calculate_first(stage_data, recipe_data, processing_time_data, change_over_data, production_sequence, schedule, instance=None):
+    if instance is None:
+        instance = compile_instance(stage_data, recipe_data, processing_time_data, change_over_data, production_sequence)
     
     postpone_time = pd.Series(np.zeros(len(production_sequence)), index=production_sequence)
 
-    for item in production_sequence:
-        recipe_position = int(item.split("_")[0])
-        recipe_id = int(item.split("_")[1])
+    for k, item in enumerate(instance.production_sequence):
+        recipe_position = int(instance.sequence_positions[k])
+        recipe_id = int(instance.sequence_recipe_ids[k])
 
-        for stage in stage_data.index:
+        for stage in instance.stage_ids:
             # first stage and first recipe
-            if stage_position(stage, stage_data) == 0 and recipe_position == 0:
+            if stage_position(stage, instance) == 0 and recipe_position == 0:
                 schedule.loc[(stage, item),("first_entry")] = 0
-                schedule.loc[(stage, item), ("first_exit")] = schedule.loc[(stage, item),("first_entry")] + processing_time(stage, recipe_id,  processing_time_data)
+                schedule.loc[(stage, item), ("first_exit")] = schedule.loc[(stage, item),("first_entry")] + processing_time(stage, recipe_id, instance)
 
-                if change_over_time(stage, item, production_sequence, change_over_data) == 0:
+                if change_over_time(stage, item, production_sequence, instance) == 0:
                     schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("first_entry")]
                 else:
-                    schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("first_exit")] + change_over_time(stage, item, production_sequence, change_over_data)
+                    schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("first_exit")] + change_over_time(stage, item, production_sequence, instance)
             
             # first stage and not first recipe
-            elif stage_position(stage, stage_data) == 0 and recipe_position != 0:
-                schedule.loc[(stage, item),("first_entry")] = schedule.loc[(stage, get_previous_item(item, production_sequence)),("free_machine")]
-                schedule.loc[(stage, item), ("first_exit")] = schedule.loc[(stage, item),("first_entry")] + processing_time(stage, recipe_id,  processing_time_data)
+            elif stage_position(stage, instance) == 0 and recipe_position != 0:
+                schedule.loc[(stage, item),("first_entry")] = schedule.loc[(stage, get_previous_item(item, instance)),("free_machine")]
+                schedule.loc[(stage, item), ("first_exit")] = schedule.loc[(stage, item),("first_entry")] + processing_time(stage, recipe_id, instance)
 
-                if change_over_time(stage, item, production_sequence, change_over_data) == 0:
+                if change_over_time(stage, item, production_sequence, instance) == 0:
                     schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("first_entry")]
                 else:
-                    schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("first_exit")] + change_over_time(stage, item, production_sequence, change_over_data)
+                    schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("first_exit")] + change_over_time(stage, item, production_sequence, instance)
             
             # not first stage and not first recipe
             else:
-                previous_item = get_previous_item(item, production_sequence)
+                previous_item = get_previous_item(item, instance)
 
-                temp_first_entry = max(schedule.loc[(previous_stage(stage, stage_data), item),("first_exit")],
+                temp_first_entry = max(schedule.loc[(previous_stage(stage, instance), item),("first_exit")],
                                         schedule.loc[(stage, previous_item),("free_machine")] if not(pd.isnull(previous_item)) else 0)
                 
                 waiting_time = 0
 
-                if temp_first_entry > schedule.loc[(previous_stage(stage, stage_data), item),("first_exit")]:
-                    waiting_time = temp_first_entry - schedule.loc[(previous_stage(stage, stage_data), item),("first_exit")]
+                if temp_first_entry > schedule.loc[(previous_stage(stage, instance), item),("first_exit")]:
+                    waiting_time = temp_first_entry - schedule.loc[(previous_stage(stage, instance), item),("first_exit")]
                     schedule.loc[(stage, item),("waiting_time")] = waiting_time
 
                 schedule.loc[(stage, item),("first_entry")] = temp_first_entry
-                schedule.loc[(stage, item), ("first_exit")] = schedule.loc[(stage, item),("first_entry")] + processing_time(stage, recipe_id,  processing_time_data)
+                schedule.loc[(stage, item), ("first_exit")] = schedule.loc[(stage, item),("first_entry")] + processing_time(stage, recipe_id, instance)
 
-                if change_over_time(stage, item, production_sequence, change_over_data) == 0:
+                if change_over_time(stage, item, production_sequence, instance) == 0:
                     schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("first_entry")]
                 else:
-                    schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("first_exit")] + change_over_time(stage, item, production_sequence, change_over_data)
+                    schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("first_exit")] + change_over_time(stage, item, production_sequence, instance)
                 
                 postpone_time.loc[item] += waiting_time
 
     return schedule, postpone_time
 
 
-def calculate_true(stage_data, recipe_data, processing_time_data, change_over_data, production_quantity,  production_sequence, schedule, postpone_time):
+def calculate_true(stage_data, recipe_data, processing_time_data, change_over_data, production_quantity,  production_sequence, schedule, postpone_time, instance=None):
+    if instance is None:
+        instance = compile_instance(stage_data, recipe_data, processing_time_data, change_over_data, production_sequence)
 
-    for item in production_sequence:
-        recipe_position = int(item.split("_")[0])
-        recipe_id = int(item.split("_")[1])
+    for k, item in enumerate(instance.production_sequence):
+        recipe_position = int(instance.sequence_positions[k])
+        recipe_id = int(instance.sequence_recipe_ids[k])
 
-        for stage in stage_data.index:
+        for stage in instance.stage_ids:
             # first stage and first recipe
-            if stage_position(stage, stage_data) == 0 and recipe_position == 0:
+            if stage_position(stage, instance) == 0 and recipe_position == 0:
                 schedule.loc[(stage, item),("first_entry")] = 0
-                schedule.loc[(stage, item), ("first_exit")] = schedule.loc[(stage, item),("first_entry")] + processing_time(stage, recipe_id,  processing_time_data)
-                schedule.loc[(stage, item), ("last_entry")] = schedule.loc[(stage, item),("first_entry")] + tact_time(recipe_id, recipe_data) * production_quantity[recipe_position][2]
-                schedule.loc[(stage, item), ("last_exit")] = schedule.loc[(stage, item), ("first_exit")] + tact_time(recipe_id, recipe_data) * production_quantity[recipe_position][2]
+                schedule.loc[(stage, item), ("first_exit")] = schedule.loc[(stage, item),("first_entry")] + processing_time(stage, recipe_id, instance)
+                schedule.loc[(stage, item), ("last_entry")] = schedule.loc[(stage, item),("first_entry")] + tact_time(recipe_id, instance) * production_quantity[recipe_position][2]
+                schedule.loc[(stage, item), ("last_exit")] = schedule.loc[(stage, item), ("first_exit")] + tact_time(recipe_id, instance) * production_quantity[recipe_position][2]
             
-                if change_over_time(stage, item, production_sequence, change_over_data) == 0:
+                if change_over_time(stage, item, production_sequence, instance) == 0:
                     schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("last_entry")]
                 else:
-                    schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("last_exit")] + change_over_time(stage, item, production_sequence, change_over_data)
+                    schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("last_exit")] + change_over_time(stage, item, production_sequence, instance)
             
             # first stage and not first recipe
-            elif stage_position(stage, stage_data) == 0 and recipe_position != 0:
-                schedule.loc[(stage, item),("first_entry")] = schedule.loc[(stage, get_previous_item(item, production_sequence)),("free_machine")] + postpone_time.loc[item]
-                schedule.loc[(stage, item), ("first_exit")] = schedule.loc[(stage, item),("first_entry")] + processing_time(stage, recipe_id,  processing_time_data)
-                schedule.loc[(stage, item), ("last_entry")] = schedule.loc[(stage, item),("first_entry")] + tact_time(recipe_id,  recipe_data) * production_quantity[recipe_position][2]
-                schedule.loc[(stage, item), ("last_exit")] = schedule.loc[(stage, item), ("first_exit")] + tact_time(recipe_id,  recipe_data) * production_quantity[recipe_position][2]
+            elif stage_position(stage, instance) == 0 and recipe_position != 0:
+                schedule.loc[(stage, item),("first_entry")] = schedule.loc[(stage, get_previous_item(item, instance)),("free_machine")] + postpone_time.loc[item]
+                schedule.loc[(stage, item), ("first_exit")] = schedule.loc[(stage, item),("first_entry")] + processing_time(stage, recipe_id, instance)
+                schedule.loc[(stage, item), ("last_entry")] = schedule.loc[(stage, item),("first_entry")] + tact_time(recipe_id, instance) * production_quantity[recipe_position][2]
+                schedule.loc[(stage, item), ("last_exit")] = schedule.loc[(stage, item), ("first_exit")] + tact_time(recipe_id, instance) * production_quantity[recipe_position][2]
                 
-                if change_over_time(stage, item, production_sequence, change_over_data) == 0:
+                if change_over_time(stage, item, production_sequence, instance) == 0:
                     schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("last_entry")]
                 else:
-                    schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("last_exit")] + change_over_time(stage, item, production_sequence, change_over_data)
+                    schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("last_exit")] + change_over_time(stage, item, production_sequence, instance)
             
             # not first stage and not first recipe
             else:
-                previous_item = get_previous_item(item, production_sequence)
+                previous_item = get_previous_item(item, instance)
 
-                schedule.loc[(stage, item),("first_entry")] = max(schedule.loc[(previous_stage(stage, stage_data), item),("first_exit")],
+                schedule.loc[(stage, item),("first_entry")] = max(schedule.loc[(previous_stage(stage, instance), item),("first_exit")],
                                                                     schedule.loc[(stage, previous_item),("free_machine")] if not(pd.isnull(previous_item)) else 0)
-                schedule.loc[(stage, item), ("first_exit")] = schedule.loc[(stage, item),("first_entry")] + processing_time(stage, recipe_id,  processing_time_data)
-                schedule.loc[(stage, item), ("last_entry")] = schedule.loc[(stage, item),("first_entry")] + tact_time(recipe_id,  recipe_data) * production_quantity[recipe_position][2]
-                schedule.loc[(stage, item), ("last_exit")] = schedule.loc[(stage, item), ("first_exit")] + tact_time(recipe_id,  recipe_data) * production_quantity[recipe_position][2]
+                schedule.loc[(stage, item), ("first_exit")] = schedule.loc[(stage, item),("first_entry")] + processing_time(stage, recipe_id, instance)
+                schedule.loc[(stage, item), ("last_entry")] = schedule.loc[(stage, item),("first_entry")] + tact_time(recipe_id, instance) * production_quantity[recipe_position][2]
+                schedule.loc[(stage, item), ("last_exit")] = schedule.loc[(stage, item), ("first_exit")] + tact_time(recipe_id, instance) * production_quantity[recipe_position][2]
 
-                if change_over_time(stage, item, production_sequence, change_over_data) == 0:
+                if change_over_time(stage, item, production_sequence, instance) == 0:
                     schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("last_entry")]
                 else:
-                    schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("last_exit")] + change_over_time(stage, item, production_sequence, change_over_data)
+                    schedule.loc[(stage, item), ("free_machine")] = schedule.loc[(stage, item), ("last_exit")] + change_over_time(stage, item, production_sequence, instance)
 
-                schedule.loc[(stage, item),("waiting_time")] = schedule.loc[(stage, item),("first_entry")] - schedule.loc[(previous_stage(stage, stage_data), item),("first_exit")]            
+                schedule.loc[(stage, item),("waiting_time")] = schedule.loc[(stage, item),("first_entry")] - schedule.loc[(previous_stage(stage, instance), item),("first_exit")]            
 
     # processing_time_temp = schedule.merge(processing_time_data, left_on=schedule.index, right_on=processing_time_data.index)["processing_time"].tolist()
     # schedule["processing_time"] = processing_time_temp
@@ -189,26 +333,170 @@ def calculate_true(stage_data, recipe_data, processing_time_data, change_over_da
     return schedule
 
 
-def make_schedule(stage_data, recipe_data, processing_time_data, change_over_data, production_quantity, production_sequence):
+def make_schedule(stage_data, recipe_data, processing_time_data, change_over_data, production_quantity, production_sequence, instance=None, state=None):
     ''' 
     Create schedule of input production_sequence: last_exit of the last peel boards from the last machine in the production_sequence.
 
     Input data: product, process, production data.
     Create a schedule for each recipe at each stage.
     Return data: schedule of the production_sequence.
+
+    instance can be a CompiledInstance of the data set to reuse between sequences.
+    state is a line_state of frozen items already on the line: production_sequence is then scheduled
+    after them (on the array engine, which gives the same values).
     '''
 
+    # Compile the lookup tables once for both runs
+    instance = _sequence_instance(stage_data, recipe_data, processing_time_data, change_over_data, production_quantity, production_sequence, instance)
+
+    if state is not None:
+        return schedule_to_frame(calculate_schedule_arrays(instance, state=state), instance.stage_ids, production_sequence)
+
     # Set up the "schedule" DataFrame for output
-    schedule = set_up_schedule(stage_data, production_sequence)
+    schedule = set_up_schedule(instance, production_sequence)
 
     # Run to define postpone_time:
-    schedule, postpone_time = calculate_first(stage_data, recipe_data, processing_time_data, change_over_data, production_sequence, schedule)
+    schedule, postpone_time = calculate_first(stage_data, recipe_data, processing_time_data, change_over_data, production_sequence, schedule, instance)
 
     # Run to define correct time and update the result:
-    schedule = calculate_true(stage_data, recipe_data, processing_time_data, change_over_data, production_quantity, production_sequence, schedule, postpone_time)
+    schedule = calculate_true(stage_data, recipe_data, processing_time_data, change_over_data, production_quantity, production_sequence, schedule, postpone_time, instance)
         
     return schedule
 
 
 def makespan(schedule):
-    return schedule["last_exit"].iloc[-1]
\ No newline at end of file
+    return schedule["last_exit"].iloc[-1]
+
+
+# * ------------------------- Array-backed schedule engine ------------------------ #
+
+SCHEDULE_COLUMNS = ["first_entry", "first_exit", "last_entry", "last_exit", "free_machine", "waiting_time"]
+
+def calculate_schedule_arrays(instance, makespan_only=False, state=None, return_state=False):
+    '''
+    Same computation as calculate_first followed by calculate_true, on dense arrays.
+
+    Input data: CompiledInstance with production_sequence and production_quantity.
+    state: line_state of items already on the line, scheduled before the first item.
+
+    Return data: dict of (stage, sequence position) arrays for every schedule column,
+    or only the makespan when makespan_only is set. With return_state, also the line state after the last item.
+    '''
+    processing = instance.sequence_processing.tolist()
+    change_over = instance.sequence_change_over.tolist()
+    batch_time = instance.batch_time.tolist()
+    is_first = (instance.sequence_positions == 0).tolist()
+    n_stages, n_items = len(processing), len(batch_time)
+
+    if n_items and not is_first[0] and state is None:
+        raise KeyError("the first item of production_sequence must have recipe position 0")
+
+    # free machine times of both passes before the first item: none, or those of the last item on the line
+    # with its change over to the first item, which was still open when the state was taken
+    free_first, free_true = [0.0] * n_stages, [0.0] * n_stages
+    if state is not None and n_items:
+        pending = instance.change_over[:, state["code"], instance.sequence_codes[0]].tolist()
+        for s in range(n_stages):
+            free_first[s] = state["first_entry"][s] if pending[s] == 0 else state["first_exit"][s] + pending[s]
+            free_true[s] = state["last_entry"][s] if pending[s] == 0 else state["last_exit"][s] + pending[s]
+
+    # first pass: free machine times without batch length, only to derive postpone time
+    first_exit = [[0.0] * n_items for _ in range(n_stages)]
+    free_machine = [[0.0] * n_items for _ in range(n_stages)]
+    postpone_time = [0.0] * n_items
+    draft_entry = [0.0] * n_stages
+
+    for k in range(n_items):
+        for s in range(n_stages):
+            if s == 0:
+                entry = 0.0 if is_first[k] else (free_machine[0][k - 1] if k > 0 else free_first[0])
+            else:
+                entry = max(first_exit[s - 1][k], free_machine[s][k - 1] if k > 0 else free_first[s])
+                if entry > first_exit[s - 1][k]:
+                    postpone_time[k] += entry - first_exit[s - 1][k]
+            first_exit[s][k] = entry + processing[s][k]
+            free_machine[s][k] = entry if change_over[s][k] == 0 else first_exit[s][k] + change_over[s][k]
+            draft_entry[s] = entry
+    draft_exit = [first_exit[s][-1] for s in range(n_stages)] if n_items else None
+
+    # second pass: true times
+    first_entry = [[0.0] * n_items for _ in range(n_stages)]
+    last_entry = [[0.0] * n_items for _ in range(n_stages)]
+    last_exit = [[0.0] * n_items for _ in range(n_stages)]
+    waiting_time = [[0.0] * n_items for _ in range(n_stages)]
+
+    for k in range(n_items):
+        for s in range(n_stages):
+            if s == 0:
+                entry = 0.0 if is_first[k] else (free_machine[0][k - 1] if k > 0 else free_true[0]) + postpone_time[k]
+            else:
+                entry = max(first_exit[s - 1][k], free_machine[s][k - 1] if k > 0 else free_true[s])
+                waiting_time[s][k] = entry - first_exit[s - 1][k]
+            first_entry[s][k] = entry
+            first_exit[s][k] = entry + processing[s][k]
+            last_entry[s][k] = entry + batch_time[k]
+            last_exit[s][k] = first_exit[s][k] + batch_time[k]
+            free_machine[s][k] = last_entry[s][k] if change_over[s][k] == 0 else last_exit[s][k] + change_over[s][k]
+
+    if makespan_only:
+        result = last_exit[-1][-1]
+    else:
+        columns = [first_entry, first_exit, last_entry, last_exit, free_machine, waiting_time]
+        result = {name: np.array(values, dtype=float) for name, values in zip(SCHEDULE_COLUMNS, columns)}
+    if not return_state:
+        return result
+
+    # times before the change over to the next item, which depends on what is scheduled next
+    end_state = state if not n_items else {
+        "code": int(instance.sequence_codes[-1]),
+        "first_entry": draft_entry,
+        "first_exit": draft_exit,
+        "last_entry": [last_entry[s][-1] for s in range(n_stages)],
+        "last_exit": [last_exit[s][-1] for s in range(n_stages)],
+    }
+    return result, end_state
+
+
+def line_state(instance, n_frozen, state=None):
+    '''
+    Line state after the first n_frozen items of a sequenced CompiledInstance,
+    to schedule the remaining or a changed set of items after them with state=... .
+    '''
+    return calculate_schedule_arrays(instance.window(0, n_frozen), makespan_only=True, state=state, return_state=True)[1]
+
+
+def schedule_to_frame(arrays, stage_ids, production_sequence):
+    '''
+    Build the "schedule" DataFrame of set_up_schedule from the arrays of calculate_schedule_arrays.
+    '''
+    index = pd.MultiIndex.from_product([stage_ids, production_sequence], names=["stage_id", "recipe_id"])
+    return pd.DataFrame({name: arrays[name].ravel() for name in SCHEDULE_COLUMNS}, index=index)
+
+
+def make_schedule_fast(stage_data, recipe_data, processing_time_data, change_over_data, production_quantity, production_sequence, as_frame=True, instance=None, state=None):
+    '''
+    Array-backed make_schedule. Returns the same DataFrame, or the raw arrays when as_frame is False.
+    instance can be a CompiledInstance of the data set to reuse between sequences.
+    '''
+    instance = _sequence_instance(stage_data, recipe_data, processing_time_data, change_over_data, production_quantity, production_sequence, instance)
+    arrays = calculate_schedule_arrays(instance, state=state)
+    if not as_frame:
+        return arrays
+    return schedule_to_frame(arrays, instance.stage_ids, production_sequence)
+
+
+def makespan_fast(stage_data, recipe_data, processing_time_data, change_over_data, production_quantity, production_sequence, instance=None, state=None):
+    '''
+    makespan(make_schedule(...)) without building the schedule DataFrame.
+    '''
+    instance = _sequence_instance(stage_data, recipe_data, processing_time_data, change_over_data, production_quantity, production_sequence, instance)
+    return calculate_schedule_arrays(instance, makespan_only=True, state=state)
+
+
+def _sequence_instance(stage_data, recipe_data, processing_time_data, change_over_data, production_quantity, production_sequence, instance):
+    # compile the data set unless given, then add the sequence tables unless they are for this sequence already
+    if instance is None:
+        instance = CompiledInstance(stage_data, recipe_data, processing_time_data, change_over_data)
+    if instance.production_sequence != list(production_sequence) or instance.batch_time is None:
+        instance = instance.with_sequence(production_sequence, production_quantity)
+    return instance
@@ -0,0 +1,163 @@
+import json
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+
+
+# Batched Gantt rendering of schedule traces (see schedule_trace.py): all process bars and all
+# changeover bars are drawn as two collections, labels only where a bar is wide enough to read.
+
+def stage_rows(machines_per_stage):
+    # Row offset of every stage and the label of every (stage, machine) row
+    offsets = np.concatenate([[0], np.cumsum(machines_per_stage)[:-1]]).astype(int)
+    labels = [f"Stage {s} (Machine {m})" for s, n in enumerate(machines_per_stage) for m in range(n)]
+    return offsets, labels
+
+
+def _bars(left, width, row, height):
+    # (n, 4, 2) rectangle vertices for a PolyCollection
+    bottom, top = row - height / 2, row + height / 2
+    right = left + width
+    return np.stack([
+        np.stack([left, bottom], axis=1), np.stack([left, top], axis=1),
+        np.stack([right, top], axis=1), np.stack([right, bottom], axis=1),
+    ], axis=1)
+
+
+def recipe_colors(recipe_ids, cmap="Set3"):
+    colormap = colormaps[cmap]
+    return {recipe_id: colormap(i % colormap.N) for i, recipe_id in enumerate(np.unique(recipe_ids))}
+
+
+def render_gantt(trace, machines_per_stage, ax=None, figsize=(12, 6), bar_height=0.5, min_label_px=24, max_labels=500,
+                 title="Batch Production Scheduling - Multi-stage Flowshop Optimization"):
+    '''
+    Draw a schedule trace on ax (a new headless Figure if None).
+
+    Labels are only drawn for bars at least min_label_px wide at the current zoom, at most max_labels,
+    and are redrawn when the x range changes.
+    Return data: the Figure.
+    '''
+    if ax is None:
+        fig = Figure(figsize=figsize)
+        ax = fig.add_subplot()
+    fig = ax.figure
+
+    trace = trace[trace["start"] < trace["end"]]
+    offsets, labels = stage_rows(machines_per_stage)
+    rows = (offsets[trace["stage"]] + trace["machine"]).astype(float)
+    colors = recipe_colors(trace["recipe_id"])
+    changeover = np.maximum(trace["changeover"], 0)
+    process_start = trace["start"] + changeover
+    process_width = trace["end"] - process_start
+
+    facecolors = [colors[recipe_id] for recipe_id in trace["recipe_id"]]
+    ax.add_collection(PolyCollection(_bars(process_start, process_width, rows, bar_height),
+                                     facecolors=facecolors, edgecolors="black", linewidths=0.5))
+    has_changeover = changeover > 0
+    if has_changeover.any():
+        ax.add_collection(PolyCollection(
+            _bars(trace["start"][has_changeover], changeover[has_changeover], rows[has_changeover], bar_height),
+            facecolors="red", edgecolors="black", linewidths=0.5, alpha=0.7))
+
+    ax.set_yticks(np.arange(len(labels)))
+    ax.set_yticklabels(labels)
+    ax.set_xlabel("Time")
+    ax.set_title(title)
+    ax.set_xlim(0, (trace["end"].max() if len(trace) else 0) + 10)
+    ax.set_ylim(-0.5, len(labels) - 0.5)
+    handles = [Rectangle((0, 0), 1, 1, color=color, label=str(recipe_id)) for recipe_id, color in colors.items()]
+    handles.append(Rectangle((0, 0), 1, 1, color="red", alpha=0.7, label="Changeover"))
+    # outside the axes: loc="best" tests every bar and takes minutes on large schedules
+    ax.legend(handles=handles, loc="upper left", bbox_to_anchor=(1.0, 1.0), title="Recipe IDs")
+
+    centers = process_start + process_width / 2
+    texts = []
+
+    def update_labels(ax):
+        for text in texts:
+            text.remove()
+        texts.clear()
+        x_min, x_max = ax.get_xlim()
+        px_per_unit = ax.get_window_extent().width / max(x_max - x_min, 1e-12)
+        visible = (process_width * px_per_unit >= min_label_px) & (centers >= x_min) & (centers <= x_max)
+        for k in np.flatnonzero(visible)[:max_labels]:
+            texts.append(ax.text(centers[k], rows[k], str(trace["recipe_id"][k]),
+                                 ha="center", va="center", color="white", fontweight="bold", clip_on=True))
+
+    fig.tight_layout()
+    update_labels(ax)
+    ax.callbacks.connect("xlim_changed", update_labels)
+    return fig
+
+
+def save_gantt(trace, machines_per_stage, path, dpi=150, **kwargs):
+    '''
+    Render headless and write PNG/SVG/PDF (by extension), or an HTML/JSON timeline for .html/.json.
+    '''
+    path = str(path)
+    if path.endswith(".json") or path.endswith(".html"):
+        return export_timeline(trace, machines_per_stage, path)
+    fig = render_gantt(trace, machines_per_stage, **kwargs)
+    fig.savefig(path, dpi=dpi)
+
+
+def timeline(trace, machines_per_stage):
+    '''
+    Compact columnar timeline of a trace: row labels, recipe IDs and one list per field.
+    '''
+    trace = trace[trace["start"] < trace["end"]]
+    offsets, labels = stage_rows(machines_per_stage)
+    return {
+        "rows": labels,
+        "recipes": [int(recipe_id) for recipe_id in np.unique(trace["recipe_id"])],
+        "row": (offsets[trace["stage"]] + trace["machine"]).astype(int).tolist(),
+        "recipe_id": trace["recipe_id"].astype(int).tolist(),
+        "order": trace["order"].astype(int).tolist(),
+        "start": np.round(trace["start"], 6).tolist(),
+        "changeover": np.round(trace["changeover"], 6).tolist(),
+        "end": np.round(trace["end"], 6).tolist(),
+    }
+
+
+def export_timeline(trace, machines_per_stage, path):
+    data = timeline(trace, machines_per_stage)
+    with open(path, "w") as f:
+        if str(path).endswith(".html"):
+            f.write(_HTML.replace("__DATA__", json.dumps(data, separators=(",", ":"))))
+        else:
+            json.dump(data, f, separators=(",", ":"))
+
+
+# Self-contained canvas viewer: mouse wheel zooms, drag pans, labels only where they fit
+_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Schedule timeline</title>
+<style>body{margin:0;font:12px sans-serif}canvas{display:block;width:100vw;height:100vh}</style></head>
+<body><canvas id="c"></canvas><script>
+const d=__DATA__, c=document.getElementById("c"), g=c.getContext("2d"), L=160, R=24;
+const n=d.start.length, tmax=d.end.reduce((a,b)=>Math.max(a,b),1);
+const color={}; d.recipes.forEach((r,i)=>color[r]=`hsl(${(i*137.5)%360},60%,65%)`);
+let x0=0, x1=tmax*1.02;
+function draw(){
+  c.width=c.clientWidth; c.height=c.clientHeight;
+  const h=(c.height-R)/d.rows.length, s=(c.width-L)/(x1-x0), X=t=>L+(t-x0)*s;
+  g.clearRect(0,0,c.width,c.height); g.textBaseline="middle";
+  d.rows.forEach((r,i)=>{g.fillStyle="#000"; g.fillText(r,4,(i+0.5)*h);});
+  for(let k=0;k<n;k++){
+    if(d.end[k]<x0||d.start[k]>x1) continue;
+    const y=d.row[k]*h+h*0.25, a=X(d.start[k]), b=X(d.start[k]+Math.max(d.changeover[k],0)), e=X(d.end[k]);
+    if(b>a){g.fillStyle="rgba(255,0,0,0.7)"; g.fillRect(a,y,b-a,h*0.5);}
+    g.fillStyle=color[d.recipe_id[k]]; g.fillRect(b,y,Math.max(e-b,1),h*0.5);
+    if(e-b>24){g.fillStyle="#000"; g.textAlign="center"; g.fillText(d.recipe_id[k],(b+e)/2,y+h*0.25); g.textAlign="left";}
+  }
+  g.fillStyle="#000"; g.fillText(x0.toFixed(1),L,c.height-R/2); g.textAlign="right"; g.fillText(x1.toFixed(1),c.width-4,c.height-R/2); g.textAlign="left";
+}
+c.onwheel=ev=>{ev.preventDefault(); const t=x0+(ev.offsetX-L)/(c.width-L)*(x1-x0), f=ev.deltaY>0?1.2:1/1.2; x0=t-(t-x0)*f; x1=t+(x1-t)*f; draw();};
+let drag=null; c.onmousedown=ev=>drag=[ev.offsetX,x0,x1]; window.onmouseup=()=>drag=null;
+c.onmousemove=ev=>{if(!drag)return; const dt=(ev.offsetX-drag[0])/(c.width-L)*(drag[2]-drag[1]); x0=drag[1]-dt; x1=drag[2]-dt; draw();};
+window.onresize=draw; draw();
+</script></body></html>
+"""
@@ -0,0 +1,153 @@
+import numpy as np
+from pymoo.core.crossover import Crossover
+from pymoo.core.duplicate import DuplicateElimination
+from pymoo.core.mutation import Mutation
+from pymoo.core.repair import Repair
+from pymoo.core.sampling import Sampling
+
+
+# Operators for the mixed encoding of BakeryHybridSchedulingProblem:
+# x[:seq_length] is a permutation of the orders, x[seq_length:] the (order, stage) machine choices.
+
+def _random_state(random_state):
+    # pymoo >= 0.6.1 passes a Generator, older versions seed the global NumPy state instead
+    if random_state is not None:
+        return random_state
+    return np.random.default_rng(np.random.randint(2 ** 31))
+
+
+def _random_machines(problem, shape, rng):
+    machines_per_stage = np.asarray(problem.machines_per_stage)
+    return np.floor(rng.random(shape + (problem.seq_length, problem.n_stages)) * machines_per_stage).astype(int)
+
+
+class HybridSampling(Sampling):
+    '''
+    Random permutation of the orders plus random machine choices within each stage.
+    '''
+
+    def _do(self, problem, n_samples, random_state=None, **kwargs):
+        rng = _random_state(random_state)
+        perms = np.argsort(rng.random((n_samples, problem.seq_length)), axis=1)
+        machines = _random_machines(problem, (n_samples,), rng).reshape(n_samples, -1)
+        return np.hstack([perms, machines])
+
+
+def order_crossover(receiver, donor, start, end):
+    # OX: donor[start:end + 1] kept in place, the other orders in the sequence of the receiver
+    donation = donor[start:end + 1]
+    rest = receiver[~np.isin(receiver, donation)]
+    return np.concatenate([rest[:start], donation, rest[start:]])
+
+
+class HybridCrossover(Crossover):
+    '''
+    Order crossover on the permutation block, uniform crossover on the machine block.
+    '''
+
+    def __init__(self, prob=0.9, **kwargs):
+        super().__init__(2, 2, prob=prob, **kwargs)
+
+    def _do(self, problem, X, random_state=None, **kwargs):
+        rng = _random_state(random_state)
+        _, n_matings, n_var = X.shape
+        n = problem.seq_length
+        Y = np.empty((2, n_matings, n_var), dtype=int)
+
+        for k in range(n_matings):
+            a, b = X[0, k, :n].astype(int), X[1, k, :n].astype(int)
+            start, end = np.sort(rng.choice(n, 2, replace=False)) if n > 1 else (0, 0)
+            Y[0, k, :n] = order_crossover(a, b, start, end)
+            Y[1, k, :n] = order_crossover(b, a, start, end)
+
+        mask = rng.random((n_matings, n_var - n)) < 0.5
+        Y[0, :, n:] = np.where(mask, X[0, :, n:], X[1, :, n:])
+        Y[1, :, n:] = np.where(mask, X[1, :, n:], X[0, :, n:])
+        return Y
+
+
+class HybridMutation(Mutation):
+    '''
+    Swap or insert move on the permutation block with probability perm_prob,
+    and each machine choice redrawn with probability machine_prob (default 1 / number of machine genes).
+    '''
+
+    def __init__(self, prob=1.0, perm_prob=0.5, machine_prob=None, moves=("swap", "insert"), **kwargs):
+        super().__init__(prob=prob, **kwargs)
+        self.perm_prob = perm_prob
+        self.machine_prob = machine_prob
+        self.moves = moves
+
+    def _do(self, problem, X, random_state=None, **kwargs):
+        rng = _random_state(random_state)
+        n = problem.seq_length
+        Y = np.asarray(X).astype(int)
+
+        if n > 1:
+            for k in np.flatnonzero(rng.random(len(Y)) < self.perm_prob):
+                a, b = rng.choice(n, 2, replace=False)
+                if self.moves[rng.integers(len(self.moves))] == "swap":
+                    Y[k, [a, b]] = Y[k, [b, a]]
+                else:
+                    order = list(Y[k, :n])
+                    order.insert(b, order.pop(a))
+                    Y[k, :n] = order
+
+        machine_prob = self.machine_prob if self.machine_prob is not None else 1 / max(1, n * problem.n_stages)
+        machines = Y[:, n:].reshape(len(Y), n, problem.n_stages)
+        redraw = rng.random(machines.shape) < machine_prob
+        machines[redraw] = _random_machines(problem, (len(Y),), rng)[redraw]
+        Y[:, n:] = machines.reshape(len(Y), -1)
+        return Y
+
+
+class PermutationRepair(Repair):
+    '''
+    Turn a broken permutation block back into a permutation: duplicates replaced by the missing orders.
+    '''
+
+    def _do(self, problem, X, **kwargs):
+        X = np.asarray(X).astype(int)
+        n = problem.seq_length
+        for k in range(len(X)):
+            perm = X[k, :n]
+            if len(np.unique(perm)) == n:
+                continue
+            _, first = np.unique(perm, return_index=True)
+            duplicate = np.ones(n, dtype=bool)
+            duplicate[first] = False
+            perm[duplicate] = np.setdiff1d(np.arange(n), perm)
+        return X
+
+
+class HybridDuplicateElimination(DuplicateElimination):
+    '''
+    Duplicates are genomes with the same canonical schedule key (see BakeryHybridSchedulingProblem.canonical_keys).
+    '''
+
+    def __init__(self, problem, **kwargs):
+        super().__init__(**kwargs)
+        self.problem = problem
+
+    def _do(self, pop, other, is_duplicate):
+        keys = self.problem.canonical_keys(pop.get("X"))
+        seen = set() if other is None else set(self.problem.canonical_keys(other.get("X")))
+        for k, key in enumerate(keys):
+            if key in seen:
+                is_duplicate[k] = True
+            elif other is None:
+                seen.add(key)
+        return is_duplicate
+
+
+def hybrid_operators(problem, crossover_prob=0.9, perm_prob=0.5, machine_prob=None):
+    '''
+    Operators for GA/NSGA2 on BakeryHybridSchedulingProblem, e.g. GA(pop_size=100, **hybrid_operators(problem)).
+    '''
+    return dict(
+        sampling=HybridSampling(),
+        crossover=HybridCrossover(prob=crossover_prob),
+        mutation=HybridMutation(perm_prob=perm_prob, machine_prob=machine_prob),
+        repair=PermutationRepair(),
+        eliminate_duplicates=HybridDuplicateElimination(problem),
+    )
@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core import CompiledInstance
+
+
+# Binary instance bundle: one raw .npy per table plus a JSON manifest, in a directory named by the content hash.
+# The spreadsheet or SQL source is parsed once; afterwards the tables are memory-mapped read-only, so repeated
+# and parallel runs start without parsing and share the pages of the OS page cache.
+
+FORMAT_VERSION = 2
+DEFAULT_CACHE_DIR = os.environ.get("SCHANTT_INSTANCE_CACHE", ".instance_cache")
+
+ARRAYS = ["stage_ids", "recipe_ids", "tact", "processing", "change_over", "processing_times", "changeover_times"]
+
+
+class InstanceBundle:
+    '''
+    Opened bundle: manifest plus the memory-mapped tables.
+
+    Data set tables as in core.CompiledInstance: stage_ids, recipe_ids, tact[recipe], processing[stage, recipe]
+    and change_over[stage, recipe, next recipe]. Dense tensors of BakeryHybridSchedulingProblem:
+    processing_times[stage, machine, recipe] and changeover_times[stage, machine, recipe, next recipe].
+    '''
+
+    def __init__(self, path, mmap_mode="r"):
+        self.path = Path(path)
+        with open(self.path / "manifest.json") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: bundle format {self.manifest.get('format_version')}, expected {FORMAT_VERSION}")
+        self.content_hash = self.manifest["content_hash"]
+        self.machines_per_stage = self.manifest["machines_per_stage"]
+        self.arrays = {name: np.load(self.path / f"{name}.npy", mmap_mode=mmap_mode) for name in ARRAYS}
+        for name, spec in self.manifest["arrays"].items():
+            array = self.arrays[name]
+            if list(array.shape) != spec["shape"] or array.dtype.str != spec["dtype"]:
+                raise ValueError(f"{self.path}: {name} does not match the manifest")
+
+    def __getattr__(self, name):
+        arrays = self.__dict__.get("arrays", {})
+        if name in arrays:
+            return arrays[name]
+        raise AttributeError(name)
+
+    def compiled(self):
+        # core.CompiledInstance straight from the mapped tables
+        return CompiledInstance.from_arrays(self.stage_ids, self.recipe_ids, self.tact, self.processing, self.change_over)
+
+    def problem_inputs(self):
+        '''
+        Data set inputs of BakeryHybridSchedulingProblem (add user_sequence and batch_sizes).
+        '''
+        return {
+            "recipe_id_to_index": {int(recipe_id): k for k, recipe_id in enumerate(self.recipe_ids)},
+            "machines_per_stage": list(self.machines_per_stage),
+            "processing_times": self.processing_times,
+            "changeover_times": self.changeover_times,
+            "tact_times": self.tact,
+        }
+
+    def frames(self):
+        '''
+        stage_data, recipe_data, processing_time_data and change_over_data DataFrames for core.make_schedule.
+        '''
+        stage_ids = pd.Index(self.stage_ids, name="stage_id")
+        recipe_ids = pd.Index(self.recipe_ids, name="recipe_id")
+        stage_data = pd.DataFrame(self.manifest["stage_data"], index=stage_ids)
+        recipe_data = pd.DataFrame(self.manifest["recipe_data"], index=recipe_ids)
+        recipe_data["line_capacity"] = 60 / np.asarray(self.tact)
+        index = pd.MultiIndex.from_product([stage_ids, recipe_ids])
+        processing_time_data = pd.DataFrame({"processing_time": np.asarray(self.processing).ravel()}, index=index)
+        change_over_data = pd.DataFrame(np.asarray(self.change_over).reshape(-1, len(recipe_ids)), index=index, columns=list(self.recipe_ids))
+        return stage_data, recipe_data, processing_time_data, change_over_data
+
+
+# * ---------------------------- Build and validate ---------------------------- #
+
+def tables_from_frames(stage_data, recipe_data, processing_time_data, change_over_data, machines_per_stage=None):
+    '''
+    Dense, validated tables of the core.py DataFrames.
+
+    The source data has one machine per stage; machines_per_stage > 1 repeats its times for identical machines.
+    Return data: dict of arrays (see ARRAYS) and the metadata that goes to the manifest.
+    '''
+    instance = CompiledInstance(stage_data, recipe_data, processing_time_data, change_over_data)
+    n_stages, n_recipes = len(instance.stage_ids), len(instance.recipe_ids)
+    if machines_per_stage is None:
+        machines_per_stage = [1] * n_stages
+    if len(machines_per_stage) != n_stages or min(machines_per_stage) < 1:
+        raise ValueError(f"machines_per_stage needs one positive count per stage, got {machines_per_stage}")
+    max_machines = max(machines_per_stage)
+
+    arrays = {
+        "stage_ids": np.asarray(instance.stage_ids, dtype=np.int64),
+        "recipe_ids": np.asarray(instance.recipe_ids, dtype=np.int64),
+        "tact": np.ascontiguousarray(instance.tact, dtype=np.float64),
+        "processing": np.ascontiguousarray(instance.processing, dtype=np.float64),
+        "change_over": np.ascontiguousarray(instance.change_over, dtype=np.float64),
+        "processing_times": np.ascontiguousarray(np.repeat(instance.processing[:, None, :], max_machines, axis=1)),
+        "changeover_times": np.ascontiguousarray(np.repeat(instance.change_over[:, None, :, :], max_machines, axis=1)),
+    }
+    validate(arrays, n_stages, n_recipes)
+    metadata = {
+        "machines_per_stage": [int(m) for m in machines_per_stage],
+        "stage_data": _records(stage_data),
+        "recipe_data": _records(recipe_data.drop(columns="line_capacity")),
+    }
+    return arrays, metadata
+
+
+def validate(arrays, n_stages, n_recipes):
+    # Missing (stage, recipe) rows show up as NaN after the reindex in CompiledInstance
+    expected = {"tact": (n_recipes,), "processing": (n_stages, n_recipes), "change_over": (n_stages, n_recipes, n_recipes)}
+    for name, shape in expected.items():
+        if arrays[name].shape != shape:
+            raise ValueError(f"{name} has shape {arrays[name].shape}, expected {shape}")
+    for name in ["tact", "processing", "change_over"]:
+        values = arrays[name]
+        if not np.isfinite(values).all():
+            raise ValueError(f"{name} has {int((~np.isfinite(values)).sum())} missing or infinite entries")
+        if (values < 0).any():
+            raise ValueError(f"{name} has negative entries")
+    if len(np.unique(arrays["stage_ids"])) != n_stages or len(np.unique(arrays["recipe_ids"])) != n_recipes:
+        raise ValueError("stage and recipe IDs must be unique")
+
+
+def _records(frame):
+    # Small descriptive tables go to the manifest as JSON lists per column, in the order of the stage / recipe IDs
+    return {str(name): json.loads(frame[name].to_json(orient="values")) for name in frame.columns}
+
+
+def frames_hash(*frames):
+    digest = hashlib.sha256()
+    for frame in frames:
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+        digest.update(repr(list(frame.columns)).encode())
+    return digest.hexdigest()
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_key(*parts):
+    # Content hash of a bundle: its sources, the build options and the format version
+    return hashlib.sha256(json.dumps([FORMAT_VERSION, *parts], sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+def write_bundle(path, arrays, metadata, content_hash, source):
+    '''
+    Write a bundle directory atomically: a concurrent reader sees either no bundle or a complete one.
+    '''
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{path.name}.", dir=path.parent))
+    try:
+        for name in ARRAYS:
+            np.save(tmp / f"{name}.npy", arrays[name], allow_pickle=False)
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "content_hash": content_hash,
+            "source": source,
+            "arrays": {name: {"shape": list(arrays[name].shape), "dtype": arrays[name].dtype.str} for name in ARRAYS},
+            **metadata,
+        }
+        with open(tmp / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=2)
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            if not (path / "manifest.json").exists():
+                raise
+            # another process finished the same bundle first
+            shutil.rmtree(tmp, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return path
+
+
+def cached_bundle(content_hash, build, cache_dir=None, source=None, rebuild=False):
+    '''
+    Open the bundle of content_hash from cache_dir, building it with build() -> (arrays, metadata) if missing.
+    '''
+    path = Path(cache_dir or DEFAULT_CACHE_DIR) / content_hash
+    if not rebuild and (path / "manifest.json").exists():
+        try:
+            return InstanceBundle(path)
+        except ValueError:
+            pass  # other format version or damaged: build again
+    if path.exists():
+        shutil.rmtree(path, ignore_errors=True)
+    arrays, metadata = build()
+    write_bundle(path, arrays, metadata, content_hash, source)
+    return InstanceBundle(path)
+
+
+# * -------------------------------- Sources -------------------------------- #
+
+def read_excel_tables(path, skiprows=50):
+    # processing_time and change_over sheets, read as in model.ipynb
+    processing_time_data = pd.read_excel(path, sheet_name="processing_time", index_col=[0, 1], skiprows=skiprows, usecols=list(range(0, 3)))
+    change_over_data = pd.read_excel(path, sheet_name="change_over", index_col=[0, 1], skiprows=skiprows, usecols=lambda column: True)
+    change_over_data = change_over_data.dropna(axis=1, how="all")
+    return processing_time_data, change_over_data
+
+
+def load_excel(path, stage_data, recipe_data, machines_per_stage=None, cache_dir=None, skiprows=50, rebuild=False):
+    '''
+    Bundle of the processing_time and change_over sheets of the spreadsheet at path plus stage_data and recipe_data.
+
+    The key hashes the file bytes, so the spreadsheet is only parsed when it or the other inputs change.
+    '''
+    content_hash = source_key("excel", file_hash(path), frames_hash(stage_data, recipe_data), machines_per_stage, skiprows)
+
+    def build():
+        processing_time_data, change_over_data = read_excel_tables(path, skiprows)
+        return tables_from_frames(stage_data, recipe_data, processing_time_data, change_over_data, machines_per_stage)
+
+    return cached_bundle(content_hash, build, cache_dir, source={"excel": str(path)}, rebuild=rebuild)
+
+
+def load_sql(connection, queries, machines_per_stage=None, cache_dir=None, rebuild=False):
+    '''
+    Bundle of four SQL queries (SQLAlchemy engine, connection or URL):
+    queries["stage_data"] with column stage_id, queries["recipe_data"] with recipe_id and line_capacity,
+    queries["processing_time"] with stage_id, recipe_id, processing_time and
+    queries["change_over"] with stage_id, recipe_id, next_recipe_id, change_over.
+
+    The query results are fetched every time (cheap next to parsing a spreadsheet), the bundle is
+    keyed by their content.
+    '''
+    if isinstance(connection, str):
+        from sqlalchemy import create_engine
+        connection = create_engine(connection)
+    stage_data = pd.read_sql(queries["stage_data"], connection, index_col="stage_id")
+    recipe_data = pd.read_sql(queries["recipe_data"], connection, index_col="recipe_id")
+    processing_time_data = pd.read_sql(queries["processing_time"], connection, index_col=["stage_id", "recipe_id"])
+    change_over_data = (pd.read_sql(queries["change_over"], connection)
+                        .pivot_table(index=["stage_id", "recipe_id"], columns="next_recipe_id", values="change_over", aggfunc="first"))
+    change_over_data.columns.name = None
+    content_hash = source_key("sql", frames_hash(stage_data, recipe_data, processing_time_data, change_over_data), machines_per_stage)
+
+    def build():
+        return tables_from_frames(stage_data, recipe_data, processing_time_data, change_over_data, machines_per_stage)
+
+    return cached_bundle(content_hash, build, cache_dir, source={"sql": sorted(queries)}, rebuild=rebuild)
+
+
+def load_frames(stage_data, recipe_data, processing_time_data, change_over_data, machines_per_stage=None, cache_dir=None):
+    # Bundle of DataFrames that are already in memory, e.g. to hand an instance to worker processes
+    content_hash = source_key("frames", frames_hash(stage_data, recipe_data, processing_time_data, change_over_data), machines_per_stage)
+    return cached_bundle(content_hash, lambda: tables_from_frames(stage_data, recipe_data, processing_time_data, change_over_data, machines_per_stage),
+                         cache_dir, source={"frames": True})
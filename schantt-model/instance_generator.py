@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+
+def generate_instance(n_orders, n_stages=5, machines_per_stage=None, n_recipes=6, batch_size_range=(5, 30),
+                      processing_range=(5, 20), changeover_range=(1, 5), tact_range=(0.5, 2.0), seed=0):
+    '''
+    Seeded synthetic bakery instance.
+
+    Return data: dict with the dense inputs of BakeryHybridSchedulingProblem (user_sequence, machines_per_stage,
+    processing_times[s, m, r], changeover_times[s, m, r1, r2], batch_sizes, tact_times) and the DataFrame inputs
+    of core.make_schedule (stage_data, recipe_data, processing_time_data, change_over_data, production_quantity,
+    production_sequence), which use machine 0 of every stage.
+    '''
+    rng = np.random.default_rng(seed)
+    if machines_per_stage is None:
+        machines_per_stage = rng.integers(1, 4, size=n_stages).tolist()
+    n_stages = len(machines_per_stage)
+    max_machines = max(machines_per_stage)
+
+    processing_times = rng.integers(*processing_range, size=(n_stages, max_machines, n_recipes))
+    changeover_times = rng.integers(*changeover_range, size=(n_stages, max_machines, n_recipes, n_recipes))
+    for r in range(n_recipes):
+        changeover_times[:, :, r, r] = 0
+    tact_times = rng.uniform(*tact_range, size=n_recipes)
+    user_sequence = rng.integers(0, n_recipes, size=n_orders)
+    batch_sizes = rng.integers(batch_size_range[0], batch_size_range[1] + 1, size=n_orders)
+
+    # core.py inputs: IDs start at 1, tact time comes from line_capacity (plb/hour)
+    stage_ids = pd.Index(np.arange(1, n_stages + 1), name="stage_id")
+    recipe_ids = pd.Index(np.arange(1, n_recipes + 1), name="recipe_id")
+    stage_data = pd.DataFrame({"stage_name": [f"stage_{s}" for s in stage_ids]}, index=stage_ids)
+    recipe_data = pd.DataFrame({"line_capacity": 60 / tact_times}, index=recipe_ids)
+    processing_time_data = pd.DataFrame(
+        {"processing_time": processing_times[:, 0, :].ravel().astype(float)},
+        index=pd.MultiIndex.from_product([stage_ids, recipe_ids]))
+    change_over_data = pd.DataFrame(
+        changeover_times[:, 0, :, :].reshape(n_stages * n_recipes, n_recipes).astype(float),
+        index=pd.MultiIndex.from_product([stage_ids, recipe_ids]), columns=recipe_ids)
+    production_quantity = [(k, int(r) + 1, int(q)) for k, (r, q) in enumerate(zip(user_sequence, batch_sizes))]
+    production_sequence = [f"{k}_{int(r) + 1}" for k, r in enumerate(user_sequence)]
+
+    return {
+        "user_sequence": user_sequence.tolist(),
+        "recipe_id_to_index": {rid: k for k, rid in enumerate(recipe_ids)},
+        "machines_per_stage": list(machines_per_stage),
+        "processing_times": processing_times,
+        "changeover_times": changeover_times,
+        "batch_sizes": batch_sizes.tolist(),
+        "tact_times": tact_times,
+        "stage_data": stage_data,
+        "recipe_data": recipe_data,
+        "processing_time_data": processing_time_data,
+        "change_over_data": change_over_data,
+        "production_quantity": production_quantity,
+        "production_sequence": production_sequence,
+    }
+
+
+PROBLEM_KEYS = ["user_sequence", "recipe_id_to_index", "machines_per_stage", "processing_times", "changeover_times", "batch_sizes", "tact_times"]
+SCHEDULE_KEYS = ["stage_data", "recipe_data", "processing_time_data", "change_over_data", "production_quantity", "production_sequence"]
+
+
+def make_problem(instance, **kwargs):
+    from BakeryHybridSchedulingProblem import BakeryHybridSchedulingProblem
+    return BakeryHybridSchedulingProblem(**{key: instance[key] for key in PROBLEM_KEYS}, **kwargs)
+
+
+def random_population(problem, n_pop, seed=0):
+    # Valid genomes: a permutation plus machine choices within each stage
+    from hybrid_operators import HybridSampling
+    return HybridSampling()._do(problem, n_pop, random_state=np.random.default_rng(seed))
+
+
+def change_orders(instance, n_cancel=2, n_new=2, seed=0):
+    '''
+    The instance with n_cancel random orders cancelled and n_new random orders appended, as the order book
+    of the next day on the same line. Batch sizes stay with their orders.
+    '''
+    rng = np.random.default_rng(seed)
+    user_sequence = np.asarray(instance["user_sequence"])
+    batch_sizes = np.asarray(instance["batch_sizes"])
+    keep = np.sort(rng.permutation(len(user_sequence))[n_cancel:])
+    n_recipes = len(instance["recipe_id_to_index"])
+    changed = dict(instance)
+    changed["user_sequence"] = np.concatenate([user_sequence[keep], rng.integers(0, n_recipes, size=n_new)]).tolist()
+    changed["batch_sizes"] = np.concatenate([batch_sizes[keep], rng.integers(batch_sizes.min(), batch_sizes.max() + 1, size=n_new)]).tolist()
+    changed["production_quantity"] = [(k, int(r) + 1, int(q)) for k, (r, q) in enumerate(zip(changed["user_sequence"], changed["batch_sizes"]))]
+    changed["production_sequence"] = [f"{k}_{int(r) + 1}" for k, r in enumerate(changed["user_sequence"])]
+    return changed
@@ -0,0 +1,170 @@
+import multiprocessing as mp
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+from pymoo.core.population import Population
+
+from hybrid_operators import hybrid_operators
+
+
+# Island-model GA: n_islands sub-populations evolve in separate processes and every migration_interval generations
+# send copies of their best n_migrants genomes to their neighbours on the topology. Migrants go through one shared
+# memory block (one slot per island), two barriers per migration keep writers and readers apart, so results
+# depend only on the seed and the number of islands, not on process timing.
+
+def make_algorithm(problem, algorithm, pop_size):
+    if callable(algorithm):
+        return algorithm(problem, pop_size)
+    if algorithm == "ga":
+        from pymoo.algorithms.soo.nonconvex.ga import GA
+        return GA(pop_size=pop_size, **hybrid_operators(problem))
+    if algorithm == "nsga2":
+        from pymoo.algorithms.moo.nsga2 import NSGA2
+        return NSGA2(pop_size=pop_size, **hybrid_operators(problem))
+    raise ValueError(f"unknown algorithm {algorithm!r}, use 'ga', 'nsga2' or a callable (problem, pop_size) -> algorithm")
+
+
+def migration_sources(topology, n_islands, epoch, seed=0):
+    '''
+    Islands each island receives migrants from at migration number `epoch`.
+
+    "ring": from the previous island; "bidirectional": from both neighbours; "complete": from all others;
+    "random": from one other island drawn per epoch (from seed, so the same on every island);
+    or a dict {island: [source islands]}.
+    '''
+    islands = range(n_islands)
+    if isinstance(topology, dict):
+        return {i: list(topology.get(i, [])) for i in islands}
+    if n_islands < 2:
+        return {i: [] for i in islands}
+    if topology == "ring":
+        return {i: [(i - 1) % n_islands] for i in islands}
+    if topology == "bidirectional":
+        return {i: sorted({(i - 1) % n_islands, (i + 1) % n_islands}) for i in islands}
+    if topology == "complete":
+        return {i: [j for j in islands if j != i] for i in islands}
+    if topology == "random":
+        rng = np.random.default_rng([seed, epoch])
+        shift = rng.integers(1, n_islands, size=n_islands)
+        return {i: [int((i + shift[i]) % n_islands)] for i in islands}
+    raise ValueError(f"unknown topology {topology!r}")
+
+
+def best_individuals(pop, n):
+    # Best n by fitness (single objective) or by rank and crowding (set by NSGA2 survival)
+    F = pop.get("F")
+    if F.shape[1] == 1:
+        order = np.argsort(F[:, 0], kind="stable")
+    else:
+        rank, crowding = pop.get("rank"), pop.get("crowding")
+        order = np.lexsort((-np.nan_to_num(crowding.astype(float), nan=0.0), rank)) if rank[0] is not None else np.arange(len(pop))
+    return pop[order[:n]]
+
+
+def _receive(algorithm, X):
+    # Evaluate the migrants, drop duplicates of residents, and let survival pick the next population
+    migrants = Population.new(X=X)
+    eliminate_duplicates = getattr(algorithm, "eliminate_duplicates", None)
+    if hasattr(eliminate_duplicates, "do"):
+        migrants = eliminate_duplicates.do(migrants, algorithm.pop)
+    if len(migrants) == 0:
+        return
+    algorithm.evaluator.eval(algorithm.problem, migrants, algorithm=algorithm)
+    pop = Population.merge(algorithm.pop, migrants)
+    algorithm.pop = algorithm.survival.do(algorithm.problem, pop, n_survive=algorithm.pop_size, algorithm=algorithm,
+                                          random_state=getattr(algorithm, "random_state", None))
+
+
+def _island(index, problem, config, shm_name, barrier, results):
+    shm = None
+    try:
+        n_islands, n_migrants = config["n_islands"], config["n_migrants"]
+        shm = shared_memory.SharedMemory(name=shm_name)
+        slots = np.ndarray((n_islands, n_migrants, problem.n_var), dtype=np.int64, buffer=shm.buf)
+
+        algorithm = make_algorithm(problem, config["algorithm"], config["pop_size"])
+        algorithm.setup(problem, termination=("n_gen", config["n_gen"]), seed=config["seed"] + index, verbose=False)
+        history, epoch, migration_time = [], 0, 0.0
+        start_time = time.perf_counter()
+
+        while algorithm.has_next():
+            algorithm.next()
+            history.append(algorithm.pop.get("F").min(axis=0).tolist())
+            if algorithm.n_gen % config["interval"] == 0 and algorithm.has_next():
+                t = time.perf_counter()
+                slots[index] = best_individuals(algorithm.pop, n_migrants).get("X").astype(np.int64)
+                barrier.wait()
+                sources = migration_sources(config["topology"], n_islands, epoch, config["seed"])[index]
+                X = slots[sources].reshape(-1, problem.n_var).copy() if sources else None
+                barrier.wait()
+                if X is not None:
+                    _receive(algorithm, X)
+                epoch += 1
+                migration_time += time.perf_counter() - t
+
+        pop = algorithm.pop
+        results.put((index, {"X": pop.get("X"), "F": pop.get("F"), "history": history, "n_eval": algorithm.evaluator.n_eval,
+                             "wall_time": time.perf_counter() - start_time, "migration_time": migration_time}))
+    except BaseException:
+        barrier.abort()
+        results.put((index, {"error": traceback.format_exc()}))
+    finally:
+        if shm is not None:
+            shm.close()
+        if hasattr(problem, "close"):
+            problem.close()
+
+
+def island_minimize(problem, n_islands=4, pop_size=50, n_gen=100, migration_interval=10, n_migrants=2, topology="ring",
+                    algorithm="ga", seed=0, start_method=None, timeout=None):
+    '''
+    Run n_islands GA (or NSGA2, or algorithm(problem, pop_size)) islands of pop_size each in separate processes,
+    exchanging n_migrants genomes every migration_interval generations along topology (see migration_sources).
+
+    Island k uses seed + k. timeout (seconds) bounds the wait at every migration.
+    Return data: dict with X and F of the best individual over all islands (or the merged non-dominated
+    set for several objectives), the per-island results (final population, best per generation, evaluations,
+    times) and the wall time.
+    '''
+    ctx = mp.get_context(start_method)
+    n_var = problem.n_var
+    shm = shared_memory.SharedMemory(create=True, size=max(n_islands * n_migrants * n_var * 8, 1))
+    config = {"n_islands": n_islands, "n_migrants": n_migrants, "pop_size": pop_size, "n_gen": n_gen, "seed": seed,
+              "interval": max(1, migration_interval), "topology": topology, "algorithm": algorithm}
+    barrier = ctx.Barrier(n_islands, timeout=timeout)
+    results = ctx.Queue()
+    start_time = time.perf_counter()
+    processes = [ctx.Process(target=_island, args=(k, problem, config, shm.name, barrier, results), daemon=True)
+                 for k in range(n_islands)]
+    try:
+        for process in processes:
+            process.start()
+        islands = [None] * n_islands
+        for _ in range(n_islands):
+            index, result = results.get(timeout=None if timeout is None else timeout * (n_gen + 1))
+            islands[index] = result
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        shm.close()
+        shm.unlink()
+
+    errors = [result["error"] for result in islands if "error" in result]
+    if errors:
+        raise RuntimeError("island failed:\n" + errors[0])
+
+    X = np.vstack([result["X"] for result in islands])
+    F = np.vstack([result["F"] for result in islands])
+    if F.shape[1] == 1:
+        best = int(np.argmin(F[:, 0]))
+        X, F = X[best], F[best]
+    else:
+        from pymoo.util.nds.non_dominated_sorting import NonDominatedSorting
+        front = NonDominatedSorting().do(F, only_non_dominated_front=True)
+        X, F = X[front], F[front]
+    return {"X": X, "F": F, "islands": islands, "wall_time": time.perf_counter() - start_time}
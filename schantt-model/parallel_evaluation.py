@@ -0,0 +1,170 @@
+import copy
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# * ------------------------------- Shared arrays ------------------------------- #
+
+class SharedArray:
+    '''
+    Copy of a NumPy array in a named shared memory block, published once and attached by workers
+    instead of being pickled to them with every task.
+    '''
+
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+        self.shape = array.shape
+        self.dtype = array.dtype.str
+        self._shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.name = self._shm.name
+        np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)[...] = array
+
+    @property
+    def spec(self):
+        return (self.name, self.shape, self.dtype)
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+def attach_shared_array(spec):
+    # The returned SharedMemory must be kept alive as long as the array is used
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+# * ------------------------------- Worker side -------------------------------- #
+
+_worker = {}
+
+def _init_worker(problem_class, arguments, processing_spec, changeover_spec):
+    processing_shm, processing_times = attach_shared_array(processing_spec)
+    changeover_shm, changeover_times = attach_shared_array(changeover_spec)
+    _worker["shm"] = (processing_shm, changeover_shm)
+    _worker["problem"] = problem_class(processing_times=processing_times, changeover_times=changeover_times, **arguments)
+
+
+def _evaluate_chunk(X):
+    return _worker["problem"].evaluate_values(X)
+
+
+# * ---------------------------- Parallel evaluator ----------------------------- #
+
+def _shutdown(pool, shared):
+    # Runs once: on close(), when the evaluator is garbage collected, or at interpreter exit
+    pool.shutdown()
+    for array in shared:
+        array.close()
+    shared.clear()
+
+
+class ParallelEvaluator:
+    '''
+    Evaluate a population of BakeryHybridSchedulingProblem on a thread or process pool.
+
+    The population is split into n_workers * chunks_per_worker chunks that idle workers pick up,
+    so slow chunks do not hold up the others. In process mode the processing and changeover
+    tensors are published once through shared memory when the pool starts.
+    '''
+
+    def __init__(self, problem, mode="process", n_workers=None, chunks_per_worker=4):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"mode must be 'thread' or 'process', got {mode!r}")
+        self.problem = problem
+        self.mode = mode
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.chunks_per_worker = chunks_per_worker
+        self._shared = []
+        self._local = threading.local()
+
+        if mode == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.n_workers)
+        else:
+            processing = SharedArray(problem.processing_times)
+            changeover = SharedArray(problem.changeover_times)
+            self._shared = [processing, changeover]
+            arguments = dict(
+                user_sequence=problem.user_sequence,
+                recipe_id_to_index=problem.recipe_id_to_index,
+                machines_per_stage=problem.machines_per_stage,
+                batch_sizes=problem.batch_sizes,
+                tact_times=problem.tact_times,
+                vectorized=problem.vectorized,
+                initial_state=problem.initial_state,
+                objectives=problem.objectives,
+                due_dates=problem.due_dates,
+            )
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=_init_worker,
+                initargs=(type(problem), arguments, processing.spec, changeover.spec),
+            )
+        # The pool and the shared memory are released even if nobody calls close()
+        self._finalizer = weakref.finalize(self, _shutdown, self._pool, self._shared)
+
+    def _thread_problem(self):
+        # Each thread gets its own shallow copy so batch workspaces are not shared
+        if not hasattr(self._local, "problem"):
+            self._local.problem = copy.copy(self.problem)
+        return self._local.problem
+
+    def _evaluate_thread_chunk(self, X):
+        return self._thread_problem().evaluate_values(X)
+
+    def evaluate(self, X):
+        X = np.asarray(X)
+        n_chunks = max(1, min(len(X), self.n_workers * self.chunks_per_worker))
+        chunks = np.array_split(X, n_chunks)
+        task = self._evaluate_thread_chunk if self.mode == "thread" else _evaluate_chunk
+        return np.concatenate(list(self._pool.map(task, chunks)))
+
+    def close(self):
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# * ------------------------------- Throughput -------------------------------- #
+
+def compare_throughput(problem, X, worker_counts=None, modes=("thread", "process"), repeats=3):
+    '''
+    Evaluations per second of the serial path and of each mode and worker count on population X.
+
+    Return data: list of dicts with mode, n_workers, evals_per_sec and speedup over serial.
+    '''
+    if worker_counts is None:
+        worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+
+    def best_rate(evaluate):
+        evaluate(X)  # warm up pools and workspaces
+        best = min(_timed(evaluate, X) for _ in range(repeats))
+        return len(X) / best
+
+    serial = best_rate(problem.evaluate_values)
+    results = [{"mode": "serial", "n_workers": 1, "evals_per_sec": serial, "speedup": 1.0}]
+    for mode in modes:
+        for n_workers in worker_counts:
+            with ParallelEvaluator(problem, mode=mode, n_workers=n_workers) as evaluator:
+                rate = best_rate(evaluator.evaluate)
+            results.append({"mode": mode, "n_workers": n_workers, "evals_per_sec": rate, "speedup": rate / serial})
+    return results
+
+
+def _timed(evaluate, X):
+    start_time = time.perf_counter()
+    evaluate(X)
+    return time.perf_counter() - start_time
@@ -0,0 +1,280 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, LargeBinary, MetaData, String, Table,
+                        Text, create_engine, event, select)
+
+from core import SCHEDULE_COLUMNS
+from schedule_trace import TRACE_DTYPE, new_trace
+
+
+# Results store for optimization runs: run history, schedules (traces of BakeryHybridSchedulingProblem and core.make_schedule
+# schedules), per-generation metrics and Pareto fronts. Rows are written in bulk: COPY on PostgreSQL (psycopg2),
+# batched executemany elsewhere, one transaction per save.
+
+metadata = MetaData()
+
+TELEMETRY_COLUMNS = ["wall_time", "evaluation", "survival", "variation", "duplicates", "other", "n_eval", "evals_per_sec",
+                     "cache_hits", "cache_misses", "pruned", "peak_memory_mb"]
+
+runs = Table(
+    "runs", metadata,
+    Column("run_id", String(32), primary_key=True),
+    Column("instance_hash", String(64), index=True),
+    Column("created_at", DateTime(timezone=True), nullable=False, index=True),
+    Column("finished_at", DateTime(timezone=True)),
+    Column("algorithm", String(64)),
+    Column("makespan", Float),
+    Column("config", Text),
+)
+
+schedule_tasks = Table(
+    "schedule_tasks", metadata,
+    Column("run_id", String(32), ForeignKey("runs.run_id", ondelete="CASCADE"), nullable=False),
+    Column("solution", Integer, nullable=False),
+    *[Column(name, Boolean if TRACE_DTYPE[name].kind == "b" else Float if TRACE_DTYPE[name].kind == "f" else Integer)
+      for name in TRACE_DTYPE.names],
+    Index("ix_schedule_tasks_run_solution", "run_id", "solution"),
+)
+
+schedule_rows = Table(
+    "schedule_rows", metadata,
+    Column("run_id", String(32), ForeignKey("runs.run_id", ondelete="CASCADE"), nullable=False),
+    Column("solution", Integer, nullable=False),
+    Column("row", Integer, nullable=False),
+    Column("stage_id", Integer),
+    Column("item", String(64)),
+    Column("item_is_int", Boolean),
+    *[Column(name, Float) for name in SCHEDULE_COLUMNS],
+    Index("ix_schedule_rows_run_solution", "run_id", "solution"),
+)
+
+generation_metrics = Table(
+    "generation_metrics", metadata,
+    Column("run_id", String(32), ForeignKey("runs.run_id", ondelete="CASCADE"), nullable=False),
+    Column("n_gen", Integer, nullable=False),
+    *[Column(name, Integer if name in ("n_eval", "cache_hits", "cache_misses", "pruned") else Float) for name in TELEMETRY_COLUMNS],
+    Column("f_best", Text),
+    Column("f_median", Text),
+    Index("ix_generation_metrics_run_gen", "run_id", "n_gen"),
+)
+
+front_points = Table(
+    "front_points", metadata,
+    Column("run_id", String(32), ForeignKey("runs.run_id", ondelete="CASCADE"), nullable=False),
+    Column("point", Integer, nullable=False),
+    Column("f", Text, nullable=False),
+    Column("x", LargeBinary),
+    Index("ix_front_points_run_point", "run_id", "point"),
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _copy_value(value):
+    # Text form of one value in a PostgreSQL COPY csv row
+    if value is None:
+        return "\\N"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(value).hex()  # bytea hex format
+    if isinstance(value, (bool, np.bool_)):
+        return "t" if value else "f"
+    if isinstance(value, (float, np.floating)):
+        if np.isnan(value):
+            return "NaN"
+        if np.isinf(value):
+            return "Infinity" if value > 0 else "-Infinity"
+        return repr(float(value))
+    return value
+
+
+def make_engine(url, **kwargs):
+    '''
+    Pooled engine: a connection pool with pre-ping on server databases, WAL journal on SQLite files.
+    '''
+    if url.startswith("sqlite"):
+        engine = create_engine(url, **kwargs)
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
+    kwargs.setdefault("pool_size", 5)
+    kwargs.setdefault("max_overflow", 10)
+    kwargs.setdefault("pool_pre_ping", True)
+    return create_engine(url, **kwargs)
+
+
+class ResultsStore:
+    '''
+    Results of optimization runs in a SQL database, e.g. ResultsStore("sqlite:///results.db")
+    or ResultsStore("postgresql+psycopg2://user@host/schantt").
+
+    Every save_* call writes its rows in bulk in one transaction; batch_size bounds the rows per executemany.
+    Runs are looked up by run_id, instance hash (e.g. instance_bundle content_hash) and creation date.
+    '''
+
+    def __init__(self, url, batch_size=10000, create=True, **engine_kwargs):
+        self.engine = make_engine(url, **engine_kwargs) if isinstance(url, str) else url
+        self.batch_size = batch_size
+        if create:
+            metadata.create_all(self.engine)
+
+    def close(self):
+        self.engine.dispose()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # * ------------------------------- Writing ------------------------------- #
+
+    def _insert(self, conn, table, columns):
+        # columns: dict of equally long sequences; COPY on psycopg2, chunked executemany otherwise
+        names = list(columns)
+        n_rows = len(columns[names[0]]) if names else 0
+        if not n_rows:
+            return
+        values = [np.asarray(columns[name]).tolist() if isinstance(columns[name], np.ndarray) else list(columns[name]) for name in names]
+        if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2":
+            self._copy(conn, table, names, values)
+            return
+        for start in range(0, n_rows, self.batch_size):
+            stop = start + self.batch_size
+            conn.execute(table.insert(), [dict(zip(names, row)) for row in zip(*(column[start:stop] for column in values))])
+
+    def _copy(self, conn, table, names, values):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in zip(*values):
+            writer.writerow([_copy_value(value) for value in row])
+        buffer.seek(0)
+        quote = conn.dialect.identifier_preparer.quote
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {quote(table.name)} ({', '.join(quote(name) for name in names)}) "
+                               "FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+        finally:
+            cursor.close()
+
+    def start_run(self, instance_hash=None, algorithm=None, config=None, run_id=None):
+        run_id = run_id or uuid.uuid4().hex
+        with self.engine.begin() as conn:
+            conn.execute(runs.insert().values(
+                run_id=run_id, instance_hash=instance_hash, created_at=datetime.now(timezone.utc),
+                algorithm=algorithm, config=json.dumps(config, default=str) if config is not None else None))
+        return run_id
+
+    def finish_run(self, run_id, makespan=None):
+        with self.engine.begin() as conn:
+            conn.execute(runs.update().where(runs.c.run_id == run_id).values(
+                finished_at=datetime.now(timezone.utc), makespan=None if makespan is None else float(makespan)))
+
+    def save_trace(self, run_id, trace, solution=0):
+        # schedule_trace record array, e.g. problem.best_trace
+        columns = {"run_id": [run_id] * len(trace), "solution": [solution] * len(trace)}
+        columns.update({name: trace[name] for name in TRACE_DTYPE.names})
+        with self.engine.begin() as conn:
+            self._insert(conn, schedule_tasks, columns)
+
+    def save_schedule(self, run_id, schedule, solution=0):
+        # schedule DataFrame of core.make_schedule / make_schedule_fast; items are stored as text, integer items
+        # (recipe IDs) are flagged so load_schedule gives them back as integers, in the row order of schedule
+        stage_ids = schedule.index.get_level_values(0)
+        items = schedule.index.get_level_values(1)
+        columns = {"run_id": [run_id] * len(schedule), "solution": [solution] * len(schedule), "row": np.arange(len(schedule)),
+                   "stage_id": np.asarray(stage_ids, dtype=np.int64), "item": list(items.astype(str)),
+                   "item_is_int": [isinstance(item, (int, np.integer)) for item in items]}
+        columns.update({name: schedule[name].to_numpy(dtype=float) for name in SCHEDULE_COLUMNS})
+        with self.engine.begin() as conn:
+            self._insert(conn, schedule_rows, columns)
+
+    def save_best(self, run_id, problem):
+        # best_trace and max_makespan of a BakeryHybridSchedulingProblem, closing the run
+        self.save_trace(run_id, problem.best_trace)
+        self.finish_run(run_id, problem.max_makespan)
+
+    def save_metrics(self, run_id, telemetry):
+        '''
+        Per-generation records of a telemetry.Telemetry (or its records() array).
+        '''
+        records = telemetry.records() if hasattr(telemetry, "records") else telemetry
+        columns = {"run_id": [run_id] * len(records), "n_gen": records["n_gen"]}
+        columns.update({name: records[name] for name in TELEMETRY_COLUMNS})
+        columns["f_best"] = [json.dumps(np.atleast_1d(f).tolist()) for f in records["f_best"]]
+        columns["f_median"] = [json.dumps(np.atleast_1d(f).tolist()) for f in records["f_median"]]
+        with self.engine.begin() as conn:
+            self._insert(conn, generation_metrics, columns)
+
+    def save_front(self, run_id, F, X=None):
+        # Objective vectors (and genomes) of a Pareto front, e.g. res.F and res.X
+        F = np.atleast_2d(np.asarray(F, dtype=float))
+        columns = {"run_id": [run_id] * len(F), "point": np.arange(len(F)), "f": [json.dumps(f.tolist()) for f in F]}
+        if X is not None:
+            X = np.atleast_2d(np.asarray(X)).astype(np.int32)
+            columns["x"] = [x.tobytes() for x in X]
+        with self.engine.begin() as conn:
+            self._insert(conn, front_points, columns)
+
+    # * ------------------------------- Reading ------------------------------- #
+
+    def runs(self, instance_hash=None, since=None, until=None):
+        query = select(runs)
+        if instance_hash is not None:
+            query = query.where(runs.c.instance_hash == instance_hash)
+        if since is not None:
+            query = query.where(runs.c.created_at >= since)
+        if until is not None:
+            query = query.where(runs.c.created_at < until)
+        with self.engine.connect() as conn:
+            return pd.read_sql(query.order_by(runs.c.created_at), conn)
+
+    def load_trace(self, run_id, solution=0):
+        query = (select(*[schedule_tasks.c[name] for name in TRACE_DTYPE.names])
+                 .where(schedule_tasks.c.run_id == run_id, schedule_tasks.c.solution == solution)
+                 .order_by(schedule_tasks.c.position, schedule_tasks.c.stage))
+        with self.engine.connect() as conn:
+            rows = conn.execute(query).all()
+        trace = new_trace(len(rows))
+        if rows:
+            for name, values in zip(TRACE_DTYPE.names, zip(*rows)):
+                trace[name] = values
+        return trace
+
+    def load_schedule(self, run_id, solution=0):
+        query = (select(schedule_rows).where(schedule_rows.c.run_id == run_id, schedule_rows.c.solution == solution)
+                 .order_by(schedule_rows.c.row))
+        with self.engine.connect() as conn:
+            frame = pd.read_sql(query, conn)
+        items = [int(item) if is_int else item for item, is_int in zip(frame["item"], frame["item_is_int"])]
+        index = pd.MultiIndex.from_arrays([frame["stage_id"].to_numpy(dtype=np.int64), items], names=["stage_id", "recipe_id"])
+        return frame[SCHEDULE_COLUMNS].set_index(index)
+
+    def load_metrics(self, run_id):
+        query = select(generation_metrics).where(generation_metrics.c.run_id == run_id).order_by(generation_metrics.c.n_gen)
+        with self.engine.connect() as conn:
+            frame = pd.read_sql(query, conn)
+        for name in ["f_best", "f_median"]:
+            frame[name] = frame[name].map(json.loads)
+        return frame.drop(columns="run_id")
+
+    def load_front(self, run_id):
+        # F as an (n_points, n_obj) array, X as int genomes or None when they were not stored
+        query = select(front_points).where(front_points.c.run_id == run_id).order_by(front_points.c.point)
+        with self.engine.connect() as conn:
+            rows = conn.execute(query).all()
+        F = np.array([json.loads(row.f) for row in rows], dtype=float)
+        X = None
+        if rows and rows[0].x is not None:
+            X = np.vstack([np.frombuffer(row.x, dtype=np.int32) for row in rows])
+        return F, X
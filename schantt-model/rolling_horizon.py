@@ -0,0 +1,75 @@
+import numpy as np
+from pymoo.algorithms.soo.nonconvex.ga import GA
+from pymoo.optimize import minimize
+
+from hybrid_operators import HybridMutation, hybrid_operators
+
+
+# Online rescheduling: the started part of the schedule is frozen (BakeryHybridSchedulingProblem.line_state),
+# only the remaining orders are re-optimized from that line state, warm-started from the previous best genome.
+
+def window_orders(problem, state, cancelled=(), new_orders=(), new_batch_sizes=()):
+    '''
+    Order book of the window after an order change.
+
+    cancelled are order indices of problem (positions in user_sequence), new_orders recipe indices with
+    their batch sizes. Remaining orders keep their sequence and machines, new orders are appended on the
+    machines with the shortest processing time for their recipe.
+    Return data: user_sequence, batch_sizes and the warm start genome of the window problem.
+    '''
+    if len(new_orders) != len(new_batch_sizes):
+        raise ValueError("every new order needs a batch size")
+    keep = ~np.isin(state["remaining"], list(cancelled))
+    recipes = np.concatenate([problem.user_sequence[state["remaining"][keep]], np.asarray(new_orders, dtype=int)]).astype(int)
+    batch_sizes = np.concatenate([state["remaining_batch_sizes"][keep], np.asarray(new_batch_sizes)])
+
+    stages = np.arange(problem.n_stages)
+    fastest = np.empty((len(new_orders), problem.n_stages), dtype=int)
+    for s in stages:
+        times = problem.processing_times[s, :problem.machines_per_stage[s]]
+        fastest[:, s] = np.argmin(times[:, np.asarray(new_orders, dtype=int)], axis=0)
+    machines = np.vstack([state["remaining_machines"][keep], fastest])
+    x0 = np.concatenate([np.arange(len(recipes)), machines.ravel()]).astype(int)
+    return recipes, batch_sizes, x0
+
+
+def warm_start_population(problem, x0, pop_size, seed=0):
+    # x0 plus mutated copies of it, so the GA starts around the previous plan instead of at random
+    X = np.tile(x0, (pop_size, 1))
+    if pop_size > 1:
+        X[1:] = HybridMutation(perm_prob=1.0, machine_prob=0.1)._do(problem, X[1:], random_state=np.random.default_rng(seed))
+    return X
+
+
+def replan(problem, x, t_now=None, n_frozen=None, cancelled=(), new_orders=(), new_batch_sizes=(),
+           pop_size=50, n_gen=30, seed=0, **problem_kwargs):
+    '''
+    Re-optimize the orders of x that have not started by t_now (or after the first n_frozen positions),
+    with cancelled and new orders applied.
+
+    Return data: dict with the line state, the window problem, the warm start genome x0 with its makespan,
+    and the best genome found with its makespan (makespans cover the frozen tasks too).
+    '''
+    state = problem.line_state(x, n_frozen=n_frozen, t_now=t_now)
+    if len(cancelled) or len(new_orders):
+        user_sequence, batch_sizes, x0 = window_orders(problem, state, cancelled, new_orders, new_batch_sizes)
+        window = problem.window_problem(state, user_sequence, batch_sizes, **problem_kwargs)
+    else:
+        window = problem.window_problem(state, **problem_kwargs)
+        x0 = problem.warm_start_genome(state)
+
+    result = {"state": state, "problem": window, "x0": x0}
+    if window.seq_length == 0:
+        result.update(x=x0, makespan=state["makespan"], warm_start_makespan=state["makespan"])
+        return result
+
+    result["warm_start_makespan"] = window.calculate_makespan(x0, store_best=False)
+    operators = hybrid_operators(window)
+    operators["sampling"] = warm_start_population(window, x0, pop_size, seed)
+    res = minimize(window, GA(pop_size=pop_size, **operators), ("n_gen", n_gen), seed=seed, verbose=False)
+    best = np.asarray(res.X).astype(int)
+    if window.calculate_makespan(best, store_best=False) > result["warm_start_makespan"]:
+        best = x0
+    result["x"] = best
+    result["makespan"] = window.calculate_makespan(best)
+    return result
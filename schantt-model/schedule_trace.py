@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+
+# One record per scheduled task (sequence position x stage)
+TRACE_DTYPE = np.dtype([
+    ("position", "i4"),     # sequence position
+    ("order", "i4"),        # index of the order in user_sequence
+    ("recipe", "i4"),       # recipe index
+    ("recipe_id", "i8"),
+    ("stage", "i4"),
+    ("machine", "i4"),
+    ("start", "f8"),
+    ("changeover", "f8"),
+    ("processing", "f8"),
+    ("batch_delay", "f8"),
+    ("end", "f8"),
+    ("postponed", "?"),     # stage 0 start was postponed for this position
+])
+
+
+def new_trace(n_tasks):
+    return np.zeros(n_tasks, dtype=TRACE_DTYPE)
+
+
+def trace_to_frame(trace):
+    return pd.DataFrame({name: trace[name] for name in TRACE_DTYPE.names})
+
+
+def export_trace(trace, path):
+    '''
+    Write a trace to .parquet (needs pyarrow or fastparquet) or .csv, chosen by the file extension.
+    '''
+    frame = trace_to_frame(trace)
+    if str(path).endswith(".parquet"):
+        frame.to_parquet(path, index=False)
+    elif str(path).endswith(".csv"):
+        frame.to_csv(path, index=False)
+    else:
+        raise ValueError(f"unknown trace format of {path}, use .parquet or .csv")
+
+
+def load_trace(path):
+    frame = pd.read_parquet(path) if str(path).endswith(".parquet") else pd.read_csv(path, float_precision="round_trip")
+    trace = new_trace(len(frame))
+    for name in TRACE_DTYPE.names:
+        trace[name] = frame[name].to_numpy()
+    return trace
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The schantt-model modules are imported flat, as in the notebooks and benchmark.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
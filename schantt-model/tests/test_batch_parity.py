@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from instance_generator import generate_instance, make_problem, random_population
+
+
+def without_postponement(seed):
+    # a long single-machine Stage 0 and almost no batch delay: later stages are always ready in time
+    instance = generate_instance(20, machines_per_stage=[1, 2, 2, 1], seed=seed)
+    instance["processing_times"][0] = 100
+    instance["tact_times"][:] = 0.01
+    return instance
+
+
+INSTANCES = {
+    "default": lambda seed: generate_instance(20, seed=seed),
+    "single_machines": lambda seed: generate_instance(20, machines_per_stage=[1] * 5, seed=seed),
+    "parallel_machines": lambda seed: generate_instance(20, machines_per_stage=[3, 2, 3, 2], seed=seed),
+    "single_stage": lambda seed: generate_instance(20, machines_per_stage=[3], seed=seed),
+    "no_postponement": without_postponement,
+}
+
+
+def scalar_makespans(problem, X):
+    return np.array([problem.calculate_makespan(x, store_best=False) for x in X])
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("name", INSTANCES)
+def test_batch_makespans_match_scalar(name, seed):
+    problem = make_problem(INSTANCES[name](seed))
+    X = random_population(problem, 40, seed=seed)
+    np.testing.assert_array_equal(problem.calculate_makespan_batch(X), scalar_makespans(problem, X))
+
+
+def test_instances_cover_postponement():
+    postponed = {}
+    for name, build in INSTANCES.items():
+        problem = make_problem(build(0))
+        X = random_population(problem, 20, seed=0)
+        postponed[name] = any(np.any(problem._simulate(x)[-1]) for x in X)
+    assert postponed["default"] and postponed["single_machines"]
+    assert not postponed["no_postponement"] and not postponed["single_stage"]
+
+
+def test_batch_reuses_workspace_across_population_sizes():
+    problem = make_problem(generate_instance(15, seed=4))
+    for n_pop in (7, 30, 7, 1):
+        X = random_population(problem, n_pop, seed=n_pop)
+        np.testing.assert_array_equal(problem.calculate_makespan_batch(X), scalar_makespans(problem, X))
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("n_frozen", [1, 8])
+def test_batch_makespans_match_scalar_from_line_state(seed, n_frozen):
+    problem = make_problem(generate_instance(20, seed=seed))
+    x = random_population(problem, 1, seed=seed)[0]
+    window = problem.window_problem(problem.line_state(x, n_frozen=n_frozen))
+    X = random_population(window, 40, seed=seed + 10)
+    np.testing.assert_array_equal(window.calculate_makespan_batch(X), scalar_makespans(window, X))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_batch_objectives_match_scalar(seed):
+    instance = generate_instance(20, seed=seed)
+    due_dates = np.random.default_rng(seed).uniform(200, 600, size=20)
+    problem = make_problem(instance, objectives=("makespan", "changeover", "waiting"), due_dates=due_dates)
+    X = random_population(problem, 40, seed=seed)
+    expected = np.array([problem.calculate_objectives(x) for x in X])
+    np.testing.assert_array_equal(problem.calculate_objectives_batch(X), expected)
+    np.testing.assert_array_equal(expected[:, 0], scalar_makespans(problem, X))
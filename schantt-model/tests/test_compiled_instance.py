@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import core
+from instance_generator import generate_instance
+
+
+TABLES = ["stage_data", "recipe_data", "processing_time_data", "change_over_data"]
+
+
+def assert_lookups_match(compiled, instance, production_sequence):
+    stage_data, recipe_data, processing_time_data, change_over_data = (instance[key] for key in TABLES)
+    for stage in stage_data.index:
+        assert core.stage_position(stage, compiled) == core.stage_position(stage, stage_data)
+        expected, actual = core.previous_stage(stage, stage_data), core.previous_stage(stage, compiled)
+        assert actual == expected or pd.isnull(actual) and pd.isnull(expected)
+    for recipe_id in recipe_data.index:
+        assert core.tact_time(recipe_id, compiled) == core.tact_time(recipe_id, recipe_data)
+        for stage in stage_data.index:
+            assert core.processing_time(stage, recipe_id, compiled) == core.processing_time(stage, recipe_id, processing_time_data)
+    for item in production_sequence:
+        expected, actual = core.get_previous_item(item, production_sequence), core.get_previous_item(item, compiled)
+        assert actual == expected or pd.isnull(actual) and pd.isnull(expected)
+        for stage in stage_data.index:
+            assert (core.change_over_time(stage, item, production_sequence, compiled)
+                    == core.change_over_time(stage, item, production_sequence, change_over_data))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_with_sequence_lookups_match_dataframes(seed):
+    instance = generate_instance(10, seed=seed)
+    compiled = core.compile_instance(*[instance[key] for key in TABLES], instance["production_sequence"], instance["production_quantity"])
+    assert_lookups_match(compiled, instance, instance["production_sequence"])
+
+
+@pytest.mark.parametrize("start, stop", [(0, 4), (3, 7), (6, None), (0, None)])
+def test_window_lookups_match_dataframes(start, stop):
+    instance = generate_instance(10, seed=1)
+    compiled = core.compile_instance(*[instance[key] for key in TABLES], instance["production_sequence"], instance["production_quantity"])
+    window = compiled.window(start, stop)
+    assert_lookups_match(window, instance, instance["production_sequence"][start:stop])
+    np.testing.assert_array_equal(window.batch_time, compiled.batch_time[start:stop])
+
+
+@pytest.mark.parametrize("table", ["processing_time_data", "change_over_data"])
+def test_missing_pair_raises(table):
+    instance = generate_instance(10, seed=0)
+    instance[table] = instance[table].drop(instance[table].index[3])
+    with pytest.raises(KeyError, match=table):
+        core.compile_instance(*[instance[key] for key in TABLES])
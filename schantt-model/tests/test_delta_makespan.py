@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from instance_generator import generate_instance, make_problem, random_population
+
+
+def neighbours(x, n):
+    for a in range(n):
+        for b in range(n):
+            if a < b:
+                y = x.copy()
+                y[a], y[b] = y[b], y[a]
+                yield y
+            if a != b:
+                y = x.copy()
+                order = list(y[:n])
+                order.insert(b, order.pop(a))
+                y[:n] = order
+                yield y
+
+
+def problems(seed):
+    problem = make_problem(generate_instance(8, machines_per_stage=[2, 1, 3, 2, 1], seed=seed))
+    x = random_population(problem, 1, seed=seed)[0]
+    # the same line continued after three frozen positions, where the checkpoints start from a line state
+    return [problem, problem.window_problem(problem.line_state(x, n_frozen=3))]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_delta_makespan_matches_full_simulation(seed):
+    for problem in problems(seed):
+        x = random_population(problem, 1, seed=seed + 10)[0]
+        checkpoints = problem.makespan_checkpoints(x)
+        assert checkpoints["makespan"] == problem.calculate_makespan(x, store_best=False)
+        for y in neighbours(x, problem.seq_length):
+            expected = problem.calculate_makespan(y, store_best=False)
+            assert problem.delta_makespan(checkpoints, y) == expected
+            makespan, moved = problem.delta_makespan(checkpoints, y, return_checkpoints=True)
+            assert makespan == expected
+            full = problem.makespan_checkpoints(y)
+            for name in ("start_times", "end_times", "changeover_times", "machine_free_times"):
+                np.testing.assert_array_equal(moved[name], full[name])
+
+
+@pytest.mark.parametrize("neighbourhood", ["swap", "insert"])
+@pytest.mark.parametrize("seed", range(5))
+def test_local_search_never_worsens(seed, neighbourhood):
+    for problem in problems(seed):
+        for x in random_population(problem, 3, seed=seed + 20):
+            y, makespan = problem.local_search(x, neighbourhood=neighbourhood, max_passes=2)
+            assert sorted(y[:problem.seq_length]) == list(range(problem.seq_length))
+            np.testing.assert_array_equal(y[problem.seq_length:], x[problem.seq_length:])
+            assert makespan == problem.calculate_makespan(y, store_best=False)
+            assert makespan <= problem.calculate_makespan(x, store_best=False)
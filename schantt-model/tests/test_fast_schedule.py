@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+import core
+from instance_generator import SCHEDULE_KEYS, change_orders, generate_instance
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_fast_schedule_matches_make_schedule(seed):
+    args = [generate_instance(12, seed=seed)[key] for key in SCHEDULE_KEYS]
+    schedule = core.make_schedule(*args)
+    pd.testing.assert_frame_equal(core.make_schedule_fast(*args), schedule)
+    assert core.makespan_fast(*args) == core.makespan(schedule)
+
+
+def test_fast_schedule_matches_make_schedule_with_shared_instance():
+    instance = generate_instance(12, seed=3)
+    compiled = core.compile_instance(*[instance[key] for key in SCHEDULE_KEYS[:4]])
+    for seed in range(5):
+        args = [change_orders(instance, seed=seed)[key] for key in SCHEDULE_KEYS]
+        schedule = core.make_schedule(*args)
+        pd.testing.assert_frame_equal(core.make_schedule_fast(*args, instance=compiled), schedule)
+        assert core.makespan_fast(*args, instance=compiled) == core.makespan(schedule)
+
+
+@pytest.mark.parametrize("schedule", [core.make_schedule, core.make_schedule_fast, core.makespan_fast])
+def test_sequence_must_start_at_position_zero(schedule):
+    args = [generate_instance(6, seed=0)[key] for key in SCHEDULE_KEYS]
+    args[5] = args[5][1:]
+    with pytest.raises(KeyError):
+        schedule(*args)
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from pymoo.core.population import Population
+
+from hybrid_operators import HybridCrossover, HybridMutation, HybridSampling, PermutationRepair, order_crossover
+from instance_generator import generate_instance, make_problem
+
+
+def assert_valid(problem, X):
+    X = np.asarray(X)
+    n = problem.seq_length
+    for x in X:
+        assert sorted(x[:n]) == list(range(n))
+    machines = X[:, n:].reshape(len(X), n, problem.n_stages)
+    assert (machines >= 0).all()
+    assert (machines < np.asarray(problem.machines_per_stage)).all()
+
+
+@pytest.fixture(scope="module")
+def problem():
+    return make_problem(generate_instance(12, machines_per_stage=[1, 3, 2, 4, 2], seed=0))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_offspring_are_valid(problem, seed):
+    rng = np.random.default_rng(seed)
+    pop = HybridSampling().do(problem, 40, random_state=rng)
+    assert_valid(problem, pop.get("X"))
+
+    parents = rng.permutation(len(pop)).reshape(-1, 2)
+    offspring = HybridCrossover(prob=1.0).do(problem, pop, parents, random_state=rng)
+    assert_valid(problem, offspring.get("X"))
+
+    mutated = HybridMutation(perm_prob=1.0, machine_prob=0.5).do(problem, offspring, random_state=rng)
+    assert_valid(problem, mutated.get("X"))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_order_crossover_keeps_permutation(seed):
+    rng = np.random.default_rng(seed)
+    a, b = rng.permutation(10), rng.permutation(10)
+    start, end = np.sort(rng.choice(10, 2, replace=False))
+    child = order_crossover(a, b, start, end)
+    assert sorted(child) == list(range(10))
+    np.testing.assert_array_equal(child[start:end + 1], b[start:end + 1])
+
+
+def test_repair_restores_permutation(problem):
+    rng = np.random.default_rng(0)
+    X = HybridSampling().do(problem, 20, random_state=rng).get("X")
+    X[:, :problem.seq_length] = rng.integers(0, problem.seq_length, size=(20, problem.seq_length))
+    repaired = PermutationRepair().do(problem, Population.new(X=X)).get("X")
+    assert_valid(problem, repaired)
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+import instance_bundle
+from instance_generator import generate_instance
+
+
+def test_frames_round_trip(tmp_path):
+    instance = generate_instance(6, n_stages=4, n_recipes=5, seed=3)
+    stage_data = instance["stage_data"].assign(max_change_over=[15, 1, 14, 25])
+    recipe_data = instance["recipe_data"].assign(recipe_name=list("abcde"), turner=[False, True, False, False, True])
+    bundle = instance_bundle.load_frames(stage_data, recipe_data, instance["processing_time_data"],
+                                         instance["change_over_data"], cache_dir=tmp_path)
+    # reopened from the manifest on disk
+    bundle = instance_bundle.InstanceBundle(bundle.path)
+    stage_frame, recipe_frame, processing_frame, change_over_frame = bundle.frames()
+
+    pd.testing.assert_frame_equal(stage_frame, stage_data, check_dtype=False)
+    pd.testing.assert_frame_equal(recipe_frame[recipe_data.columns], recipe_data, check_dtype=False)
+    np.testing.assert_allclose(processing_frame["processing_time"].to_numpy(),
+                               instance["processing_time_data"].loc[processing_frame.index, "processing_time"].to_numpy())
+    np.testing.assert_allclose(change_over_frame.to_numpy(),
+                               instance["change_over_data"].loc[change_over_frame.index].to_numpy())
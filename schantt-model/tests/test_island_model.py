@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from instance_generator import generate_instance, make_problem
+from island_model import island_minimize, migration_sources
+
+
+@pytest.mark.parametrize("topology", ["ring", "random"])
+def test_islands_are_deterministic_under_a_seed(topology):
+    problem = make_problem(generate_instance(10, seed=0))
+    kwargs = dict(n_islands=3, pop_size=10, n_gen=6, migration_interval=2, topology=topology, seed=7, timeout=120)
+    first, second = island_minimize(problem, **kwargs), island_minimize(problem, **kwargs)
+    np.testing.assert_array_equal(first["X"], second["X"])
+    np.testing.assert_array_equal(first["F"], second["F"])
+    for a, b in zip(first["islands"], second["islands"]):
+        np.testing.assert_array_equal(a["X"], b["X"])
+        assert a["history"] == b["history"]
+
+
+def test_random_migration_sources_depend_only_on_seed_and_epoch():
+    assert migration_sources("random", 4, 3, seed=1) == migration_sources("random", 4, 3, seed=1)
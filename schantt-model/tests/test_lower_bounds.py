@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from pymoo.algorithms.soo.nonconvex.ga import GA
+from pymoo.optimize import minimize
+
+from hybrid_operators import hybrid_operators
+from instance_generator import generate_instance, make_problem, random_population
+
+
+@pytest.mark.parametrize("machines_per_stage", [[1] * 4, [3, 2, 3], [2]])
+def test_bounds_never_exceed_makespan(machines_per_stage):
+    problem = make_problem(generate_instance(30, machines_per_stage=machines_per_stage, seed=2), vectorized=True)
+    X = random_population(problem, 200, seed=2)
+    assert (problem.makespan_lower_bounds(X) <= problem.evaluate_makespans(X)).all()
+    window = problem.window_problem(problem.line_state(X[0], n_frozen=7))
+    Xw = random_population(window, 200, seed=3)
+    assert (window.makespan_lower_bounds(Xw) <= window.evaluate_makespans(Xw)).all()
+
+
+def test_auto_threshold_keeps_trajectory_and_stops_bounding():
+    instance = generate_instance(40, seed=1)
+    results = []
+    for prune in (None, "skip"):
+        problem = make_problem(instance, vectorized=True, prune=prune)
+        callback = {"callback": problem.update_prune_threshold} if prune else {}
+        res = minimize(problem, GA(pop_size=20, **hybrid_operators(problem)), ("n_gen", 20), seed=3, verbose=False, **callback)
+        results.append((res, problem))
+    (plain, _), (pruned, problem) = results
+    np.testing.assert_array_equal(plain.X, pruned.X)
+    # nothing is pruned on this line, so bounds are computed for the probe generations only
+    assert problem.n_pruned == 0
+    assert problem.n_bounded == problem.prune_probe * 20
+    assert problem.prune_threshold == np.inf
+
+
+def test_user_threshold_prunes_and_defers():
+    problem = make_problem(generate_instance(30, machines_per_stage=[2, 2, 2], seed=0), vectorized=True, prune="defer")
+    X = random_population(problem, 100, seed=0)
+    bounds = problem.makespan_lower_bounds(X)
+    problem.prune_threshold = float(np.median(bounds))
+    out = {}
+    problem._evaluate(X, out)
+    pruned = bounds > problem.prune_threshold
+    assert problem.n_pruned == pruned.sum() > 0
+    np.testing.assert_array_equal(out["F"][pruned], bounds[pruned])
+    np.testing.assert_array_equal(out["F"][~pruned], problem.evaluate_makespans(X[~pruned]))
+    deferred, values = problem.evaluate_deferred()
+    np.testing.assert_array_equal(deferred, X[pruned])
+    np.testing.assert_array_equal(values, problem.evaluate_makespans(X[pruned]))
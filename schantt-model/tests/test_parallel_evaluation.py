@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from instance_generator import generate_instance, make_problem, random_population
+from parallel_evaluation import ParallelEvaluator
+
+SCRIPT = '''
+from pymoo.algorithms.soo.nonconvex.ga import GA
+from pymoo.optimize import minimize
+from hybrid_operators import hybrid_operators
+from instance_generator import generate_instance, make_problem
+problem = make_problem(generate_instance(20, seed=0), vectorized=True, parallel="process", n_workers=2)
+minimize(problem, GA(pop_size=20, **hybrid_operators(problem)), ("n_gen", 3), seed=1, verbose=False)
+'''
+
+
+def test_process_pool_releases_shared_memory_without_close():
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=cwd, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    assert "leaked" not in result.stderr
+
+
+def test_close_is_idempotent():
+    problem = make_problem(generate_instance(10, seed=0), vectorized=True)
+    X = random_population(problem, 8, seed=0)
+    evaluator = ParallelEvaluator(problem, mode="process", n_workers=1)
+    np.testing.assert_array_equal(evaluator.evaluate(X), problem.evaluate_values(X))
+    evaluator.close()
+    evaluator.close()
+    assert evaluator._shared == []
@@ -0,0 +1,42 @@
+import csv
+import io
+
+import numpy as np
+import pandas as pd
+
+from results_store import ResultsStore, _copy_value
+
+
+def test_copy_rows_use_postgresql_text_formats():
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([_copy_value(value) for value in
+                                 [None, b"\x00\x01\xff", True, np.bool_(False), np.nan, np.float64(1.5), -np.inf, 3, "a,b"]])
+    assert buffer.getvalue() == '\\N,\\x0001ff,t,f,NaN,1.5,-Infinity,3,"a,b"\r\n'
+
+
+def test_front_round_trip(tmp_path):
+    F = np.array([[3.0, 1.0], [1.0, 2.0]])
+    X = np.array([[0, 2, 1, 0], [2, 1, 0, 1]])
+    with ResultsStore(f"sqlite:///{tmp_path / 'results.db'}") as store:
+        run_id = store.start_run(algorithm="nsga2")
+        store.save_front(run_id, F, X)
+        F_loaded, X_loaded = store.load_front(run_id)
+    np.testing.assert_array_equal(F_loaded, F)
+    np.testing.assert_array_equal(X_loaded, X)
+
+
+def test_schedule_round_trip(tmp_path):
+    from core import make_schedule_fast
+    from instance_generator import SCHEDULE_KEYS, generate_instance
+
+    schedule = make_schedule_fast(*[generate_instance(8, seed=0)[key] for key in SCHEDULE_KEYS])
+    # the same schedule labelled by integer recipe IDs, in an order that is not sorted by stage and item
+    by_recipe_id = schedule.iloc[::-1].copy()
+    by_recipe_id.index = by_recipe_id.index.set_levels(
+        by_recipe_id.index.levels[1].map(lambda item: int(item.split("_")[1]) * 100 + int(item.split("_")[0])), level=1)
+    with ResultsStore(f"sqlite:///{tmp_path / 'results.db'}") as store:
+        run_id = store.start_run()
+        store.save_schedule(run_id, schedule)
+        store.save_schedule(run_id, by_recipe_id, solution=1)
+        pd.testing.assert_frame_equal(store.load_schedule(run_id), schedule)
+        pd.testing.assert_frame_equal(store.load_schedule(run_id, solution=1), by_recipe_id)
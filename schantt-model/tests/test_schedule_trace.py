@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from instance_generator import generate_instance, make_problem, random_population
+from schedule_trace import export_trace, load_trace
+
+
+def sample_trace():
+    problem = make_problem(generate_instance(25, seed=5))
+    # tact times with many significant bits, so start / batch_delay / end use the full float64 precision
+    problem.tact_times = problem.tact_times * np.pi
+    x = random_population(problem, 1, seed=5)[0]
+    problem.calculate_makespan(x)
+    return problem.best_trace
+
+
+def assert_same_trace(loaded, trace):
+    assert loaded.dtype == trace.dtype
+    for name in trace.dtype.names:
+        assert np.array_equal(loaded[name], trace[name]), name
+
+
+def test_csv_round_trip(tmp_path):
+    trace = sample_trace()
+    export_trace(trace, tmp_path / "trace.csv")
+    assert_same_trace(load_trace(tmp_path / "trace.csv"), trace)
+
+
+def test_parquet_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    trace = sample_trace()
+    export_trace(trace, tmp_path / "trace.parquet")
+    assert_same_trace(load_trace(tmp_path / "trace.parquet"), trace)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from instance_generator import change_orders, generate_instance, make_problem, random_population
+from warm_start import map_genome
+
+
+def assert_valid(problem, x):
+    n = problem.seq_length
+    assert len(x) == n * (1 + problem.n_stages)
+    assert sorted(x[:n]) == list(range(n))
+    machines = x[n:].reshape(n, problem.n_stages)
+    assert ((machines >= 0) & (machines < np.asarray(problem.machines_per_stage))).all()
+
+
+@pytest.mark.parametrize("n_cancel, n_new", [(5, 1), (1, 6), (3, 3), (0, 0)])
+@pytest.mark.parametrize("seed", range(5))
+def test_mapped_genome_is_valid(seed, n_cancel, n_new):
+    instance = generate_instance(12, machines_per_stage=[2, 3, 1, 2, 2], seed=seed)
+    problem = make_problem(instance)
+    x = random_population(problem, 1, seed=seed)[0]
+    recipes, machines = problem.user_sequence[x[:problem.seq_length]], x[problem.seq_length:]
+
+    target = make_problem(change_orders(instance, n_cancel=n_cancel, n_new=n_new, seed=seed))
+    y = map_genome(recipes, machines, target)
+    assert_valid(target, y)
+    if not n_new:
+        # only cancellations: the remaining orders keep the stored recipe sequence
+        stored = iter(recipes.tolist())
+        assert all(recipe in stored for recipe in target.user_sequence[y[:target.seq_length]].tolist())
+
+
+def test_machines_are_repaired_to_fewer_machines():
+    instance = generate_instance(10, machines_per_stage=[3, 3, 3, 3, 3], seed=0)
+    problem = make_problem(instance)
+    x = random_population(problem, 1, seed=0)[0]
+    smaller = dict(instance, machines_per_stage=[1, 2, 1, 2, 1])
+    target = make_problem(smaller)
+    y = map_genome(problem.user_sequence[x[:10]], x[10:], target)
+    assert_valid(target, y)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from hybrid_operators import HybridDuplicateElimination
+from instance_generator import generate_instance, make_problem, random_population
+from pymoo.core.population import Population
+
+
+def window_problem_with_twin_machines(seed):
+    # machine 1 of every stage is a copy of machine 0, so only the line state tells them apart
+    instance = generate_instance(8, machines_per_stage=[2, 2, 2], seed=seed)
+    instance["processing_times"][:, 1] = instance["processing_times"][:, 0]
+    instance["changeover_times"][:, 1] = instance["changeover_times"][:, 0]
+    problem = make_problem(instance)
+    x = random_population(problem, 1, seed=seed)[0]
+    return problem.window_problem(problem.line_state(x, n_frozen=3), cache_size=1000)
+
+
+def swapped_machines(problem, x):
+    swapped = x.copy()
+    swapped[problem.seq_length:] = 1 - swapped[problem.seq_length:]
+    return swapped
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_cached_window_fitness_matches_simulation(seed):
+    window = window_problem_with_twin_machines(seed)
+    x = random_population(window, 1, seed=seed + 100)[0]
+    X = np.array([x, swapped_machines(window, x)])
+    out = {}
+    window._evaluate(X, out)
+    expected = [window.calculate_makespan(row, store_best=False) for row in X]
+    np.testing.assert_array_equal(np.ravel(out["F"]), expected)
+
+
+def test_identical_machines_still_merge_without_line_state():
+    instance = generate_instance(8, machines_per_stage=[2, 2, 2], seed=0)
+    instance["processing_times"][:, 1] = instance["processing_times"][:, 0]
+    instance["changeover_times"][:, 1] = instance["changeover_times"][:, 0]
+    problem = make_problem(instance)
+    x = random_population(problem, 1, seed=1)[0]
+    keys = problem.canonical_keys(np.array([x, swapped_machines(problem, x)]))
+    assert keys[0] == keys[1]
+
+
+def test_duplicate_elimination_keeps_window_genomes_on_different_machines():
+    for seed in range(50):
+        window = window_problem_with_twin_machines(seed)
+        x = random_population(window, 1, seed=seed + 100)[0]
+        X = np.array([x, swapped_machines(window, x)])
+        if window.calculate_makespan(X[0], store_best=False) != window.calculate_makespan(X[1], store_best=False):
+            pop = HybridDuplicateElimination(window).do(Population.new(X=X))
+            assert len(pop) == 2
+            return
+    pytest.fail("no seed where swapping twin machines changes the makespan")
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from hybrid_operators import HybridMutation, HybridSampling
+
+
+# Elite archive of past runs: the best genomes of every run, stored as recipe sequences with machine choices and keyed
+# by the signature of the data set (machines, processing, changeover and tact times), so that the next order book on
+# the same line can start from them instead of from a random population.
+
+def instance_signature(problem):
+    # Hash of everything but the orders: genomes of runs with the same signature transfer to each other
+    digest = hashlib.sha256()
+    digest.update(json.dumps([list(map(int, problem.machines_per_stage)), sorted(problem.recipe_id_to_index.items())], default=str).encode())
+    for array in (problem.processing_times, problem.changeover_times, problem.tact_times):
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        digest.update(repr(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:32]
+
+
+def map_genome(recipes, machines, problem):
+    '''
+    Genome of problem that follows a stored schedule: recipe sequence `recipes` with (position, stage) `machines`.
+
+    Orders of problem take the stored positions of their recipe in stored order; positions without a matching order
+    (cancelled orders) are dropped. Orders left over (new orders) go right after the last order of their recipe, or to
+    the end, on the machines of that neighbour or else the machines with the shortest processing time.
+    The machine block is repaired to the machine counts of problem.
+    '''
+    recipes = np.asarray(recipes, dtype=int)
+    machines = np.asarray(machines, dtype=int).reshape(len(recipes), -1)
+    machines_per_stage = np.asarray(problem.machines_per_stage)
+    if machines.shape[1] != problem.n_stages:
+        raise ValueError(f"stored genome has {machines.shape[1]} stages, problem has {problem.n_stages}")
+
+    unplaced = {}
+    for order, recipe in enumerate(problem.user_sequence.tolist()):
+        unplaced.setdefault(recipe, []).append(order)
+    for queue in unplaced.values():
+        queue.reverse()
+
+    perm, perm_machines = [], []
+    for recipe, row in zip(recipes.tolist(), machines):
+        queue = unplaced.get(recipe)
+        if queue:
+            perm.append(queue.pop())
+            perm_machines.append(row)
+
+    fastest = np.array([np.argmin(problem.processing_times[s, :machines_per_stage[s]], axis=0) for s in range(problem.n_stages)]).T
+    for recipe, queue in unplaced.items():
+        for order in reversed(queue):
+            same = [k for k, placed in enumerate(perm) if problem.user_sequence[placed] == recipe]
+            at = same[-1] + 1 if same else len(perm)
+            perm.insert(at, order)
+            perm_machines.insert(at, perm_machines[at - 1] if same else fastest[recipe])
+
+    machine_block = np.minimum(np.array(perm_machines, dtype=int).reshape(problem.seq_length, problem.n_stages), machines_per_stage - 1)
+    return np.concatenate([np.array(perm, dtype=int), machine_block.ravel()])
+
+
+class EliteArchive:
+    '''
+    Best genomes of past runs per instance signature, optionally persisted as JSON at path.
+
+    add() stores the n_elites best distinct genomes of a run (at most max_runs runs per signature, newest kept);
+    seeds() maps the stored genomes of the newest runs onto a new problem, best first.
+    '''
+
+    def __init__(self, path=None, max_runs=5):
+        self.path = path
+        self.max_runs = max_runs
+        self.entries = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def save(self, path=None):
+        path = path or self.path
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, path)
+
+    def add(self, problem, X, F, n_elites=5):
+        X = np.atleast_2d(np.asarray(X)).astype(int)
+        F = np.asarray(F, dtype=float).reshape(len(X), -1)[:, 0]
+        elites, seen = [], set()
+        for k in np.argsort(F, kind="stable"):
+            key = problem.canonical_keys(X[k:k + 1])[0]
+            if key in seen:
+                continue
+            seen.add(key)
+            perm = X[k, :problem.seq_length]
+            elites.append({
+                "recipes": problem.user_sequence[perm].tolist(),
+                "machines": X[k, problem.seq_length:].tolist(),
+                "makespan": float(F[k]),
+            })
+            if len(elites) == n_elites:
+                break
+        runs = self.entries.setdefault(instance_signature(problem), [])
+        runs.append({"time": time.time(), "n_orders": problem.seq_length, "elites": elites})
+        del runs[:-self.max_runs]
+        if self.path is not None:
+            self.save()
+
+    def add_result(self, problem, res, n_elites=5):
+        # Elites of the final population of a pymoo result
+        pop = res.pop if res.pop is not None else res.opt
+        self.add(problem, pop.get("X"), pop.get("F"), n_elites)
+
+    def seeds(self, problem, max_seeds=None):
+        runs = self.entries.get(instance_signature(problem), [])
+        X, keys = [], set()
+        for run in reversed(runs):
+            for elite in run["elites"]:
+                x = map_genome(elite["recipes"], elite["machines"], problem)
+                key = problem.canonical_keys(x[None])[0]
+                if key not in keys:
+                    keys.add(key)
+                    X.append(x)
+        X = np.array(X, dtype=int).reshape(-1, problem.n_var)
+        return X if max_seeds is None else X[:max_seeds]
+
+    def initial_population(self, problem, pop_size, warm_fraction=0.5, seed=0):
+        '''
+        Initial population for GA(sampling=...): the mapped elites, mutated copies of them up to
+        warm_fraction of pop_size, and random genomes for the rest. Random only without stored runs.
+        '''
+        rng = np.random.default_rng(seed)
+        seeds = self.seeds(problem, max_seeds=pop_size)
+        n_warm = min(pop_size, max(len(seeds), int(round(warm_fraction * pop_size)))) if len(seeds) else 0
+        X = HybridSampling()._do(problem, pop_size, random_state=rng)
+        if n_warm:
+            X[:len(seeds)] = seeds
+            if n_warm > len(seeds):
+                parents = seeds[rng.integers(len(seeds), size=n_warm - len(seeds))]
+                X[len(seeds):n_warm] = HybridMutation(perm_prob=1.0)._do(problem, parents, random_state=rng)
+        return X
@@ -0,0 +1,24 @@
+import os
+from importlib import metadata
+
+import pipsize
+
+
+def test_reports_installed_distribution():
+    dist = metadata.distribution("pytest")
+    sizes = {entry["name"].lower(): entry for entry in pipsize.package_sizes(cache_path=None)}
+    entry = sizes["pytest"]
+    assert entry["version"] == dist.version
+    assert entry["source"] == "record"
+    assert entry["n_files"] > 0
+    assert entry["size"] == pipsize.record_size(dist)[0] > 0
+    assert os.path.isdir(pipsize.metadata_dir(dist))
+
+
+def test_cached_run_gives_the_same_sizes(tmp_path):
+    cache_path = str(tmp_path / "sizes.json")
+    first = pipsize.package_sizes(cache_path=cache_path)
+    second = pipsize.package_sizes(cache_path=cache_path)
+    assert {entry["name"].lower(): entry["cached"] for entry in second}["pytest"]
+    strip = lambda sizes: sorted((entry["name"], entry["size"], entry["n_files"]) for entry in sizes)
+    assert strip(first) == strip(second)